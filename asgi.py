@@ -0,0 +1,8 @@
+"""
+ASGI 启动器（异步服务模式）
+运行方式: uvicorn asgi:app --host 0.0.0.0 --port 5000
+      或: gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+"""
+from webapp.asgi import create_asgi_app
+
+app = create_asgi_app()
@@ -18,9 +18,60 @@ class Config:
     DATA_DIR = BASE_DIR / 'data'
     CARDS_CSV = DATA_DIR / 'TarotCards_Full.csv'
     CARDS_CSV_ZH = DATA_DIR / 'tarot_chinese.csv'
+    # 其他语言的卡牌CSV（语言 -> 路径）；data/tarot_<语言代码>.csv 会被自动发现
+    CARDS_CSV_LOCALES = {}
+    # 多语言牌组的内存预算（字节），超出时按LRU淘汰不常用语言，0表示不限制
+    CARD_CATALOG_MEMORY_BUDGET = int(os.environ.get('CARD_CATALOG_MEMORY_BUDGET') or 0)
+    # 卡牌存储后端：objects（默认）或 columnar（NumPy列式，适合几十万张牌的大型牌组）
+    CARD_STORE_BACKEND = os.environ.get('CARD_STORE_BACKEND') or 'objects'
+    # 抽牌随机数来源：thread（每线程独立生成器，默认）或 secrets（操作系统密码学安全随机数）
+    RNG_MODE = os.environ.get('RNG_MODE') or 'thread'
+    # 预编译快照目录（由 scripts/build_snapshots.py 生成）
+    SNAPSHOT_DIR = DATA_DIR / 'compiled'
+    # 数据文件热重载轮询间隔（秒），0表示不启用后台监视
+    DECK_RELOAD_INTERVAL = float(os.environ.get('DECK_RELOAD_INTERVAL') or 2)
+    # 重载触发文件：管理接口改写它，各 worker 的监视线程发现后重载
+    DECK_RELOAD_TRIGGER = SNAPSHOT_DIR / 'reload.trigger'
+    # 占卜布局定义
+    SPREADS_FILE = DATA_DIR / 'spreads.json'
+    # 牌组版本登记表（永久链接按版本固定url顺序）
+    DECK_VERSIONS_FILE = DATA_DIR / 'deck_versions.json'
+    # 永久链接页面的HTTP缓存时间（秒）
+    READING_CACHE_MAX_AGE = int(os.environ.get('READING_CACHE_MAX_AGE') or 86400)
+    # 每日一牌：访客分桶数、无法得知访客时区时使用的时区、分配表种子盐
+    DAILY_CARD_BUCKETS = int(os.environ.get('DAILY_CARD_BUCKETS') or 64)
+    DAILY_CARD_TIMEZONE = os.environ.get('DAILY_CARD_TIMEZONE') or 'UTC'
+    DAILY_CARD_SALT = os.environ.get('DAILY_CARD_SALT') or ''
+    # 首页/牌库/牌详情页渲染缓存的页面数上限（0表示不缓存）与HTTP缓存时间（秒）
+    RENDER_CACHE_SIZE = int(os.environ.get('RENDER_CACHE_SIZE') or 512)
+    RENDER_CACHE_MAX_AGE = int(os.environ.get('RENDER_CACHE_MAX_AGE') or 300)
+    # 批量占卜接口单次请求的最大占卜数
+    BULK_READINGS_MAX = int(os.environ.get('BULK_READINGS_MAX') or 100000)
+    # 牌库页缩略图拼图不存在时（如热重载改变了牌组顺序）是否在后台生成，需要 Pillow
+    CARD_ATLAS_AUTOBUILD = (os.environ.get('CARD_ATLAS_AUTOBUILD') or '1') != '0'
+    # ASGI 模式（asgi.py）下执行 Flask 代码的线程数
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS') or 8)
+    # 响应压缩：按 Accept-Encoding 返回 br（需要 Brotli）或 gzip，COMPRESSION=0 时不压缩
+    COMPRESSION = (os.environ.get('COMPRESSION') or '1') != '0'
+    # 每次请求压缩的动态页面（占卜页等）的压缩级别，偏重延迟；缓存的页面和静态文件预压缩，使用最高级别
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY') or 5)
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL') or 6)
+    # 小于此字节数的响应不压缩
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE') or 1024)
+    # 管理接口令牌，未设置时管理接口不可用
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
 
     # 静态资源
     STATIC_FOLDER = 'static'
+    # 带摘要的静态文件清单（由 scripts/build_assets.py 生成），不存在时使用原文件名
+    ASSET_MANIFEST = BASE_DIR / 'webapp' / 'assets.json'
+    # 自托管字体与 CSS 的清单（由 scripts/build_frontend.py 生成），不存在或 VENDOR_FRONTEND=0 时使用 CDN
+    FRONTEND_MANIFEST = (BASE_DIR / 'webapp' / 'static' / 'vendor' / 'manifest.json'
+                         if (os.environ.get('VENDOR_FRONTEND') or '1') != '0' else None)
+    # 牌面图片包目录（由 scripts/build_images.py 生成），不存在或 IMAGE_PACKS=0 时逐个文件返回图片
+    IMAGE_PACK_DIR = SNAPSHOT_DIR / 'packs' if (os.environ.get('IMAGE_PACKS') or '1') != '0' else None
+    # 部署在 nginx 之后时，图片包中的图片改由 nginx 发送：X-Accel-Redirect 指向的内部 location 前缀（如 /_images/）
+    IMAGE_ACCEL_REDIRECT = os.environ.get('IMAGE_ACCEL_REDIRECT') or ''
     TEMPLATE_FOLDER = 'templates'
 
     # Babel国际化配置
@@ -42,6 +93,12 @@ class TestingConfig(Config):
     """测试环境配置"""
     TESTING = True
     WTF_CSRF_ENABLED = False
+    CARD_ATLAS_AUTOBUILD = False
+    ASSET_MANIFEST = None
+    FRONTEND_MANIFEST = None
+    IMAGE_PACK_DIR = None
+    DECK_RELOAD_INTERVAL = 0
+    DECK_RELOAD_TRIGGER = None
 
 # 配置字典
 config = {
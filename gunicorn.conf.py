@@ -0,0 +1,43 @@
+"""
+Gunicorn配置
+运行方式: gunicorn -c gunicorn.conf.py run:app
+      ASGI 模式: gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+
+默认启用预加载模式：master进程只加载一次牌组数据，然后用 gc.freeze()
+把已有对象移出垃圾回收器的管理范围再fork，worker以写时复制方式共享这些内存页，
+避免每个worker各自解析CSV、各持一份牌组，也避免GC遍历对象时弄脏共享页。
+设置环境变量 GUNICORN_PRELOAD=0 可关闭预加载。
+"""
+import gc
+import os
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+if preload_app:
+    # master加载应用期间关闭自动GC，避免在fork前产生无谓的回收和对象移动
+    gc.disable()
+
+
+def pre_fork(server, worker):
+    """fork之前：停止master中的重载线程，冻结现有对象"""
+    if not preload_app:
+        return
+    from webapp import routes
+    if routes.deck_reloader is not None:
+        # 监视线程不会被fork复制，由每个worker各自重新启动
+        routes.deck_reloader.stop()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """fork之后：worker内恢复GC，并启动自己的重载线程"""
+    if not preload_app:
+        return
+    gc.enable()
+    from webapp import routes
+    application = server.app.wsgi()
+    # ASGI 模式（asgi:app）下加载的是 AsgiApp，配置在它包装的 Flask 应用上
+    config = getattr(application, 'flask_app', application).config
+    interval = config.get('DECK_RELOAD_INTERVAL')
+    if routes.deck_reloader is not None and interval:
+        routes.deck_reloader.start(interval)
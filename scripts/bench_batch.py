@@ -0,0 +1,52 @@
+"""
+批量占卜基准测试
+对比逐次调用 three_card_reading()/six_card_reading() 与向量化的 batch_readings()
+运行方式: python scripts/bench_batch.py [--count 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from config import Config
+from webapp import create_app
+from webapp.models import CardManager, ReadingEngine
+
+
+def rate(func, count):
+    """返回每秒生成的占卜次数（取3次最好成绩）"""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        func(count)
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=1000000)
+    args = parser.parse_args()
+
+    engine = ReadingEngine(CardManager(Config.CARDS_CSV))
+    loop_count = max(args.count // 100, 1)
+    print("| 布局 | 逐次调用 | 批量接口 | 加速比 | 结果占用 |")
+    print("|------|---------|---------|-------|---------|")
+    # 逐次调用需要请求上下文来翻译位置说明
+    with create_app('default').test_request_context():
+        for spread, single in (('three', engine.three_card_reading),
+                               ('six', engine.six_card_reading)):
+            looped = rate(lambda n: [single() for _ in range(n)], loop_count)
+            batched = rate(lambda n: engine.batch_readings(spread, n), args.count)
+            size = engine.batch_readings(spread, args.count).nbytes
+            print(f"| {spread} | {looped / 1e3:,.0f} K/s | {batched / 1e6:,.1f} M/s | "
+                  f"{batched / looped:,.0f}x | {size / 2 ** 20:.1f} MiB/{args.count:,} 次 |")
+
+
+if __name__ == '__main__':
+    main()
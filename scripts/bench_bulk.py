@@ -0,0 +1,63 @@
+"""
+批量占卜接口基准测试
+通过测试客户端流式读取 /api/v1/readings/<spread>/bulk，测量每秒占卜数、输出速率和内存峰值
+（内存峰值应与占卜数无关）
+运行方式: python scripts/bench_bulk.py [--count 20000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from webapp import create_app
+
+
+def stream(client, spread, count):
+    """
+    流式读取一次批量占卜
+
+    Returns:
+        tuple: (耗时秒数, 响应字节数)
+    """
+    start = time.perf_counter()
+    response = client.get(f'/api/v1/readings/{spread}/bulk?count={count}&seed=1', buffered=False)
+    total = sum(len(chunk) for chunk in response.response)
+    return time.perf_counter() - start, total
+
+
+def peak_memory(client, spread, count):
+    """流式读取一次批量占卜期间的内存峰值（字节，tracemalloc 会拖慢速度，不与计时同时进行）"""
+    tracemalloc.start()
+    stream(client, spread, count)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--spreads', nargs='+', default=['one', 'three', 'six', 'celtic-cross'])
+    args = parser.parse_args()
+
+    app = create_app('production')
+    client = app.test_client()
+    print("| 布局 | 占卜数/秒 | 每行 | 输出速率 | 内存峰值（N次 / 10N次） |")
+    print("|------|----------|------|---------|----------------------|")
+    for spread in args.spreads:
+        stream(client, spread, 100)
+        elapsed, total = stream(client, spread, args.count)
+        peak = peak_memory(client, spread, args.count)
+        peak_10x = peak_memory(client, spread, args.count * 10)
+        print(f"| {spread} | {args.count / elapsed:,.0f} | {total // args.count:,} B | "
+              f"{total / elapsed / 2 ** 20:.1f} MiB/s | {peak / 2 ** 10:,.0f} KiB / {peak_10x / 2 ** 10:,.0f} KiB |")
+
+
+if __name__ == '__main__':
+    main()
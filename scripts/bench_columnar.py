@@ -0,0 +1,102 @@
+"""
+列式牌组基准测试
+对比默认后端（Card元组）与列式后端（NumPy）在大型合成牌组上的
+常驻内存、抽牌耗时（ReadingEngine.draw_cards，与请求路径相同）和按类型筛选耗时
+运行方式: python scripts/bench_columnar.py [--sizes 100000 500000]
+"""
+import argparse
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from config import Config
+from webapp.columnar import ColumnarCardManager
+from webapp.models import CardManager, ReadingEngine
+
+
+def synthetic_records(base, count):
+    """
+    循环复制真实牌组生成合成记录，url和名称唯一
+    每个字符串都是新对象，模拟真实的用户牌组（文本互不共享）
+    """
+    for i in range(count):
+        record = {field: (value + ' ')[:-1] if isinstance(value, str) else value
+                  for field, value in base[i % len(base)].to_dict().items()}
+        record['url'] = f"{record['url']}_{i}"
+        record['name'] = f"{record['name']} #{i}"
+        yield record
+
+
+def synthetic_manager(manager_class, base, size):
+    """用合成记录加载的卡牌管理器（与正式加载相同，构建全部索引）"""
+    class SyntheticManager(manager_class):
+        def _read_records(self):
+            return synthetic_records(base, size)
+    return SyntheticManager(Config.CARDS_CSV)
+
+
+def measure(build):
+    """返回 (对象, 常驻内存字节)"""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def per_call_us(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def bench_objects(base, size):
+    """默认后端：(常驻内存, 抽3张牌, 筛选大牌)"""
+    manager, nbytes = measure(lambda: synthetic_manager(CardManager, base, size))
+    engine = ReadingEngine(manager)
+    cards = manager.get_all_cards()
+    draw = per_call_us(lambda: engine.draw_cards(3), 2000)
+    scan = per_call_us(lambda: [c for c in cards if c.cardtype == 'major'], 3)
+    return nbytes, draw, scan
+
+
+def bench_columnar(base, size):
+    """列式后端：(常驻内存, 抽3张牌, 筛选大牌（首次）, 筛选大牌（缓存）)"""
+    manager, nbytes = measure(lambda: synthetic_manager(ColumnarCardManager, base, size))
+    engine = ReadingEngine(manager)
+    store = manager.store
+    draw = per_call_us(lambda: engine.draw_cards(3), 2000)
+    codes = store.type_codes
+    major = store.cardtypes.index('major')
+    scan = per_call_us(lambda: codes == major, 20)
+    store.type_indices('major')
+    cached = per_call_us(lambda: store.type_indices('major'), 20000)
+    return nbytes, draw, scan, cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 500000])
+    args = parser.parse_args()
+
+    base = CardManager(Config.CARDS_CSV).get_all_cards()
+    print("| 牌数 | 后端 | 常驻内存 | 抽3张牌 | 筛选大牌（首次） | 筛选大牌（缓存） |")
+    print("|------|------|---------|--------|----------------|----------------|")
+    for size in args.sizes:
+        nbytes, draw, scan = bench_objects(base, size)
+        print(f"| {size:,} | objects | {nbytes / 2 ** 20:,.1f} MiB | {draw:.1f} µs | "
+              f"{scan / 1000:.1f} ms | {scan / 1000:.1f} ms |")
+        nbytes, draw, scan, cached = bench_columnar(base, size)
+        print(f"| {size:,} | columnar | {nbytes / 2 ** 20:,.1f} MiB | {draw:.1f} µs | "
+              f"{scan / 1000:.2f} ms | {cached:.2f} µs |")
+
+
+if __name__ == '__main__':
+    main()
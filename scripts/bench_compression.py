@@ -0,0 +1,66 @@
+"""
+响应压缩基准测试
+在进程内（Flask 测试客户端）依次以不压缩、gzip、br 请求各页面，统计响应大小和每次请求的服务端耗时：
+缓存的页面（首页、牌库、牌详情、API）返回填充缓存时压缩好的结果，占卜页每次请求按 COMPRESSION_* 的级别压缩。
+另外列出动态页面在各压缩级别下的大小和压缩耗时，供调整 COMPRESSION_BROTLI_QUALITY / COMPRESSION_GZIP_LEVEL
+运行方式: python scripts/bench_compression.py [--requests 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from webapp import create_app
+from webapp.compression import compress, encodings
+
+PAGES = ['/', '/browse', '/card/the_fool', '/api/v1/cards', '/three-cards', '/six-cards']
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 4, 5, 6, 11)}
+
+
+def time_requests(client, path, headers, count):
+    """请求 count 次，返回 (响应大小, 每次请求的平均耗时（毫秒）)"""
+    client.get(path, headers=headers)
+    start = time.perf_counter()
+    for _ in range(count):
+        response = client.get(path, headers=headers)
+    return len(response.data), (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='每个页面、每种编码的请求数')
+    parser.add_argument('--pages', nargs='+', default=PAGES)
+    args = parser.parse_args()
+
+    app = create_app('production')
+    client = app.test_client()
+    available = sorted(encodings(), reverse=True)
+    print(f"每个页面、每种编码 {args.requests} 次请求（进程内，不含网络）\n")
+    print("| 页面 | 编码 | 大小 | 每次请求 |")
+    print("|------|------|------|---------|")
+    for path in args.pages:
+        for encoding in ['identity'] + available:
+            size, elapsed = time_requests(client, path, {'Accept-Encoding': encoding}, args.requests)
+            print(f"| {path} | {encoding} | {size:,} B | {elapsed:.2f} ms |")
+
+    print("\n动态页面各压缩级别（/three-cards）\n")
+    print("| 编码 | 级别 | 大小 | 压缩耗时 |")
+    print("|------|------|------|---------|")
+    body = client.get('/three-cards').data
+    for encoding in available:
+        for level in LEVELS[encoding]:
+            start = time.perf_counter()
+            for _ in range(20):
+                size = len(compress(body, encoding, level))
+            elapsed = (time.perf_counter() - start) / 20 * 1000
+            print(f"| {encoding} | {level} | {size:,} B | {elapsed:.2f} ms |")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+首次内容绘制（FCP）基准测试：CDN 字体/Bootstrap 与自托管、内联 CSS 对比
+依次启动两种部署（gunicorn，VENDOR_FRONTEND=0/1），用无头 Chromium 冷启动（每次新的浏览器上下文，
+没有缓存和已建立的连接）打开各页面，记录 FCP 和网页字体加载完成时间的中位数。
+
+网络条件在本机模拟：浏览器到应用和三个第三方域名（fonts.googleapis.com、fonts.gstatic.com、
+cdn.jsdelivr.net）的每个连接都经过延迟代理——建立连接前等待 DNS 查询和 TCP 握手（1 RTT），
+之后每个方向的数据延迟半个 RTT，并按带宽限速；TLS 握手经过代理，自然多花 1 RTT。
+第三方域名由本机的 HTTPS 服务器（自签名证书）提供 scripts/build_frontend.py 下载缓存中的文件，
+不依赖外网
+运行方式: python scripts/bench_fcp.py --chrome /path/to/chrome [--rtt 150] [--kbps 1600] [--runs 5]
+需要安装 playwright 和 openssl 命令；先运行 scripts/build_frontend.py 和 scripts/build_assets.py
+"""
+import argparse
+import asyncio
+import mimetypes
+import os
+import socket
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from webapp.frontend import cache_path
+
+THIRD_PARTY_HOSTS = ('fonts.googleapis.com', 'fonts.gstatic.com', 'cdn.jsdelivr.net')
+APP_HOST = 'tarot.test'
+MODES = {'cdn': '0', 'vendor': '1'}
+# 等到首次内容绘制，再等正在加载的网页字体加载完成（document.fonts.ready）
+FCP_SCRIPT = """() => new Promise(resolve => {
+    const done = () => {
+        const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+        if (fcp) {
+            document.fonts.ready.then(() => resolve([fcp.startTime, performance.now()]));
+        }
+        return fcp;
+    };
+    if (!done()) {
+        new PerformanceObserver((list, observer) => done() && observer.disconnect())
+            .observe({type: 'paint', buffered: true});
+    }
+})"""
+
+
+def start_app(port, workers, vendor):
+    """启动 gunicorn（同步 worker），等待端口可连接"""
+    env = dict(os.environ, VENDOR_FRONTEND=vendor)
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+               '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'run:app']
+    process = subprocess.Popen(command, cwd=project_root, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("应用未能启动")
+
+
+def make_certificate(directory):
+    """第三方域名的自签名证书"""
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    names = ','.join(f'DNS:{host}' for host in THIRD_PARTY_HOSTS)
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=bench', '-addext', f'subjectAltName={names}',
+                    '-keyout', key, '-out', cert], check=True, capture_output=True)
+    return cert, key
+
+
+def start_third_party(port, cache_dir, cert, key):
+    """本机 HTTPS 服务器：按 Host 和路径返回下载缓存中的文件"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            host = self.headers.get('Host', '').split(':')[0]
+            path = cache_path(cache_dir, f'https://{host}{self.path}')
+            if not path.is_file():
+                self.send_error(404)
+                return
+            body = path.read_bytes()
+            mimetype = 'text/css' if host == 'fonts.googleapis.com' else mimetypes.guess_type(path.name)[0]
+            self.send_response(200)
+            self.send_header('Content-Type', mimetype or 'application/octet-stream')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _pipe(reader, writer, delay, rate):
+    """转发一个方向的数据：每块延迟 delay 秒到达，按 rate 字节/秒限速（保持顺序）"""
+    queue = asyncio.Queue()
+
+    async def deliver():
+        while True:
+            due, data = await queue.get()
+            if data is None:
+                break
+            await asyncio.sleep(max(0, due - time.monotonic()))
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    task = asyncio.create_task(deliver())
+    sent_until = time.monotonic()
+    try:
+        while True:
+            data = await reader.read(16384)
+            if not data:
+                break
+            # 带宽：这一块发送完毕的时间
+            sent_until = max(sent_until, time.monotonic()) + len(data) / rate
+            await queue.put((sent_until + delay, data))
+    except OSError:
+        pass
+    await queue.put((0, None))
+    try:
+        await task
+    except OSError:
+        pass
+
+
+async def _serve_proxy(listen_port, target_port, rtt, rate):
+    async def handle(client_reader, client_writer):
+        # DNS 查询 + TCP 握手
+        await asyncio.sleep(rtt)
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection('127.0.0.1', target_port)
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(_pipe(client_reader, upstream_writer, rtt / 2, rate),
+                             _pipe(upstream_reader, client_writer, rtt / 2, rate))
+    return await asyncio.start_server(handle, '127.0.0.1', listen_port)
+
+
+def start_proxies(routes, rtt, rate):
+    """在后台线程的事件循环中启动延迟代理：{监听端口: 目标端口}"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    for listen_port, target_port in routes.items():
+        asyncio.run_coroutine_threadsafe(_serve_proxy(listen_port, target_port, rtt, rate), loop).result()
+    return loop
+
+
+def measure(chrome, resolver_rules, url, runs):
+    """冷启动打开 url runs 次，返回 [(FCP, 字体加载完成)]（毫秒，从导航开始计）"""
+    from playwright.sync_api import sync_playwright
+
+    results = []
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(executable_path=chrome,
+                                             args=['--no-sandbox', f'--host-resolver-rules={resolver_rules}'])
+        try:
+            for _ in range(runs):
+                context = browser.new_context(ignore_https_errors=True, viewport={'width': 1280, 'height': 800})
+                page = context.new_page()
+                page.goto(url, wait_until='commit', timeout=120000)
+                results.append(tuple(page.evaluate(FCP_SCRIPT)))
+                context.close()
+        finally:
+            browser.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chrome', required=True, help='Chromium/Chrome 可执行文件')
+    parser.add_argument('--cache-dir', default=os.path.join(project_root, '.cache', 'frontend'),
+                        help='scripts/build_frontend.py 的下载缓存目录（第三方域名的文件）')
+    parser.add_argument('--rtt', type=float, default=150, help='往返延迟（毫秒）')
+    parser.add_argument('--kbps', type=float, default=1600, help='每个连接每个方向的带宽（kbit/s）')
+    parser.add_argument('--runs', type=int, default=5, help='每个页面的测量次数')
+    parser.add_argument('--pages', nargs='+', default=['/', '/browse', '/card/the_fool', '/three-cards'])
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker 进程数')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    app_port, third_party_port, app_proxy, third_party_proxy = range(args.port, args.port + 4)
+    rtt = args.rtt / 1000
+    rate = args.kbps * 1000 / 8
+    resolver_rules = ', '.join([f'MAP {APP_HOST} 127.0.0.1:{app_proxy}'] +
+                               [f'MAP {host} 127.0.0.1:{third_party_proxy}' for host in THIRD_PARTY_HOSTS])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_third_party(third_party_port, args.cache_dir, *make_certificate(tmp))
+        loop = start_proxies({app_proxy: app_port, third_party_proxy: third_party_port}, rtt, rate)
+
+        print(f"RTT {args.rtt:.0f} ms，每连接带宽 {args.kbps:,.0f} kbit/s，每页冷启动 {args.runs} 次（中位数）\n")
+        print("| 页面 | 模式 | FCP | 字体加载完成 |")
+        print("|------|------|-----|------------|")
+        try:
+            for mode in args.modes:
+                process = start_app(app_port, args.workers, MODES[mode])
+                try:
+                    for path in args.pages:
+                        results = measure(args.chrome, resolver_rules, f'http://{APP_HOST}{path}', args.runs)
+                        fcp = statistics.median(r[0] for r in results)
+                        fonts = statistics.median(r[1] for r in results)
+                        print(f"| {path} | {mode} | {fcp:,.0f} ms | {fonts:,.0f} ms |")
+                finally:
+                    process.terminate()
+                    process.wait()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
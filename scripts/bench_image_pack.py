@@ -0,0 +1,131 @@
+"""
+静态图片吞吐量基准测试：Flask 静态文件视图与图片包对比
+依次启动几种部署（gunicorn 同步 worker），并发客户端在固定时间内随机请求牌面图片（带摘要的URL），
+统计每秒请求数、吞吐量和延迟：
+- static：IMAGE_PACKS=0，Flask 的静态文件视图（每次请求打开文件、stat、计算ETag）
+- pack：图片包，wsgi.file_wrapper + os.sendfile
+- accel：图片包 + IMAGE_ACCEL_REDIRECT，应用只返回头（本机没有 nginx，只测应用一侧的开销，
+  响应中没有图片内容）
+运行方式: python scripts/bench_image_pack.py [--seconds 10] [--concurrency 16] [--kind thumb]
+先运行 scripts/build_images.py 和 scripts/build_assets.py
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from flask import url_for
+from webapp import create_app
+
+MODES = {
+    'static': {'IMAGE_PACKS': '0'},
+    'pack': {'IMAGE_PACKS': '1', 'IMAGE_ACCEL_REDIRECT': ''},
+    'accel': {'IMAGE_PACKS': '1', 'IMAGE_ACCEL_REDIRECT': '/_images/'},
+}
+
+
+def image_urls(kind):
+    """
+    图片包中的图片的URL
+
+    Args:
+        kind (str): thumb（缩略图版本）、original（原图）或 all
+    """
+    app = create_app('production')
+    packs = app.extensions['image_packs']
+    if not packs:
+        print("[ERROR] 没有图片包，先运行 scripts/build_images.py")
+        sys.exit(1)
+    names = [name for pack in packs.packs for name in pack.images]
+    if kind == 'thumb':
+        names = [name for name in names if name.startswith('variants/') and '.150.' in name]
+    elif kind == 'original':
+        names = [name for name in names if not name.startswith('variants/')]
+    with app.test_request_context():
+        return [url_for('static', filename=name) for name in names]
+
+
+def start_app(port, workers, env):
+    """启动 gunicorn（同步 worker），等待端口可连接"""
+    env = dict(os.environ, **env)
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+               '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'run:app']
+    process = subprocess.Popen(command, cwd=project_root, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("应用未能启动")
+
+
+async def _client(port, urls, deadline, latencies, counters):
+    """不断请求随机图片直到 deadline（同步 worker 每个请求一个连接）"""
+    while time.monotonic() < deadline:
+        url = random.choice(urls)
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET {url} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+        data = await reader.read()
+        writer.close()
+        latencies.append(time.perf_counter() - start)
+        if not data.startswith(b'HTTP/1.1 200'):
+            counters['errors'] += 1
+        counters['bytes'] += len(data)
+
+
+async def run_load(port, urls, seconds, concurrency):
+    latencies = []
+    counters = {'bytes': 0, 'errors': 0}
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(_client(port, urls, deadline, latencies, counters) for _ in range(concurrency)))
+    return latencies, counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10, help='每种部署的测试时间（秒）')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发连接数')
+    parser.add_argument('--kind', default='all', choices=['thumb', 'original', 'all'], help='请求的图片')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker 进程数')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    urls = image_urls(args.kind)
+    print(f"{len(urls)} 张图片（{args.kind}），并发 {args.concurrency}，每种部署 {args.seconds:.0f} s，"
+          f"gunicorn {args.workers} 个同步 worker\n")
+    print("| 部署 | 请求/秒 | 吞吐量 | 延迟中位数 | p99 | 错误 |")
+    print("|------|--------|-------|----------|-----|-----|")
+    for mode in args.modes:
+        process = start_app(args.port, args.workers, MODES[mode])
+        try:
+            # 预热（各 worker 导入、打开文件）
+            asyncio.run(run_load(args.port, urls, 1, args.concurrency))
+            latencies, counters = asyncio.run(run_load(args.port, urls, args.seconds, args.concurrency))
+        finally:
+            process.terminate()
+            process.wait()
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"| {mode} | {len(latencies) / args.seconds:,.0f} | "
+              f"{counters['bytes'] / args.seconds / 1024 / 1024:,.1f} MiB/s | "
+              f"{statistics.median(latencies) * 1000:.1f} ms | {p99 * 1000:.1f} ms | {counters['errors']} |")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+抽牌随机数并发基准测试
+在 1/2/4/8 个线程中同时进行三卡占卜，对比三种随机数来源的总吞吐量：
+global（共享全局 random 模块，旧实现）、thread（每线程生成器）、secrets（系统CSPRNG）
+标准构建受GIL限制，多线程总吞吐量基本不随线程数增长；在 free-threaded 构建
+（python3.13t 等）上运行可观察到共享生成器的争用差异
+运行方式: python scripts/bench_rng.py [--draws 20000] [--threads 1 2 4 8]
+"""
+import argparse
+import os
+import platform
+import random
+import sys
+import sysconfig
+import threading
+import time
+import timeit
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from config import Config
+from webapp.models import CardManager, ReadingEngine
+from webapp.rng import configure, current_rng, orientation_bits
+from webapp.spreads import SpreadRegistry
+
+# 对比的随机数来源；global 直接使用 random 模块（所有线程共享一个生成器）
+MODES = ('global', 'thread', 'secrets')
+
+
+def build_info():
+    """解释器构建信息"""
+    free_threaded = bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    return (f"{platform.python_implementation()} {platform.python_version()}, "
+            f"free-threaded 构建: {'是' if free_threaded else '否'}, "
+            f"GIL: {'启用' if gil_enabled else '禁用'}, CPU: {os.cpu_count()}")
+
+
+def run(engine, spread, mode, threads, draws):
+    """threads 个线程各做 draws 次占卜，返回总吞吐量（次/秒）"""
+    if mode != 'global':
+        configure(mode)
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        generator = random if mode == 'global' else current_rng()
+        barrier.wait()
+        for _ in range(draws):
+            engine.spread_reading(spread, generator)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return threads * draws / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--draws', type=int, default=20000, help='每个线程的占卜次数')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    engine = ReadingEngine(CardManager(Config.CARDS_CSV))
+    spread = SpreadRegistry.from_file(Config.SPREADS_FILE, ['en']).get('three', 'en')
+
+    print(build_info())
+    print()
+    print("| 线程数 | " + " | ".join(MODES) + " |")
+    print("|-------|" + "|".join("------" for _ in MODES) + "|")
+    for threads in args.threads:
+        # 每种来源取3次中的最好成绩
+        rates = [max(run(engine, spread, mode, threads, args.draws) for _ in range(3))
+                 for mode in MODES]
+        print(f"| {threads} | " + " | ".join(f"{r / 1e3:,.0f} K/s" for r in rates) + " |")
+
+    # 六张牌的正逆位：逐张 choice 与一次 getrandbits
+    generator = random.Random()
+    per_card = min(timeit.repeat(lambda: [generator.choice([True, False]) for _ in range(6)],
+                                 number=100000, repeat=5)) / 100000 * 1e6
+    batched = min(timeit.repeat(lambda: orientation_bits(generator, 6),
+                                number=100000, repeat=5)) / 100000 * 1e6
+    print(f"\n六张牌正逆位: 逐张 choice {per_card:.2f} µs, getrandbits {batched:.2f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+慢客户端并发基准测试：同步 gunicorn worker 与 ASGI 模式对比
+依次启动两种部署（相同的 worker 数，均使用 gunicorn.conf.py 的预加载）：
+- sync：gunicorn 同步 worker（render.yaml 的默认部署）
+- asgi：gunicorn + uvicorn worker 运行 asgi:app
+对每种部署，N 个慢客户端（请求头分小段慢慢发送、接收缓冲区很小且每次只读一小块）反复下载牌面图片，
+同时一个正常客户端依次请求牌详情页，统计它的响应延迟和完成的请求数
+运行方式: python scripts/bench_slow_clients.py [--slow-clients 50] [--duration 10]
+需要安装 uvicorn
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+DEPLOYMENTS = {
+    'sync': ['run:app'],
+    'asgi': ['-k', 'uvicorn.workers.UvicornWorker', 'asgi:app'],
+}
+
+
+def start_server(mode, port, workers):
+    """启动一种部署，等待端口可连接"""
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+               '-b', f'127.0.0.1:{port}', '--log-level', 'warning'] + DEPLOYMENTS[mode]
+    process = subprocess.Popen(command, cwd=project_root)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{mode} 服务器未能启动")
+
+
+async def slow_client(port, path, read_size, delay, stop, counter):
+    """
+    慢速网络上的客户端，直到 stop 被设置：
+    请求头每 delay 秒发送 16 字节；响应使用很小的接收缓冲区，每次读 read_size 字节后等待 delay 秒
+    """
+    request = f'GET {path} HTTP/1.1\r\nHost: localhost\r\nUser-Agent: slow-client\r\nConnection: close\r\n\r\n'.encode()
+    while not stop.is_set():
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        # 回环接口的MSS约64 KB，内核会把发送缓冲区自动调到足以一次吞下整张图片；
+        # 使用互联网上常见的MSS，服务器端的发送缓冲区才和真实的慢速连接相当
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_MAXSEG, 1460)
+        sock.setblocking(False)
+        try:
+            await asyncio.get_running_loop().sock_connect(sock, ('127.0.0.1', port))
+            reader, writer = await asyncio.open_connection(sock=sock, limit=read_size)
+            for i in range(0, len(request), 16):
+                writer.write(request[i:i + 16])
+                await writer.drain()
+                await asyncio.sleep(delay)
+            while not stop.is_set():
+                data = await reader.read(read_size)
+                if not data:
+                    counter[0] += 1
+                    break
+                await asyncio.sleep(delay)
+            writer.close()
+        except OSError:
+            await asyncio.sleep(delay)
+
+
+async def probe(port, path, stop):
+    """正常客户端：依次请求 path，返回每次的延迟（秒）"""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), 30)
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+            await writer.drain()
+            await asyncio.wait_for(reader.read(), 30)
+            writer.close()
+        except (OSError, asyncio.TimeoutError):
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_load(port, args):
+    stop = asyncio.Event()
+    counter = [0]
+    slow = [asyncio.create_task(slow_client(port, args.image, args.read_size, args.delay, stop, counter))
+            for _ in range(args.slow_clients)]
+    await asyncio.sleep(1)
+    probe_task = asyncio.create_task(probe(port, args.page, stop))
+    await asyncio.sleep(args.duration)
+    stop.set()
+    latencies = await probe_task
+    for task in slow:
+        task.cancel()
+    await asyncio.gather(*slow, return_exceptions=True)
+    return latencies, counter[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slow-clients', type=int, default=50, help='慢客户端数')
+    parser.add_argument('--workers', type=int, default=2, help='每种部署的 worker 进程数')
+    parser.add_argument('--duration', type=float, default=10, help='每种部署的测量时长（秒）')
+    parser.add_argument('--read-size', type=int, default=2048, help='慢客户端每次读取的字节数')
+    parser.add_argument('--delay', type=float, default=0.05, help='慢客户端每次读取后的等待（秒）')
+    parser.add_argument('--image', default='/static/images/01.jpeg', help='慢客户端下载的资源')
+    parser.add_argument('--page', default='/card/the_fool', help='正常客户端请求的页面')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--modes', nargs='+', default=list(DEPLOYMENTS), choices=list(DEPLOYMENTS))
+    args = parser.parse_args()
+
+    print(f"慢客户端 {args.slow_clients} 个（每 {args.delay * 1000:.0f} ms 发送 16 字节/读 {args.read_size} 字节），"
+          f"worker {args.workers} 个，每种部署测量 {args.duration:.0f} s\n")
+    print("| 部署 | 正常请求数 | 延迟 p50 | 延迟 p95 | 延迟最大 | 完成的慢下载 |")
+    print("|------|-----------|---------|---------|---------|------------|")
+    for mode in args.modes:
+        process = start_server(mode, args.port, args.workers)
+        try:
+            latencies, downloads = asyncio.run(run_load(args.port, args))
+        finally:
+            process.terminate()
+            process.wait()
+        if latencies:
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(f"| {mode} | {len(latencies):,} | {statistics.median(latencies) * 1000:,.1f} ms | "
+                  f"{p95 * 1000:,.1f} ms | {latencies[-1] * 1000:,.1f} ms | {downloads:,} |")
+        else:
+            print(f"| {mode} | 0 | - | - | - | {downloads:,} |")
+
+
+if __name__ == '__main__':
+    main()
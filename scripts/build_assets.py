@@ -0,0 +1,54 @@
+"""
+静态资源指纹构建脚本
+为 webapp/static 下的每个文件生成带内容摘要的副本（CSS 中引用的文件替换为带摘要的文件名），
+为其中的文本文件（CSS、JS、SVG、JSON）生成预压缩的 .br/.gz（未安装 Brotli 时只有 .gz），
+写入清单 webapp/assets.json，并删除上次生成、不再使用的副本。
+应用启动时加载清单，页面中的静态文件URL带摘要，以 immutable 长期缓存返回
+在 scripts/build_images.py 之后运行（图片版本和拼图也会加上摘要）
+运行方式: python scripts/build_assets.py
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from config import Config
+from webapp.assets import build_asset_manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--static-dir', default=os.path.join(project_root, 'webapp', Config.STATIC_FOLDER),
+                        help='静态文件目录')
+    parser.add_argument('--manifest', default=str(Config.ASSET_MANIFEST), help='清单文件')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("静态资源指纹构建")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    try:
+        result = build_asset_manifest(args.static_dir, args.manifest)
+    except OSError as e:
+        print(f"[ERROR] 构建失败: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n[OK] {result['assets']} 个文件：新生成副本 {result['created']}，预压缩文件 {result['compressed']}，"
+          f"删除旧副本 {result['removed']}，耗时 {elapsed:.2f} s")
+    print(f"[OK] 清单: {args.manifest}")
+
+    print("\n" + "=" * 60)
+    print("[OK] 构建完成! 重启应用后生效")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+自托管字体与 CSS 构建脚本
+下载 Google Fonts（Cinzel、Crimson Text）和 Bootstrap 5 的 CSS/JS（结果保存在下载缓存目录，
+之后的构建不再下载），写入 webapp/static/vendor/：
+- 字体只保留模板、翻译（各语言）和牌组数据中出现的字符；
+- Bootstrap CSS 只保留网站用到的规则；
+- 为每个页面模板生成内联 CSS（该模板的代表页面首屏用到的规则）。
+应用启动时读取 vendor/manifest.json，页面内联所属模板的首屏 CSS、异步加载完整样式表，
+不再从第三方域名加载字体和 Bootstrap
+在 scripts/build_images.py 之后、scripts/build_assets.py 之前运行（生成的文件也要加上摘要）
+运行方式: python scripts/build_frontend.py [--cache-dir DIR]
+需要安装 fontTools（woff2 需要 Brotli，未安装时输出 woff）
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from webapp import create_app
+from webapp.frontend import build_frontend, font_flavor
+
+
+def _report(title, sizes):
+    before = sum(size for size, _ in sizes.values())
+    after = sum(size for _, size in sizes.values())
+    print(f"\n{title}: {before / 1024:,.1f} KiB -> {after / 1024:,.1f} KiB")
+    for name, (size, output) in sizes.items():
+        print(f"  {name}: {size / 1024:,.1f} KiB -> {output / 1024:,.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cache-dir', default=os.path.join(project_root, '.cache', 'frontend'),
+                        help='下载缓存目录（按 <域名>/<路径> 保存下载的文件）')
+    parser.add_argument('--config', default='production', help='应用配置名')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("自托管字体与 CSS 构建")
+    print("=" * 60)
+
+    try:
+        flavor = font_flavor()
+        import fontTools  # noqa: F401
+    except ImportError:
+        print("[ERROR] 未安装 fontTools: pip install fonttools brotli")
+        sys.exit(1)
+    print(f"\n字体格式: {flavor}，下载缓存: {args.cache_dir}")
+
+    app = create_app(args.config)
+    start = time.perf_counter()
+    try:
+        result = build_frontend(app, args.cache_dir)
+    except OSError as e:
+        print(f"[ERROR] 构建失败: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    _report("字体（原文件 -> 子集）", result['fonts'])
+    _report("Bootstrap CSS（原文件 -> 清理后）", result['bootstrap'])
+    _report("内联 CSS（全部样式表 -> 该模板首屏用到的规则）", result['critical'])
+
+    print("\n" + "=" * 60)
+    print(f"[OK] 构建完成，耗时 {elapsed:.2f} s! 运行 scripts/build_assets.py 并重启应用后生效")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
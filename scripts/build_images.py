@@ -0,0 +1,114 @@
+"""
+牌面图片版本构建脚本
+为各语言牌组用到的每张牌面图片生成缩略图（150px）和中等尺寸（300px），
+各有 AVIF（Pillow 支持时）、WebP、JPEG 三种格式，写入 webapp/static/variants/ 并生成 manifest.json；
+模板据此输出 srcset/sizes。源图片未变化时跳过
+同时为每个牌组生成牌库页的缩略图拼图（webapp/static/atlas/），
+以及包含该牌组全部牌面图片和图片版本的图片包（Config.IMAGE_PACK_DIR），并删除不再使用的拼图和图片包
+运行方式: python scripts/build_images.py [--jobs 4] [--force]
+需要安装 Pillow
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from webapp import create_app, routes
+from webapp.atlas import CardAtlases, remove_stale_atlases
+from webapp.imagepack import build_pack, remove_stale_packs
+from webapp.images import VARIANT_WIDTHS, ImageVariants, available_formats, build_variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='并行进程数')
+    parser.add_argument('--force', action='store_true', help='忽略上次的清单，全部重新生成')
+    parser.add_argument('--config', default='production', help='应用配置名')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("牌面图片版本构建")
+    print("=" * 60)
+
+    try:
+        formats = available_formats()
+    except ImportError:
+        print("[ERROR] 未安装 Pillow: pip install Pillow")
+        sys.exit(1)
+
+    app = create_app(args.config)
+    catalog = routes.deck_reloader.current
+    filenames = {card['image'] for locale in app.config['BABEL_SUPPORTED_LOCALES']
+                 for card in catalog.manager(locale).get_all_cards()}
+    print(f"\n图片: {len(filenames)} 张，尺寸: "
+          f"{', '.join(f'{name} {width}px' for name, width in VARIANT_WIDTHS.items())}，"
+          f"格式: {', '.join(formats)}，进程数: {args.jobs}")
+
+    start = time.perf_counter()
+    try:
+        result = build_variants(app.static_folder, filenames, args.jobs, args.force)
+    except OSError as e:
+        print(f"[ERROR] 构建失败: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"[OK] {result['images']} 张：生成 {result['rendered']}，未变化跳过 {result['skipped']}，"
+          f"删除旧文件 {result['removed']}，耗时 {elapsed:.2f} s")
+
+    start = time.perf_counter()
+    atlases = CardAtlases(app.static_folder)
+    managers = [catalog.manager(locale) for locale in app.config['BABEL_SUPPORTED_LOCALES']]
+    for manager in managers:
+        atlases.for_deck(manager)
+    atlases.wait()
+    keys = set()
+    for manager in managers:
+        atlas = atlases.for_deck(manager)
+        if atlas is None:
+            print("[ERROR] 拼图生成失败")
+            sys.exit(1)
+        keys.add(atlas.key)
+    removed = remove_stale_atlases(app.static_folder, keys)
+    elapsed = time.perf_counter() - start
+    print(f"[OK] 拼图 {len(keys)} 套（{len(managers)} 个牌组）：生成 {atlases.builds}，"
+          f"删除旧文件 {removed}，耗时 {elapsed:.2f} s")
+
+    pack_dir = app.config.get('IMAGE_PACK_DIR')
+    if pack_dir:
+        start = time.perf_counter()
+        variants = ImageVariants.load(app.static_folder)
+        keys = set()
+        built = 0
+        for manager in managers:
+            images = set()
+            for card in manager.get_all_cards():
+                images.add(card['image'])
+                entry = variants.get(card['image'])
+                if entry is not None:
+                    images.update(f['file'] for variant in entry['variants'] for f in variant['files'].values())
+            try:
+                key, created = build_pack(app.static_folder, images, pack_dir)
+            except OSError as e:
+                print(f"[ERROR] 图片包生成失败: {e}")
+                sys.exit(1)
+            keys.add(key)
+            built += created
+        removed = remove_stale_packs(pack_dir, keys)
+        size = sum((pack_dir / f'{key}.pack').stat().st_size for key in keys)
+        elapsed = time.perf_counter() - start
+        print(f"[OK] 图片包 {len(keys)} 个（{size / 1024 / 1024:,.1f} MiB）：生成 {built}，"
+              f"删除旧文件 {removed}，耗时 {elapsed:.2f} s")
+
+    print("\n" + "=" * 60)
+    print("[OK] 构建完成! 重启应用后生效")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+快照构建脚本
+将每个语言的卡牌CSV预编译为二进制快照，供worker启动时快速加载
+运行方式: python scripts/build_snapshots.py
+"""
+import os
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from config import Config
+from webapp.catalog import discover_locale_sources
+from webapp.models import CardManager
+from webapp.permalink import DeckVersions
+from webapp.snapshot import compile_snapshot, load_snapshot, snapshot_path_for
+
+
+def main():
+    print("=" * 60)
+    print("卡牌快照构建工具")
+    print("=" * 60)
+
+    configured = {'en': Config.CARDS_CSV, 'zh': Config.CARDS_CSV_ZH}
+    configured.update(Config.CARDS_CSV_LOCALES)
+    sources = discover_locale_sources(Config.DATA_DIR, configured)
+    versions = DeckVersions(Config.DECK_VERSIONS_FILE)
+    for lang, csv_path in sources.items():
+        if not csv_path.exists():
+            print(f"\n[ERROR] CSV文件不存在: {csv_path}")
+            sys.exit(1)
+
+        target = snapshot_path_for(csv_path, Config.SNAPSHOT_DIR)
+        print(f"\n正在编译 [{lang}]: {csv_path.name} -> {target}")
+        try:
+            compile_snapshot(csv_path, target)
+        except Exception as e:
+            print(f"[ERROR] 编译失败: {e}")
+            sys.exit(1)
+
+        # 回读校验
+        start = time.perf_counter()
+        cards = load_snapshot(csv_path, target)
+        elapsed = (time.perf_counter() - start) * 1000
+        if cards is None:
+            print("[ERROR] 快照回读校验失败")
+            sys.exit(1)
+
+        print(f"[OK] {len(cards)} 张牌，{os.path.getsize(target) / 1024:.2f} KB，"
+              f"加载耗时 {elapsed:.2f} ms")
+
+        # 登记牌组版本，保证数据更新后旧的占卜永久链接仍可还原
+        version = versions.version_of(CardManager(csv_path, target))
+        print(f"[OK] 牌组版本 {version:08x}")
+
+    print("\n" + "=" * 60)
+    print("[OK] 快照构建完成!")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
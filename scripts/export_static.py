@@ -0,0 +1,57 @@
+"""
+静态站点导出脚本
+把首页、牌库和所有牌详情页按每种语言渲染为静态文件（附带预压缩版本），
+并生成 manifest.json 和 nginx 配置片段（nginx/maps.conf、nginx/locations.conf）。
+只重新渲染输入有变化的页面；占卜页不导出
+运行方式: python scripts/export_static.py [--output site] [--jobs 4] [--force]
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from webapp import create_app
+from webapp.export import encodings, export_site
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=os.path.join(project_root, 'site'), help='输出目录')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='并行进程数')
+    parser.add_argument('--force', action='store_true', help='忽略上次导出的清单，全部重新渲染')
+    parser.add_argument('--config', default='production', help='应用配置名')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("静态站点导出")
+    print("=" * 60)
+
+    app = create_app(args.config)
+    print(f"\n语言: {', '.join(app.config['BABEL_SUPPORTED_LOCALES'])}，"
+          f"预压缩: {', '.join(encodings())}，进程数: {args.jobs}")
+
+    start = time.perf_counter()
+    try:
+        result = export_site(app, args.output, args.config, args.jobs, args.force, project_root)
+    except RuntimeError as e:
+        print(f"[ERROR] 导出失败: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"[OK] {result['pages']} 页：渲染 {result['rendered']}，未变化跳过 {result['skipped']}，"
+          f"删除 {result['removed']}，耗时 {elapsed:.2f} s")
+    print(f"[OK] 输出目录: {args.output}")
+
+    print("\n" + "=" * 60)
+    print("[OK] 导出完成! nginx 配置见输出目录下的 nginx/")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Gunicorn worker内存测量脚本
+分别以预加载/非预加载模式启动 1、4、16 个worker，预热后读取每个worker的
+/proc/<pid>/smaps_rollup，对比 RSS、PSS 和私有脏页（仅支持Linux）
+运行方式: python scripts/measure_worker_rss.py [--workers 1 4 16]
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+# 项目根目录
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
+# 预热时访问的页面（覆盖两种语言的牌组）
+WARMUP_PATHS = ['/', '/browse', '/card/the_magician', '/three-cards', '/six-cards']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def child_pids(pid):
+    """获取进程的直接子进程"""
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def smaps_rollup(pid):
+    """读取 smaps_rollup，返回 {字段: KiB}"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1).read()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def measure(workers, preload):
+    """启动gunicorn并测量，返回每个worker的平均值（KiB）"""
+    port = free_port()
+    env = dict(os.environ, GUNICORN_PRELOAD='1' if preload else '0')
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+         '-w', str(workers), '-b', f'127.0.0.1:{port}', 'run:app'],
+        cwd=project_root, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_ready(port):
+            raise RuntimeError('gunicorn did not start')
+        # 等待所有worker启动
+        deadline = time.time() + 30
+        while len(child_pids(proc.pid)) < workers and time.time() < deadline:
+            time.sleep(0.2)
+        # 预热：每个worker都处理若干请求
+        for _ in range(workers * 10):
+            for path in WARMUP_PATHS:
+                for lang in ('en', 'zh'):
+                    request = urllib.request.Request(f'http://127.0.0.1:{port}{path}',
+                                                     headers={'Accept-Language': lang})
+                    urllib.request.urlopen(request).read()
+        time.sleep(0.5)
+
+        pids = child_pids(proc.pid)
+        stats = [smaps_rollup(pid) for pid in pids]
+        fields = ('Rss', 'Pss', 'Private_Dirty', 'Shared_Clean', 'Shared_Dirty')
+        return {field: sum(s.get(field, 0) for s in stats) / len(stats) for field in fields}
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    print("| worker数 | 预加载 | RSS/worker | PSS/worker | Private_Dirty/worker | PSS合计 |")
+    print("|---------|--------|-----------|-----------|---------------------|---------|")
+    for workers in args.workers:
+        for preload in (False, True):
+            stats = measure(workers, preload)
+            print(f"| {workers} | {'是' if preload else '否'} | "
+                  f"{stats['Rss'] / 1024:.1f} MiB | {stats['Pss'] / 1024:.1f} MiB | "
+                  f"{stats['Private_Dirty'] / 1024:.1f} MiB | "
+                  f"{stats['Pss'] * workers / 1024:.1f} MiB |")
+
+
+if __name__ == '__main__':
+    main()
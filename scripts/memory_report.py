@@ -0,0 +1,85 @@
+"""
+卡牌内存占用报告
+对比 dict 记录（旧方案）与共享 CardBase 的 Card 记录（新方案）的内存占用，
+分别测量真实的 78 张双语牌组与合成的 10 万张双语牌组
+运行方式: python scripts/memory_report.py [--synthetic 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from config import Config
+from webapp.models import Card, CARD_FIELDS
+from webapp.snapshot import load_snapshot, read_csv_records
+
+
+def load_records(csv_path):
+    """读取单个语言的字典记录"""
+    records = load_snapshot(csv_path)
+    if records is None:
+        _, records = read_csv_records(csv_path)
+    return records
+
+
+def synthetic_records(records, count):
+    """
+    生成合成牌组：循环复制真实记录，每张牌的字符串都是新对象
+    （模拟逐行解析出的数据，两种语言的共享字段取值相同但互不共享）
+    """
+    for i in range(count):
+        record = records[i % len(records)]
+        yield {
+            field: f"{value}~{i}" if field in ('url', 'name') else
+            (value + ' ')[:-1] if isinstance(value, str) else value
+            for field, value in record.items()
+        }
+
+
+def measure(build):
+    """测量 build() 返回的对象常驻内存（字节）"""
+    gc.collect()
+    tracemalloc.start()
+    deck = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del deck
+    return current
+
+
+def report(label, locale_records):
+    """输出一组对比结果"""
+    dict_bytes = measure(lambda: [[dict(r) for r in records()] for records in locale_records])
+    card_bytes = measure(lambda: [[Card.from_record(r) for r in records()] for records in locale_records])
+    count = sum(1 for _ in locale_records[0]())
+    print(f"| {label} | {count:,} | {dict_bytes / 1024:,.1f} KiB | "
+          f"{card_bytes / 1024:,.1f} KiB | {1 - card_bytes / dict_bytes:.1%} |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--synthetic', type=int, default=100000, help='合成牌组的牌数')
+    args = parser.parse_args()
+
+    en = load_records(Config.CARDS_CSV)
+    zh = load_records(Config.CARDS_CSV_ZH)
+    assert tuple(en[0]) == CARD_FIELDS
+
+    print("| 牌组 | 每种语言牌数 | dict (en+zh) | Card (en+zh) | 节省 |")
+    print("|------|-------------|--------------|--------------|------|")
+    # 真实牌组：每次从快照重新读取，保证字符串是独立对象
+    report('78张真实牌组', [lambda: load_records(Config.CARDS_CSV),
+                       lambda: load_records(Config.CARDS_CSV_ZH)])
+    report('合成牌组', [lambda: synthetic_records(en, args.synthetic),
+                    lambda: synthetic_records(zh, args.synthetic)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+抽牌公平性与吞吐量验证
+对每种语言、每种布局通过 ReadingEngine 生成大量占卜，检验：
+- 牌的均匀性：每张牌被抽中的次数（卡方拟合优度，所有位置合计及逐个位置）
+- 逆位配额：固定逆位张数的布局每次都必须严格满足（如三卡2正1逆）
+- 逆位的位置均匀性：逆位落在各位置的次数（卡方）；独立正逆位的布局检验每个位置各占一半
+并测量每秒占卜次数。结果写入JSON，任一检验不通过时以非零状态退出，可直接用于CI
+运行方式: python scripts/verify_draws.py [--readings 200000] [--output draw_report.json]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+# 添加项目根目录到sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, project_root)
+
+from config import Config
+from webapp.catalog import CardCatalog, discover_locale_sources
+from webapp.rng import current_rng
+from webapp.spreads import SpreadRegistry
+
+
+def chi2_sf(statistic, df):
+    """
+    卡方分布的上尾概率 P(X >= statistic)，即正则化上不完全伽马函数 Q(df/2, statistic/2)
+    （不依赖 scipy：x < a+1 时用级数，否则用连分式）
+    """
+    a, x = df / 2.0, statistic / 2.0
+    if x <= 0:
+        return 1.0
+    log_prefactor = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(10000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefactor))
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefactor) * h
+
+
+def chi2_test(name, observed, expected):
+    """
+    卡方拟合优度检验
+
+    Args:
+        name (str): 检验名称
+        observed (list): 观测次数
+        expected (list|float): 期望次数（单个数值表示各项相同）
+
+    Returns:
+        dict: 检验结果
+    """
+    if not isinstance(expected, list):
+        expected = [expected] * len(observed)
+    statistic = sum((o - e) ** 2 / e for o, e in zip(observed, expected))
+    df = len(observed) - 1
+    return {'name': name, 'statistic': round(statistic, 3), 'df': df,
+            'p_value': chi2_sf(statistic, df)}
+
+
+def verify_spread(engine, spread, readings, rng):
+    """
+    生成 readings 次占卜并统计
+
+    Returns:
+        dict: 检验结果（不含是否通过的判定）
+    """
+    cards = engine.card_manager.get_all_cards()
+    deck_size = len(cards)
+    index = {id(card): i for i, card in enumerate(cards)}
+    size = spread.size
+    position_counts = [[0] * deck_size for _ in range(size)]
+    reversed_by_position = [0] * size
+    quota_violations = 0
+
+    spread_reading = engine.spread_reading
+    start = time.perf_counter()
+    for _ in range(readings):
+        reversed_total = 0
+        for position, placement in enumerate(spread_reading(spread, rng)):
+            position_counts[position][index[id(placement.card)]] += 1
+            if placement.reversed:
+                reversed_by_position[position] += 1
+                reversed_total += 1
+        if spread.reversed_count is not None and reversed_total != spread.reversed_count:
+            quota_violations += 1
+    elapsed = time.perf_counter() - start
+
+    # 只计生成耗时：单独再跑一轮不做统计的占卜
+    timing_readings = min(readings, 50000)
+    start = time.perf_counter()
+    for _ in range(timing_readings):
+        spread_reading(spread, rng)
+    rate = timing_readings / (time.perf_counter() - start)
+
+    totals = [sum(counts[i] for counts in position_counts) for i in range(deck_size)]
+    tests = [chi2_test('cards', totals, readings * size / deck_size)]
+    if size > 1:
+        for position, counts in enumerate(position_counts):
+            tests.append(chi2_test(f'cards@position{position + 1}', counts, readings / deck_size))
+
+    if spread.reversed_count is None:
+        # 独立正逆位：每个位置逆位与正位各占一半
+        for position, count in enumerate(reversed_by_position):
+            tests.append(chi2_test(f'orientation@position{position + 1}',
+                                   [count, readings - count], readings / 2))
+    elif 0 < spread.reversed_count < size:
+        tests.append(chi2_test('reversed_positions', reversed_by_position,
+                               readings * spread.reversed_count / size))
+
+    return {
+        'readings': readings,
+        'cards_per_reading': size,
+        'reversed_quota': spread.reversed_count,
+        'quota_violations': quota_violations,
+        'readings_per_second': round(rate),
+        'elapsed_seconds': round(elapsed, 3),
+        'tests': tests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readings', type=int, default=200000, help='每种语言、每种布局的占卜次数')
+    parser.add_argument('--locales', nargs='+', help='只检验这些语言（默认全部）')
+    parser.add_argument('--spreads', nargs='+', help='只检验这些布局（默认全部）')
+    parser.add_argument('--alpha', type=float, default=0.001,
+                        help='整体显著性水平（按检验总数做 Bonferroni 校正）')
+    parser.add_argument('--min-rate', type=float, default=0, help='每秒占卜次数下限，低于时判定失败')
+    parser.add_argument('--seed', type=int, help='随机种子（默认使用应用的随机数来源）')
+    parser.add_argument('--output', default='draw_report.json', help='JSON结果文件')
+    args = parser.parse_args()
+
+    configured = {'en': Config.CARDS_CSV, 'zh': Config.CARDS_CSV_ZH}
+    configured.update(Config.CARDS_CSV_LOCALES)
+    sources = discover_locale_sources(Config.DATA_DIR, configured)
+    locales = args.locales or list(sources)
+    catalog = CardCatalog(sources, Config.BABEL_DEFAULT_LOCALE, Config.SNAPSHOT_DIR)
+    registry = SpreadRegistry.from_file(Config.SPREADS_FILE, locales,
+                                        Config.BABEL_TRANSLATION_DIRECTORIES.split(';'))
+
+    print("=" * 60)
+    print("抽牌公平性与吞吐量验证")
+    print("=" * 60)
+
+    results = []
+    for locale in locales:
+        engine = catalog.engine(locale)
+        for name, spread in registry.for_locale(locale).items():
+            if args.spreads and name not in args.spreads:
+                continue
+            rng = random.Random(f'{args.seed}:{locale}:{name}') if args.seed is not None else current_rng()
+            print(f"\n[{locale}] {name}: {args.readings:,} 次占卜 ...")
+            result = verify_spread(engine, spread, args.readings, rng)
+            result.update(locale=locale, spread=name)
+            results.append(result)
+            min_p = min(test['p_value'] for test in result['tests'])
+            print(f"  {result['readings_per_second']:,} 次/秒，逆位配额违例 {result['quota_violations']}，"
+                  f"最小 p 值 {min_p:.4g}")
+
+    # Bonferroni 校正后的单项显著性水平
+    test_count = sum(len(result['tests']) for result in results)
+    threshold = args.alpha / max(test_count, 1)
+    passed = True
+    for result in results:
+        for test in result['tests']:
+            test['passed'] = test['p_value'] >= threshold
+        result['passed'] = (result['quota_violations'] == 0
+                            and all(test['passed'] for test in result['tests'])
+                            and result['readings_per_second'] >= args.min_rate)
+        passed = passed and result['passed']
+
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': f"{platform.python_implementation()} {platform.python_version()}",
+        'readings_per_spread': args.readings,
+        'alpha': args.alpha,
+        'test_count': test_count,
+        'per_test_threshold': threshold,
+        'min_rate': args.min_rate,
+        'seed': args.seed,
+        'passed': passed,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    for result in results:
+        if not result['passed']:
+            failed = [t['name'] for t in result['tests'] if not t['passed']]
+            print(f"[FAIL] [{result['locale']}] {result['spread']}: 配额违例 {result['quota_violations']}，"
+                  f"未通过检验 {failed or '-'}，{result['readings_per_second']:,} 次/秒")
+    print(f"[{'OK' if passed else 'FAIL'}] {len(results)} 组，{test_count} 项检验，结果已写入 {args.output}")
+    print("=" * 60)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+测试JSON API
+"""
+import json
+import unittest
+from webapp import create_app, api
+
+
+class TestApi(unittest.TestCase):
+    """测试 /api/v1"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+    def test_card_list(self):
+        """测试牌列表默认只含摘要字段"""
+        response = self.client.get('/api/v1/cards')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        payload = response.get_json()
+        self.assertEqual(payload['count'], 78)
+        self.assertEqual(tuple(payload['data'][0]), api.LIST_FIELDS)
+        self.assertNotIn('meditation', payload['data'][0])
+
+    def test_fields_projection(self):
+        """测试 ?fields= 选择字段"""
+        payload = self.client.get('/api/v1/cards?fields=name,desc').get_json()
+        self.assertEqual(set(payload['data'][0]), {'name', 'desc'})
+        response = self.client.get('/api/v1/cards?fields=name,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['status'], 'error')
+
+    def test_locale(self):
+        """测试 ?locale= 和 Accept-Language 选择语言"""
+        payload = self.client.get('/api/v1/cards/the_magician?locale=zh').get_json()
+        self.assertEqual(payload['data']['name'], '魔术师')
+        payload = self.client.get('/api/v1/cards/the_magician',
+                                  headers={'Accept-Language': 'zh-CN'}).get_json()
+        self.assertEqual(payload['locale'], 'zh')
+        self.assertEqual(self.client.get('/api/v1/cards?locale=xx').status_code, 400)
+
+    def test_card_detail(self):
+        """测试单张牌默认含全部字段"""
+        payload = self.client.get('/api/v1/cards/the_fool').get_json()
+        self.assertEqual(tuple(payload['data']), api.API_CARD_FIELDS)
+        self.assertEqual(payload['data']['image_url'], '/static/' + payload['data']['image'])
+        self.assertEqual(self.client.get('/api/v1/cards/no_such_card').status_code, 404)
+
+    def test_conditional_get(self):
+        """测试ETag与304"""
+        response = self.client.get('/api/v1/cards?locale=en')
+        etag = response.headers['ETag']
+        cached = self.client.get('/api/v1/cards?locale=en', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        other = self.client.get('/api/v1/cards?locale=zh')
+        self.assertNotEqual(other.headers['ETag'], etag)
+
+    def test_reading(self):
+        """测试占卜：指定种子时结果可重现并附带永久链接"""
+        first = self.client.get('/api/v1/readings/celtic-cross?seed=7')
+        second = self.client.get('/api/v1/readings/celtic-cross?seed=7')
+        self.assertEqual(first.data, second.data)
+        self.assertIn('max-age', first.headers['Cache-Control'])
+        data = first.get_json()['data']
+        self.assertEqual(len(data['cards']), 10)
+        self.assertEqual(sum(card['reversed'] for card in data['cards']), 3)
+        self.assertEqual(self.client.get(data['permalink']).status_code, 200)
+
+        response = self.client.get('/api/v1/readings/three')
+        self.assertIn('no-store', response.headers['Cache-Control'])
+        self.assertEqual(self.client.get('/api/v1/readings/nope').status_code, 404)
+        self.assertEqual(self.client.get('/api/v1/readings/three?seed=-1').status_code, 400)
+
+    def test_bulk_readings(self):
+        """测试批量占卜以NDJSON流式返回，同一种子结果相同"""
+        response = self.client.get('/api/v1/readings/three/bulk?count=150&seed=5&fields=name')
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(response.headers['X-Reading-Seed'], '5')
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), 150)
+        first = json.loads(lines[0])
+        self.assertEqual(len(first['cards']), 3)
+        self.assertEqual(set(first['cards'][0]['card']), {'name'})
+        self.assertEqual(self.client.get(first['permalink']).status_code, 200)
+
+        again = self.client.get('/api/v1/readings/three/bulk?count=150&seed=5&fields=name')
+        self.assertEqual(again.data, response.data)
+
+    def test_bulk_readings_chunked(self):
+        """测试按块输出"""
+        response = self.client.get('/api/v1/readings/one/bulk?count=%d' % (api.BULK_CHUNK_READINGS * 2 + 1),
+                                   buffered=False)
+        chunks = list(response.response)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0].count(b'\n'), api.BULK_CHUNK_READINGS)
+
+    def test_bulk_readings_limits(self):
+        """测试占卜数超出范围时返回400"""
+        self.assertEqual(self.client.get('/api/v1/readings/three/bulk').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/readings/three/bulk?count=0').status_code, 400)
+        limit = self.app.config['BULK_READINGS_MAX']
+        response = self.client.get(f'/api/v1/readings/three/bulk?count={limit + 1}')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/readings/nope/bulk?count=1').status_code, 404)
+
+    def test_dumps_compact(self):
+        """测试紧凑编码且不转义非ASCII字符"""
+        self.assertEqual(api.dumps({'a': [1, '塔罗']}), '{"a":[1,"塔罗"]}'.encode('utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
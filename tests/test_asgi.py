@@ -0,0 +1,104 @@
+"""
+测试ASGI适配器
+"""
+import asyncio
+import unittest
+from webapp.asgi import AsgiApp, build_environ, create_asgi_app
+
+
+def call(app, path, query=b'', headers=(), method='GET'):
+    """
+    用 asyncio 直接调用 ASGI 应用
+
+    Returns:
+        tuple: (状态码, 响应头字典, 响应体, 响应体消息数)
+    """
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query,
+        'headers': list(headers), 'http_version': '1.1', 'scheme': 'http',
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000), 'root_path': '',
+    }
+    messages = [{'type': 'http.request', 'body': b''}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, bodies = sent[0], sent[1:]
+    assert not bodies[-1].get('more_body')
+    return (start['status'], dict(start['headers']),
+            b''.join(message['body'] for message in bodies), len(bodies))
+
+
+class TestAsgiApp(unittest.TestCase):
+    """测试AsgiApp"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_asgi_app('testing')
+
+    def test_page(self):
+        """测试页面与同步部署相同"""
+        status, headers, body, _ = call(self.app, '/card/the_fool', headers=[(b'accept-language', b'zh')])
+        self.assertEqual(status, 200)
+        expected = self.app.flask_app.test_client().get('/card/the_fool', headers={'Accept-Language': 'zh'})
+        self.assertEqual(body, expected.data)
+        self.assertEqual(headers[b'etag'], expected.headers['ETag'].encode())
+
+    def test_not_found(self):
+        """测试404"""
+        status, _, _, _ = call(self.app, '/card/no_such_card')
+        self.assertEqual(status, 404)
+
+    def test_static_file_chunks(self):
+        """测试静态文件分块发送"""
+        status, headers, body, messages = call(self.app, '/static/images/01.jpeg')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body), int(headers[b'content-length']))
+        self.assertGreater(messages, 1)
+
+    def test_streamed_response(self):
+        """测试流式响应（生成器在线程池中逐块执行，需要请求上下文）"""
+        status, _, body, messages = call(self.app, '/api/v1/readings/one/bulk', b'count=200&seed=3')
+        self.assertEqual(status, 200)
+        self.assertEqual(body.count(b'\n'), 200)
+        self.assertGreater(messages, 2)
+
+    def test_lifespan(self):
+        """测试lifespan协议"""
+        app = AsgiApp(self.app.flask_app, threads=1)
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(app({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+
+
+class TestBuildEnviron(unittest.TestCase):
+    """测试build_environ"""
+
+    def test_environ(self):
+        """测试路径、查询字符串和请求头的转换"""
+        environ = build_environ({
+            'method': 'GET', 'path': '/card/é', 'query_string': b'a=1',
+            'headers': [(b'accept', b'text/html'), (b'accept', b'*/*'), (b'content-type', b'text/plain')],
+            'root_path': '',
+        }, b'')
+        self.assertEqual(environ['PATH_INFO'], '/card/é'.encode('utf-8').decode('latin-1'))
+        self.assertEqual(environ['QUERY_STRING'], 'a=1')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,*/*')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+
+
+if __name__ == '__main__':
+    unittest.main()
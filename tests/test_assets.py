@@ -0,0 +1,107 @@
+"""
+测试静态资源指纹
+"""
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from webapp import create_app
+from webapp.assets import ASSET_MAX_AGE, build_asset_manifest, hashed_name, init_assets
+
+
+class TestAssetManifest(unittest.TestCase):
+    """测试build_asset_manifest"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.static_dir = self.root / 'static'
+        (self.static_dir / 'css').mkdir(parents=True)
+        (self.static_dir / 'images').mkdir()
+        (self.static_dir / 'images/bg.png').write_bytes(b'png-1')
+        (self.static_dir / 'css/style.css').write_text(
+            "body { background: url('../images/bg.png') }\n"
+            ".x { background: url(data:image/png;base64,AAAA) }\n", encoding='utf-8')
+        self.manifest_path = self.root / 'assets.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def build(self):
+        result = build_asset_manifest(self.static_dir, self.manifest_path)
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return result, json.load(f)['assets']
+
+    def test_hashed_name(self):
+        """测试摘要插入在扩展名之前"""
+        self.assertEqual(hashed_name('css/style.css', '0123456789abcdef'), 'css/style.0123456789ab.css')
+
+    def test_build(self):
+        """测试副本内容与原文件相同，CSS 中的引用替换为带摘要的文件名"""
+        result, assets = self.build()
+        self.assertEqual((result['assets'], result['created']), (2, 2))
+        image = assets['images/bg.png']
+        self.assertRegex(image, r'^images/bg\.[0-9a-f]{12}\.png$')
+        self.assertEqual((self.static_dir / image).read_bytes(), b'png-1')
+        css = (self.static_dir / assets['css/style.css']).read_text(encoding='utf-8')
+        self.assertIn(f"url('../{image}')", css)
+        self.assertIn('url(data:image/png;base64,AAAA)', css)
+
+    def test_incremental(self):
+        """测试重复构建不处理副本本身；引用的图片变化时CSS的文件名也变化，旧副本被删除"""
+        _, first = self.build()
+        result, again = self.build()
+        self.assertEqual((result['assets'], result['created'], result['removed']), (2, 0, 0))
+        self.assertEqual(again, first)
+
+        (self.static_dir / 'images/bg.png').write_bytes(b'png-2')
+        result, changed = self.build()
+        self.assertEqual((result['created'], result['removed']), (2, 2))
+        self.assertNotEqual(changed['css/style.css'], first['css/style.css'])
+        self.assertFalse((self.static_dir / first['images/bg.png']).exists())
+
+
+class TestHashedUrls(unittest.TestCase):
+    """测试url_for输出带摘要的文件名及其缓存头"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.root = Path(tempfile.mkdtemp())
+        (cls.root / 'static/css').mkdir(parents=True)
+        (cls.root / 'static/css/style.css').write_text('body {}', encoding='utf-8')
+        build_asset_manifest(cls.root / 'static', cls.root / 'assets.json')
+
+        cls.app = create_app('testing')
+        cls.app.static_folder = str(cls.root / 'static')
+        cls.app.config['ASSET_MANIFEST'] = cls.root / 'assets.json'
+        init_assets(cls.app)
+        cls.client = cls.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def test_url_for(self):
+        """测试页面中的静态文件URL带摘要"""
+        html = self.client.get('/').get_data(as_text=True)
+        self.assertRegex(html, r'href="/static/css/style\.[0-9a-f]{12}\.css"')
+
+    def test_immutable(self):
+        """测试带摘要的文件长期缓存，原文件名不变"""
+        with self.app.test_request_context():
+            from flask import url_for
+            url = url_for('static', filename='css/style.css')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.cache_control.immutable)
+        self.assertEqual(response.cache_control.max_age, ASSET_MAX_AGE)
+        self.assertFalse(response.cache_control.no_cache)
+        response.close()
+
+        response = self.client.get('/static/css/style.css')
+        self.assertFalse(response.cache_control.immutable)
+        response.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
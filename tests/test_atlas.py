@@ -0,0 +1,139 @@
+"""
+测试牌库缩略图拼图
+"""
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from webapp import create_app, routes
+from webapp.atlas import ATLAS_DIR, CardAtlas, CardAtlases, remove_stale_atlases
+
+try:
+    from PIL import Image
+except ImportError:  # 可选依赖：未安装 Pillow 时跳过生成测试
+    Image = None
+
+
+class TestCardAtlas(unittest.TestCase):
+    """测试坐标表"""
+
+    def setUp(self):
+        files = [(1, [('webp', 'atlas/k.1x.webp')]), (2, [('avif', 'atlas/k.2x.avif'), ('webp', 'atlas/k.2x.webp')])]
+        self.atlas = CardAtlas('k', 3, 2, 150, 282, files, ['a', 'b', 'c', 'd'])
+
+    def test_position(self):
+        """测试背景定位百分比"""
+        self.assertEqual(self.atlas.position('a'), '0% 0%')
+        self.assertEqual(self.atlas.position('b'), '50% 0%')
+        self.assertEqual(self.atlas.position('d'), '0% 100%')
+        self.assertIsNone(self.atlas.position('x'))
+
+    def test_sources(self):
+        """测试image-set各项与后备文件"""
+        self.assertEqual(self.atlas.sources[1], (2, 'avif', 'atlas/k.2x.avif'))
+        self.assertEqual(self.atlas.fallback, 'atlas/k.1x.webp')
+
+
+@unittest.skipIf(Image is None, "需要 Pillow")
+class TestCardAtlases(unittest.TestCase):
+    """测试CardAtlases"""
+
+    def setUp(self):
+        self.static_dir = Path(tempfile.mkdtemp())
+        (self.static_dir / 'images').mkdir()
+        self.names = []
+        for i, color in enumerate(['red', 'green', 'blue']):
+            self.save(f'images/{i}.jpeg', color)
+            self.names.append(f'images/{i}.jpeg')
+
+    def tearDown(self):
+        shutil.rmtree(self.static_dir)
+
+    def save(self, name, color):
+        Image.new('RGB', (200, 376), color).save(self.static_dir / name, 'JPEG')
+
+    def build(self, atlases, names):
+        self.assertIsNone(atlases.for_images(names))
+        atlases.wait()
+        return atlases.for_images(names)
+
+    def test_build_in_background(self):
+        """测试后台生成：完成前返回None，完成后调用回调并返回拼图"""
+        atlases = CardAtlases(self.static_dir)
+        built = []
+        atlases.add_listener(built.append)
+        atlas = self.build(atlases, self.names)
+        self.assertEqual(built, [atlas])
+        self.assertEqual((atlas.columns, atlas.rows, atlas.tile_width, atlas.tile_height), (3, 1, 150, 282))
+        for scale, fmt, file in atlas.sources:
+            with Image.open(self.static_dir / file) as image:
+                self.assertEqual(image.size, (3 * min(150 * scale, 200), image.size[1]))
+                self.assertEqual(image.format, fmt.upper())
+        # 其他进程直接读取已生成的拼图
+        other = CardAtlases(self.static_dir, autobuild=False)
+        self.assertEqual(other.for_images(self.names).key, atlas.key)
+        self.assertEqual(other.builds, 0)
+
+    def test_regenerated_on_change(self):
+        """测试牌组顺序或图片内容改变时生成新拼图"""
+        atlases = CardAtlases(self.static_dir)
+        first = self.build(atlases, self.names)
+        reordered = self.build(atlases, self.names[::-1])
+        self.assertNotEqual(reordered.key, first.key)
+        self.assertEqual(reordered.position('images/2.jpeg'), '0% 0%')
+        self.save('images/0.jpeg', 'white')
+        changed = self.build(atlases, self.names)
+        self.assertNotIn(changed.key, (first.key, reordered.key))
+        self.assertEqual(atlases.builds, 3)
+
+        removed = remove_stale_atlases(self.static_dir, {changed.key})
+        self.assertGreater(removed, 0)
+        remaining = {path.name.split('.')[0] for path in (self.static_dir / ATLAS_DIR).iterdir()}
+        self.assertEqual(remaining, {changed.key})
+
+    def test_no_autobuild(self):
+        """测试不自动生成时返回None"""
+        atlases = CardAtlases(self.static_dir, autobuild=False)
+        self.assertIsNone(atlases.for_images(self.names))
+        atlases.wait()
+        self.assertFalse((self.static_dir / ATLAS_DIR).exists())
+
+
+    def test_digest_failure(self):
+        """测试计算图片摘要失败时返回None（牌库页逐张输出图片）"""
+        atlases = CardAtlases(self.static_dir, autobuild=False)
+
+        def fail(filename):
+            raise ValueError(filename)
+        atlases._digest = fail
+        with self.assertLogs('webapp.atlas', 'ERROR'):
+            self.assertIsNone(atlases.for_images(self.names))
+
+
+class TestBrowseAtlas(unittest.TestCase):
+    """测试牌库页使用拼图"""
+
+    def test_browse(self):
+        """测试有拼图时每张牌为拼图中的一格，没有时为单独的图片"""
+        app = create_app('testing')
+        client = app.test_client()
+        cards = routes.deck_reloader.current.manager('en').get_all_cards()
+        files = [(1, [('avif', 'atlas/k.1x.avif'), ('webp', 'atlas/k.1x.webp')])]
+        atlas = CardAtlas('k', 13, 6, 150, 282, files, [card['image'] for card in cards])
+        stub = CardAtlases(app.static_folder, autobuild=False)
+        stub.for_deck = lambda manager: atlas
+        routes.card_atlases = stub
+        html = client.get('/browse').get_data(as_text=True)
+        self.assertIn('background-size: 1300% 600%;', html)
+        self.assertIn('url("/static/atlas/k.1x.avif") type("image/avif") 1x,', html)
+        self.assertIn(f'aria-label="{cards[1]["name"]}" style="background-position: 8.33333% 0%;"', html)
+        self.assertEqual(html.count('class="card-sprite'), 156)
+
+        stub.for_deck = lambda manager: None
+        routes.render_cache.clear()
+        html = client.get('/browse').get_data(as_text=True)
+        self.assertNotIn('card-sprite', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+测试多语言卡牌目录
+"""
+import gc
+import shutil
+import tempfile
+import unittest
+import weakref
+from pathlib import Path
+from webapp.catalog import CardCatalog, discover_locale_sources
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+class TestCardCatalog(unittest.TestCase):
+    """测试CardCatalog"""
+
+    def setUp(self):
+        """在临时目录中构造5种语言的CSV"""
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        shutil.copy(DATA_DIR / 'TarotCards_Full.csv', self.tmp_dir / 'TarotCards_Full.csv')
+        shutil.copy(DATA_DIR / 'tarot_chinese.csv', self.tmp_dir / 'tarot_chinese.csv')
+        for lang in ('ja', 'es', 'pt_BR'):
+            shutil.copy(DATA_DIR / 'TarotCards_Full.csv', self.tmp_dir / f'tarot_{lang}.csv')
+        self.sources = discover_locale_sources(self.tmp_dir, {
+            'en': self.tmp_dir / 'TarotCards_Full.csv',
+            'zh': self.tmp_dir / 'tarot_chinese.csv',
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_discover(self):
+        """测试发现语言文件（tarot_chinese.csv 不是语言代码）"""
+        self.assertEqual(list(self.sources), ['en', 'zh', 'es', 'ja', 'pt_BR'])
+
+    def test_lazy_loading(self):
+        """测试首次访问时才加载"""
+        catalog = CardCatalog(self.sources)
+        self.assertEqual(catalog.loaded_locales(), ('en',))
+        manager = catalog.manager('zh')
+        self.assertEqual(manager.get_card_by_url('the_magician')['name'], '魔术师')
+        self.assertEqual(set(catalog.loaded_locales()), {'en', 'zh'})
+        # 已加载语言之间可按牌名互查
+        self.assertIs(catalog.manager('en').get_card_by_name('魔术师'),
+                      catalog.manager('en').get_card_by_url('the_magician'))
+
+    def test_unknown_locale(self):
+        """测试未知语言回退到默认语言"""
+        catalog = CardCatalog(self.sources)
+        self.assertIs(catalog.get('xx'), catalog.get('en'))
+
+    def test_lru_eviction(self):
+        """测试超出内存预算时淘汰最久未用的语言"""
+        probe = CardCatalog(self.sources)
+        deck_size = probe.get('ja').size
+        # 预算只够默认语言外再放两种语言
+        catalog = CardCatalog(self.sources, memory_budget=probe.get('en').size + deck_size * 2 + 1)
+        catalog.get('ja')
+        catalog.get('es')
+        catalog.get('ja')
+        catalog.get('pt_BR')
+        self.assertEqual(set(catalog.loaded_locales()), {'en', 'ja', 'pt_BR'})
+        self.assertEqual(catalog.evictions, 1)
+        self.assertLessEqual(catalog.memory_usage(), catalog.memory_budget)
+
+        # 被淘汰的语言再次访问时重新加载
+        self.assertEqual(len(catalog.manager('es').get_all_cards()), 78)
+        self.assertIn('en', catalog.loaded_locales())
+
+    def test_lru_eviction_columnar(self):
+        """测试列式后端淘汰的语言在重新加载后被释放，别名索引不随加载次数增长"""
+        catalog = CardCatalog(self.sources, memory_budget=1, backend='columnar')
+        evicted = weakref.ref(catalog.manager('zh'))
+        for _ in range(5):
+            catalog.get('ja')
+            catalog.get('zh')
+        gc.collect()
+        self.assertIsNone(evicted())
+        self.assertEqual(catalog.evictions, 10)
+        default = catalog.manager('en')
+        alias_index, sources = default._aliases
+        self.assertEqual(set(sources), {'zh', 'ja'})
+        self.assertEqual(len(alias_index.keys), 78 * 2)
+        self.assertEqual(default.get_card_by_name('魔术师')['name'], 'The Magician')
+
+
+if __name__ == '__main__':
+    unittest.main()
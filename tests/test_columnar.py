@@ -0,0 +1,80 @@
+"""
+测试列式牌组存储
+"""
+import unittest
+from pathlib import Path
+from webapp.columnar import ColumnarCardManager, ColumnarDeck, _HashIndex
+from webapp.models import CardManager, ReadingEngine
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+class TestColumnarCardManager(unittest.TestCase):
+    """测试列式后端与默认后端行为一致"""
+
+    @classmethod
+    def setUpClass(cls):
+        """类级别的设置"""
+        cls.objects = CardManager(DATA_DIR / 'TarotCards_Full.csv')
+        cls.columnar = ColumnarCardManager(DATA_DIR / 'TarotCards_Full.csv')
+
+    def test_cards_match(self):
+        """测试物化后的牌与默认后端一致"""
+        self.assertEqual(len(self.columnar.get_all_cards()), 78)
+        for a, b in zip(self.objects.get_all_cards(), self.columnar.get_all_cards()):
+            self.assertEqual(a.to_dict(), b.to_dict())
+            self.assertIs(a.base, b.base)
+
+    def test_lookups(self):
+        """测试url/名称查询与前后牌"""
+        card = self.columnar.get_card_by_url('the_magician')
+        self.assertEqual(card['name'], 'The Magician')
+        self.assertIsNone(self.columnar.get_card_by_url('no_such_card'))
+        self.assertEqual(self.columnar.get_card_by_name('THE FOOL')['name'], 'The Fool')
+
+        prev_card, next_card = self.columnar.get_neighbors('the_magician')
+        self.assertIsNone(prev_card)
+        self.assertEqual(next_card['url'], 'the_popess')
+
+    def test_type_filters(self):
+        """测试按类型筛选"""
+        self.assertEqual(len(self.columnar.get_major_arcana()), 22)
+        self.assertEqual(len(self.columnar.get_minor_arcana()), 56)
+        self.assertTrue(all(c['cardtype'] == 'court' for c in self.columnar.get_cards_by_type('court')))
+        self.assertEqual(len(self.columnar.get_cards_by_type('missing')), 0)
+
+    def test_name_aliases(self):
+        """测试其他语言牌名查询"""
+        manager = ColumnarCardManager(DATA_DIR / 'TarotCards_Full.csv')
+        manager.add_name_aliases(CardManager(DATA_DIR / 'tarot_chinese.csv'))
+        self.assertEqual(manager.get_card_by_name('魔术师')['name'], 'The Magician')
+        # 哈希相同但牌名不同（冲突）时不返回
+        alias_index, sources = manager._aliases
+        manager._aliases = (_HashIndex(alias_index.keys.tolist() + [hash('no such card')],
+                                       alias_index.positions.tolist() + [5]), sources)
+        self.assertIsNone(manager.get_card_by_name('No Such Card'))
+
+    def test_reading_engine(self):
+        """测试占卜引擎可直接使用列式后端"""
+        engine = ReadingEngine(self.columnar)
+        cards = engine.draw_cards(10)
+        self.assertEqual(len({c['url'] for c, _ in cards}), 10)
+        self.assertEqual(len(engine.six_card_reading()), 6)
+
+class TestColumnarDeck(unittest.TestCase):
+    """测试大规模合成牌组"""
+
+    def test_large_deck(self):
+        """测试20万张牌的构建与查询"""
+        base = CardManager(DATA_DIR / 'TarotCards_Full.csv').get_all_cards()
+        records = ({**base[i % 78].to_dict(), 'url': f'card_{i}', 'name': f'Card {i}'}
+                   for i in range(200000))
+        store = ColumnarDeck.from_records(records)
+        self.assertEqual(len(store), 200000)
+        self.assertEqual(store.card(123456)['url'], 'card_123456')
+        majors = sum(1 for i in range(200000) if base[i % 78]['cardtype'] == 'major')
+        self.assertEqual(len(store.type_indices('major')), majors)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+测试响应压缩
+"""
+import gzip
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+from webapp import create_app, routes
+from webapp.assets import build_asset_manifest, init_assets
+from webapp.compression import best_encoding, init_compression
+
+try:
+    import brotli
+except ImportError:  # 可选依赖：未安装 Brotli 时只测试 gzip
+    brotli = None
+
+
+def accept(value):
+    return parse_accept_header(value, Accept)
+
+
+class TestNegotiation(unittest.TestCase):
+    """测试 Accept-Encoding 协商"""
+
+    def test_best_encoding(self):
+        """测试按质量值选择，相同时优先 br；q=0 表示不接受"""
+        self.assertEqual(best_encoding(accept('gzip')), 'gzip')
+        self.assertIsNone(best_encoding(accept('identity')))
+        self.assertIsNone(best_encoding(accept('gzip;q=0')))
+        self.assertEqual(best_encoding(accept('br;q=0.5, gzip')), 'gzip')
+        if brotli is not None:
+            self.assertEqual(best_encoding(accept('gzip, deflate, br')), 'br')
+            self.assertEqual(best_encoding(accept('*')), 'br')
+
+
+class TestResponses(unittest.TestCase):
+    """测试缓存页面、动态页面和流式响应的压缩"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+
+    def test_cached_page(self):
+        """测试缓存页面的压缩结果随页面缓存，ETag 按编码区分，条件请求返回304"""
+        plain = self.client.get('/browse')
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+        self.assertNotIn('Content-Encoding', plain.headers)
+
+        response = self.client.get('/browse', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertEqual(response.headers['ETag'], plain.headers['ETag'][:-1] + '-gzip"')
+        page = next(page for page in routes.render_cache._pages.values() if page.body == plain.data)
+        self.assertEqual(page.encoded['gzip'], response.data)
+
+        response = self.client.get('/browse', headers={'Accept-Encoding': 'gzip',
+                                                        'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get('/browse', headers={'If-None-Match': plain.headers['ETag'][:-1] + '-gzip"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_dynamic_page(self):
+        """测试动态页面按配置的级别压缩"""
+        response = self.client.get('/three-cards', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn(b'</html>', gzip.decompress(response.data))
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+
+    @unittest.skipIf(brotli is None, "需要 Brotli")
+    def test_brotli(self):
+        """测试浏览器同时接受时使用 br"""
+        response = self.client.get('/three-cards', headers={'Accept-Encoding': 'gzip, deflate, br'})
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertIn(b'</html>', brotli.decompress(response.data))
+
+    def test_skipped(self):
+        """测试小响应和流式响应不压缩"""
+        response = self.client.get('/api/v1/cards/the_fool?fields=url', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        response = self.client.get('/api/v1/readings/three/bulk?count=50', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(len(response.data.splitlines()), 50)
+
+    def test_disabled(self):
+        """测试未启用压缩时不压缩"""
+        app = create_app('testing')
+        app.extensions.pop('compression')
+        response = app.test_client().get('/three-cards', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertNotIn('Vary', response.headers)
+
+
+class TestPrecompressedStatic(unittest.TestCase):
+    """测试带摘要的静态文件返回构建时生成的预压缩文件"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.root = Path(tempfile.mkdtemp())
+        (cls.root / 'static/css').mkdir(parents=True)
+        (cls.root / 'static/css/style.css').write_text('body { color: red; }\n' * 200, encoding='utf-8')
+        (cls.root / 'static/logo.png').write_bytes(b'\x89PNG' * 10)
+        cls.result = build_asset_manifest(cls.root / 'static', cls.root / 'assets.json')
+
+        cls.app = create_app('testing')
+        cls.app.static_folder = str(cls.root / 'static')
+        cls.app.config['ASSET_MANIFEST'] = cls.root / 'assets.json'
+        init_assets(cls.app)
+        init_compression(cls.app)
+        cls.css = cls.app.extensions['asset_manifest'].assets['css/style.css']
+        cls.client = cls.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def test_build(self):
+        """测试只为文本文件生成预压缩文件，再次构建时跳过"""
+        self.assertTrue((self.root / 'static' / (self.css + '.gz')).is_file())
+        self.assertEqual(list((self.root / 'static').glob('logo.*.png.gz')), [])
+        self.assertEqual(self.result['compressed'], 2 if brotli is not None else 1)
+        result = build_asset_manifest(self.root / 'static', self.root / 'assets.json')
+        self.assertEqual((result['assets'], result['created'], result['compressed']), (2, 0, 0))
+
+    def test_serve(self):
+        """测试按 Accept-Encoding 返回预压缩文件，内容类型和缓存头与原文件相同"""
+        plain = self.client.get(f'/static/{self.css}')
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+        response = self.client.get(f'/static/{self.css}', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.mimetype, 'text/css')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertNotEqual(response.headers['ETag'], plain.headers['ETag'])
+        plain.close()
+        response.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+测试每日一牌
+"""
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from webapp.daily import (DailyCalendar, DailyCards, bucket_for, new_daily_id, next_midnight,
+                          resolve_timezone)
+
+
+class TestDailyCalendar(unittest.TestCase):
+    """测试分配表"""
+
+    def test_build(self):
+        """测试分配表紧凑、确定且同一天各桶的牌不同"""
+        calendar = DailyCalendar.build(2026, 0x30d4e7e6, 78, 64)
+        self.assertEqual(len(calendar.table), 365 * 64)
+        self.assertEqual(calendar.table.itemsize, 1)
+        self.assertEqual(calendar.table, DailyCalendar.build(2026, 0x30d4e7e6, 78, 64).table)
+        self.assertNotEqual(calendar.table, DailyCalendar.build(2026, 0x30d4e7e6, 78, 64, 'salt').table)
+
+        day = date(2026, 10, 18)
+        cards = [calendar.assignment(day, bucket)[0] for bucket in range(64)]
+        self.assertEqual(len(set(cards)), 64)
+        self.assertTrue(all(0 <= card < 78 for card in cards))
+        self.assertIsInstance(calendar.assignment(day, 0)[1], bool)
+
+    def test_leap_year(self):
+        """测试闰年"""
+        calendar = DailyCalendar.build(2028, 1, 78, 8)
+        self.assertEqual(len(calendar.table), 366 * 8)
+        calendar.assignment(date(2028, 12, 31), 7)
+
+    def test_more_buckets_than_cards(self):
+        """测试桶数超过牌数"""
+        calendar = DailyCalendar.build(2026, 1, 10, 32)
+        self.assertTrue(all(card < 10 for card, _ in
+                            (calendar.assignment(date(2026, 1, 1), b) for b in range(32))))
+
+
+class TestDailyHelpers(unittest.TestCase):
+    """测试访客分桶、时区与缓存"""
+
+    def test_bucket(self):
+        """测试同一标识总在同一个桶"""
+        identifier = new_daily_id()
+        self.assertEqual(bucket_for(identifier, 64), bucket_for(identifier, 64))
+        self.assertTrue(all(0 <= bucket_for(new_daily_id(), 64) < 64 for _ in range(100)))
+
+    def test_timezone(self):
+        """测试时区解析与本地午夜"""
+        self.assertEqual(str(resolve_timezone('Asia/Shanghai')), 'Asia/Shanghai')
+        self.assertEqual(str(resolve_timezone('Not/AZone', 'UTC')), 'UTC')
+        self.assertEqual(str(resolve_timezone(None, 'Europe/Paris')), 'Europe/Paris')
+
+        now = datetime(2026, 10, 18, 23, 59, 30, tzinfo=resolve_timezone('Asia/Shanghai'))
+        self.assertEqual(next_midnight(now) - now, timedelta(seconds=30))
+        self.assertEqual(next_midnight(now).astimezone(timezone.utc).hour, 16)
+
+    def test_page_cache(self):
+        """测试过期日期的页面在写入新日期时清除"""
+        daily = DailyCards(buckets=4)
+        monday, tuesday, wednesday = date(2026, 10, 19), date(2026, 10, 20), date(2026, 10, 21)
+        daily.cache_page((monday, 0, 'en', 1), 'a')
+        daily.cache_page((tuesday, 0, 'en', 1), 'b')
+        self.assertEqual(daily.cached_page((monday, 0, 'en', 1)), 'a')
+        daily.cache_page((wednesday, 0, 'en', 1), 'c')
+        self.assertIsNone(daily.cached_page((monday, 0, 'en', 1)))
+        self.assertEqual(daily.cached_page((tuesday, 0, 'en', 1)), 'b')
+
+    def test_calendar_reuse(self):
+        """测试分配表按 (年份, 版本) 缓存"""
+        daily = DailyCards(buckets=4, max_calendars=1)
+        calendar = daily.calendar(2026, 1, 78)
+        self.assertIs(daily.calendar(2026, 1, 78), calendar)
+        daily.calendar(2027, 1, 78)
+        self.assertIsNot(daily.calendar(2026, 1, 78), calendar)
+
+
+if __name__ == '__main__':
+    unittest.main()
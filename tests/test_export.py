@@ -0,0 +1,100 @@
+"""
+测试静态站点导出
+"""
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from webapp import create_app
+from webapp.export import MANIFEST_NAME, export_site, nginx_config, page_file, plan_pages
+
+
+class TestStaticExport(unittest.TestCase):
+    """测试export_site"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app('testing')
+        cls.out_dir = Path(tempfile.mkdtemp())
+        cls.result = export_site(cls.app, cls.out_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.out_dir)
+
+    def manifest(self):
+        with open(self.out_dir / MANIFEST_NAME, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_page_file(self):
+        """测试URL到文件的映射"""
+        self.assertEqual(page_file('en', '/'), 'en/index.html')
+        self.assertEqual(page_file('zh', '/card/the_fool'), 'zh/card/the_fool/index.html')
+
+    def test_pages_from_url_map(self):
+        """测试只导出确定性页面：首页、牌库和78张牌详情页，每种语言各一份"""
+        paths = {page.path for page in plan_pages(self.app)}
+        self.assertIn('/', paths)
+        self.assertIn('/browse', paths)
+        self.assertIn('/card/the_magician', paths)
+        self.assertNotIn('/three-cards', paths)
+        self.assertEqual(len(paths), 80)
+        self.assertEqual(self.result['pages'], 160)
+
+    def test_files_match_app(self):
+        """测试静态文件与应用返回的页面相同"""
+        client = self.app.test_client()
+        response = client.get('/card/the_magician', headers={'Accept-Language': 'zh'})
+        path = self.out_dir / 'zh/card/the_magician/index.html'
+        self.assertEqual(path.read_bytes(), response.data)
+        self.assertEqual(gzip.decompress(path.with_name('index.html.gz').read_bytes()), response.data)
+        entry = next(e for e in self.manifest()['pages'] if e['file'] == 'zh/card/the_magician/index.html')
+        self.assertEqual(f'"{entry["etag"]}"', response.headers['ETag'])
+
+    def test_nginx_config(self):
+        """测试生成nginx配置片段"""
+        locations = (self.out_dir / 'nginx/locations.conf').read_text(encoding='utf-8')
+        self.assertIn('location = /browse {', locations)
+        self.assertIn('try_files /$tarot_static_dir/browse/index.html @tarot_app;', locations)
+        self.assertIn('add_header Cache-Control "public, max-age=31536000, immutable";', locations)
+        maps = (self.out_dir / 'nginx/maps.conf').read_text(encoding='utf-8')
+        self.assertIn('~*^zh zh;', maps)
+        self.assertNotIn('internal;', locations)
+
+    def test_nginx_accel_location(self):
+        """测试设置 IMAGE_ACCEL_REDIRECT 时生成发送图片的内部 location"""
+        app = create_app('testing')
+        app.config['IMAGE_ACCEL_REDIRECT'] = '/_images/'
+        _, locations = nginx_config(app, self.out_dir, [])
+        self.assertIn(f'location /_images/ {{\n    internal;\n    alias {Path(app.static_folder).resolve()}/;',
+                      locations)
+
+    def test_incremental(self):
+        """测试增量导出：输入不变时跳过，输入变化或文件缺失时重新渲染"""
+        result = export_site(self.app, self.out_dir)
+        self.assertEqual((result['rendered'], result['skipped']), (0, 160))
+
+        manifest = self.manifest()
+        manifest['pages'][0]['inputs'] = 'changed'
+        (self.out_dir / MANIFEST_NAME).write_text(json.dumps(manifest), encoding='utf-8')
+        (self.out_dir / 'en/browse/index.html').unlink()
+        result = export_site(self.app, self.out_dir)
+        self.assertEqual(result['rendered'], 2)
+
+    def test_removes_stale_pages(self):
+        """测试删除不再导出的页面"""
+        manifest = self.manifest()
+        stale = dict(manifest['pages'][0], file='en/old/index.html', encodings={})
+        manifest['pages'].append(stale)
+        (self.out_dir / 'en/old').mkdir()
+        (self.out_dir / 'en/old/index.html').write_text('old', encoding='utf-8')
+        (self.out_dir / MANIFEST_NAME).write_text(json.dumps(manifest), encoding='utf-8')
+        result = export_site(self.app, self.out_dir)
+        self.assertEqual(result['removed'], 1)
+        self.assertFalse((self.out_dir / 'en/old/index.html').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+测试牌面板片段缓存
+"""
+import unittest
+from markupsafe import Markup
+from webapp import create_app, routes
+from webapp.fragments import FragmentCache
+
+
+class TestFragmentCache(unittest.TestCase):
+    """测试FragmentCache"""
+
+    def setUp(self):
+        self.calls = []
+
+        def render(template, slot, **context):
+            self.calls.append((template, context))
+            return f"<p>{slot}</p><b>{context['card']}</b>"
+
+        self.cache = FragmentCache(render)
+
+    def test_memoized(self):
+        """测试同一键只渲染一次"""
+        first = self.cache.splice('k', 'panel.html', 'Past', card='Fool')
+        second = self.cache.splice('k', 'panel.html', 'Future', card='Fool')
+        self.assertEqual(first, Markup('<p>Past</p><b>Fool</b>'))
+        self.assertEqual(second, Markup('<p>Future</p><b>Fool</b>'))
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.cache.renders, 1)
+
+    def test_fill_escaped(self):
+        """测试填入的文本会被转义，片段本身不会"""
+        html = self.cache.splice('k', 'panel.html', '<x>', card='Fool')
+        self.assertEqual(html, Markup('<p>&lt;x&gt;</p><b>Fool</b>'))
+
+    def test_clear(self):
+        """测试清空后重新渲染"""
+        self.cache.get('k', 'panel.html', card='Fool')
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.cache.get('k', 'panel.html', card='Fool')
+        self.assertEqual(len(self.calls), 2)
+
+
+class TestFragmentRoutes(unittest.TestCase):
+    """测试占卜页使用缓存的片段"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        routes.card_fragments.clear()
+
+    def test_reused_across_readings(self):
+        """测试多次占卜复用同一批片段"""
+        before = routes.card_fragments.renders
+        for _ in range(50):
+            self.assertEqual(self.client.get('/six-cards').status_code, 200)
+        # 300 个面板最多只渲染 78 × 2 次
+        self.assertLessEqual(routes.card_fragments.renders - before, 78 * 2)
+
+    def test_positions_spliced(self):
+        """测试位置说明填入片段"""
+        response = self.client.get('/three-cards')
+        for position in (b'Past', b'Present', b'Future'):
+            self.assertIn(position, response.data)
+        self.assertNotIn(b'\x00', response.data)
+
+    def test_locale_keys(self):
+        """测试不同语言使用各自的片段"""
+        self.client.get('/set-language/zh')
+        response = self.client.get('/three-cards')
+        self.assertIn('过去'.encode('utf-8'), response.data)
+        text = response.get_data(as_text=True)
+        self.assertTrue('正位' in text or '逆位' in text)
+
+    def test_invalidated_on_reload(self):
+        """测试牌组重载后片段清空"""
+        self.client.get('/one-card')
+        self.assertGreater(len(routes.card_fragments), 0)
+        routes.deck_reloader.reload(force=True)
+        self.assertEqual(len(routes.card_fragments), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
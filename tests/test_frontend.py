@@ -0,0 +1,193 @@
+"""
+测试自托管字体与 CSS
+"""
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from webapp import create_app
+from webapp.frontend import (GOOGLE_FONTS_URL, MANIFEST_NAME, VENDOR_DIR, SelectorUsage, above_the_fold,
+                             cache_path, init_frontend, parse_css, purge_css, purge_keyframes, vendor_fonts)
+
+try:
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib import TTFont
+except ImportError:  # 可选依赖：未安装 fontTools 时跳过子集化测试
+    FontBuilder = None
+
+
+def make_font(chars):
+    """包含 chars 中每个字符（各一个方块字形）的 TTF"""
+    names = ['.notdef'] + [f'g{ord(c)}' for c in chars]
+    pen = TTGlyphPen(None)
+    pen.moveTo((0, 0))
+    pen.lineTo((0, 500))
+    pen.lineTo((500, 500))
+    pen.closePath()
+    glyph = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({ord(c): f'g{ord(c)}' for c in chars})
+    builder.setupGlyf({name: glyph for name in names})
+    builder.setupHorizontalMetrics({name: (600, 0) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({'familyName': 'Test', 'styleName': 'Regular'})
+    builder.setupOS2()
+    builder.setupPost()
+    out = io.BytesIO()
+    builder.save(out)
+    return out.getvalue()
+
+
+class TestPurgeCss(unittest.TestCase):
+    """测试CSS清理"""
+
+    def setUp(self):
+        self.usage = SelectorUsage(classes={'btn', 'navbar'}, ids={'main'}, tags={'p'}, attributes={'href'})
+
+    def test_parse(self):
+        """测试拆分顶层规则：字符串和嵌套块中的括号、分号不影响拆分"""
+        items = parse_css('@charset "UTF-8";/* x{} */.a{content:"}{;"}@media (min-width:1px){.b{color:red}}')
+        self.assertEqual(items, [('@charset "UTF-8"', None), ('.a', 'content:"}{;"'),
+                                 ('@media (min-width:1px)', '.b{color:red}')])
+
+    def test_selectors(self):
+        """测试选择器中的类、id、元素和属性都出现过才匹配；:not() 中的类不要求出现"""
+        self.assertTrue(self.usage.matches('.navbar .btn:hover'))
+        self.assertTrue(self.usage.matches('p#main>.btn::after'))
+        self.assertTrue(self.usage.matches('.btn:not(.disabled)'))
+        self.assertTrue(self.usage.matches('p[href]:not([data-x])'))
+        self.assertFalse(self.usage.matches('a[href]'))
+        self.assertFalse(self.usage.matches('.btn.btn-lg'))
+        self.assertFalse(self.usage.matches('table .btn'))
+        self.assertFalse(self.usage.matches('[data-bs-theme=dark] .btn'))
+        self.assertTrue(self.usage.matches(':root'))
+
+    def test_purge(self):
+        """测试删除不匹配的选择器和规则，清理后为空的@media被删除，@keyframes原样保留"""
+        css = ('.btn, .card { color: red; }\n.card{margin:0}\n'
+               '@media (min-width: 576px) { .card { padding: 0 } }\n'
+               '@media print { .navbar { display: none } }\n'
+               '@keyframes spin { from { transform: none } }')
+        self.assertEqual(purge_css(css, self.usage),
+                         '.btn{color: red}@media print{.navbar{display: none}}'
+                         '@keyframes spin{from { transform: none }}')
+
+    def test_source_words(self):
+        """测试模板源文件中的词（可能是拼出的类名）都算作用到"""
+        usage = SelectorUsage()
+        usage.add_source('<div class="card {% if reversed %}reversed{% endif %}">')
+        self.assertTrue(usage.matches('div.card.reversed'))
+        usage.add_html('<span class="a  b" id="x" data-tilt>')
+        self.assertTrue(usage.matches('span#x.a.b[data-tilt]'))
+
+    def test_above_the_fold(self):
+        """测试首屏到 <main> 中第一个 .row 结束为止；没有 .row 时取前两个顶层元素"""
+        head = '<html><head><style>.x{}</style></head><body><nav class="navbar"><br></nav><main>'
+        html = (head + '<div class="hero"><img src="a"></div><div class="row"><p>1</p></div>'
+                '<div class="footer-x"></div></main>')
+        fold = above_the_fold(html)
+        self.assertTrue(fold.startswith('<body><nav class="navbar">'))
+        self.assertTrue(fold.endswith('<div class="row"><p>1</p></div>'))
+
+        html = head + '<h1>a</h1><ul><li>b</li></ul><div class="tab-content"></div></main>'
+        self.assertTrue(above_the_fold(html).endswith('<ul><li>b</li></ul>'))
+
+    def test_purge_keyframes(self):
+        """测试删除没有被引用的 @keyframes"""
+        css = '.a{animation:spin 1s linear}@keyframes spin{to{opacity:1}}@keyframes pulse{to{opacity:0}}'
+        self.assertEqual(purge_keyframes(css), '.a{animation:spin 1s linear}@keyframes spin{to{opacity:1}}')
+
+
+@unittest.skipIf(FontBuilder is None, "需要 fontTools")
+class TestVendorFonts(unittest.TestCase):
+    """测试字体下载（使用下载缓存）与子集化"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.cache_dir = self.root / 'cache'
+        font_url = 'https://fonts.gstatic.com/s/test/v1/test.ttf'
+        path = cache_path(self.cache_dir, font_url)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(make_font('abcdefxyz'))
+        self.css = ("@font-face {\n  font-family: 'Crimson Text';\n  font-style: italic;\n  font-weight: 400;\n"
+                    f"  font-display: swap;\n  src: url({font_url}) format('truetype');\n}}\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_cache_path(self):
+        """测试查询参数不同的URL对应不同的缓存文件"""
+        path = cache_path(self.cache_dir, GOOGLE_FONTS_URL)
+        self.assertEqual(path.parent, self.cache_dir / 'fonts.googleapis.com')
+        self.assertTrue(path.name.startswith('css2@'))
+        self.assertNotEqual(path, cache_path(self.cache_dir, GOOGLE_FONTS_URL + '&text=a'))
+
+    def test_subset(self):
+        """测试只保留需要的字符，样式表引用本地文件"""
+        out_dir = self.root / VENDOR_DIR
+        css, files = vendor_fonts(self.css, 'abc', out_dir, self.cache_dir)
+        name, size, subset_size = files[0]
+        self.assertRegex(name, r'^fonts/crimson-text-400-italic\.woff2?$')
+        self.assertLess(subset_size, size)
+        self.assertIn(f"font-style:italic;font-weight:400;font-display:swap;src:url({name})", css)
+        font = TTFont(out_dir / name)
+        self.assertEqual(set(font.getBestCmap()), {ord('a'), ord('b'), ord('c')})
+
+
+class TestTemplates(unittest.TestCase):
+    """测试页面使用自托管的样式表和内联 CSS"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.root = Path(tempfile.mkdtemp())
+        vendor = cls.root / 'static' / VENDOR_DIR
+        (vendor / 'critical').mkdir(parents=True)
+        (vendor / 'critical' / 'index.css').write_text(
+            'body{background:url(static:images/ui/background.png)}', encoding='utf-8')
+        manifest = {'stylesheets': [f'{VENDOR_DIR}/fonts.css', f'{VENDOR_DIR}/bootstrap.min.css', 'css/style.css'],
+                    'script': f'{VENDOR_DIR}/bootstrap.bundle.min.js',
+                    'critical': {'index.html': f'{VENDOR_DIR}/critical/index.css'}}
+        with open(vendor / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+        cls.app = create_app('testing')
+        cls.app.config['FRONTEND_MANIFEST'] = vendor / MANIFEST_NAME
+        init_frontend(cls.app)
+        cls.client = cls.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def test_inline_css(self):
+        """测试内联该模板的 CSS（静态文件引用替换为URL），完整样式表异步加载"""
+        html = self.client.get('/').get_data(as_text=True)
+        self.assertIn('<style>body{background:url(/static/images/ui/background.png)}</style>', html)
+        self.assertIn('<link rel="preload" href="/static/vendor/bootstrap.min.css" as="style"', html)
+        self.assertIn('<noscript><link rel="stylesheet" href="/static/vendor/fonts.css">', html)
+        self.assertIn('<script src="/static/vendor/bootstrap.bundle.min.js" defer></script>', html)
+        self.assertNotIn('fonts.googleapis.com', html)
+        self.assertNotIn('cdn.jsdelivr.net', html)
+
+    def test_without_critical_css(self):
+        """测试没有内联 CSS 的模板直接加载自托管的样式表"""
+        html = self.client.get('/card/the_fool').get_data(as_text=True)
+        self.assertNotIn('<style>', html)
+        self.assertIn('<link rel="stylesheet" href="/static/vendor/bootstrap.min.css">', html)
+        self.assertNotIn('cdn.jsdelivr.net', html)
+
+    def test_cdn_fallback(self):
+        """测试没有清单时使用 CDN"""
+        # 占卜页不经过渲染缓存，不影响其他测试
+        html = create_app('testing').test_client().get('/three-cards').get_data(as_text=True)
+        self.assertIn('https://fonts.googleapis.com/css2?family=Cinzel', html)
+        self.assertIn('https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js', html)
+        self.assertNotIn('<style>', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
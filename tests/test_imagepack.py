@@ -0,0 +1,98 @@
+"""
+测试牌面图片包
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from flask import Flask
+from webapp.imagepack import ImagePack, PackSlice, build_pack, init_image_packs, remove_stale_packs
+
+
+class TestImagePack(unittest.TestCase):
+    """测试图片包的生成、读取和静态文件视图"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.static_dir = self.root / 'static'
+        self.pack_dir = self.root / 'packs'
+        (self.static_dir / 'images').mkdir(parents=True)
+        self.files = {'images/a.jpeg': b'\xff\xd8a' * 1000, 'images/b.webp': b'RIFFb' * 10,
+                      'images/c.avif': b'avif'}
+        for name, data in self.files.items():
+            (self.static_dir / name).write_bytes(data)
+        (self.static_dir / 'style.css').write_text('body{}')
+        self.key, _ = build_pack(self.static_dir, self.files, self.pack_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def make_app(self, **config):
+        app = Flask(__name__, static_folder=str(self.static_dir))
+        app.config['IMAGE_PACK_DIR'] = self.pack_dir
+        app.config.update(config)
+        init_image_packs(app)
+        return app
+
+    def test_build(self):
+        """测试内容相同时跳过，内容改变时生成新的图片包，旧图片包可以删除"""
+        self.assertEqual(build_pack(self.static_dir, self.files, self.pack_dir), (self.key, False))
+        (self.static_dir / 'images/c.avif').write_bytes(b'changed')
+        key, created = build_pack(self.static_dir, self.files, self.pack_dir)
+        self.assertTrue(created)
+        self.assertNotEqual(key, self.key)
+        self.assertEqual(remove_stale_packs(self.pack_dir, {key}), 1)
+        self.assertEqual([path.stem for path in self.pack_dir.iterdir()], [key])
+
+    def test_slice(self):
+        """测试 read() 只读到这一段的结尾，fileno() 把描述符定位到这一段的当前位置"""
+        pack = ImagePack(self.pack_dir / f'{self.key}.pack')
+        offset, length, _, mimetype, _ = pack.images['images/b.webp']
+        self.assertEqual(mimetype, 'image/webp')
+        part = PackSlice(pack, offset, length)
+        self.assertEqual(part.read(5), b'RIFFb')
+        self.assertEqual(os.lseek(part.fileno(), 0, os.SEEK_CUR), offset + 5)
+        self.assertEqual(part.read(), self.files['images/b.webp'][5:])
+        self.assertEqual(part.read(), b'')
+        self.assertEqual(os.pread(part.fileno(), length, offset), self.files['images/b.webp'])
+
+    def test_serve(self):
+        """测试返回的内容、类型和缓存头，ETag 条件请求和 Range 请求"""
+        client = self.make_app().test_client()
+        response = client.get('/static/images/a.jpeg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.files['images/a.jpeg'])
+        self.assertEqual(response.mimetype, 'image/jpeg')
+        self.assertEqual(response.content_length, 3000)
+        self.assertIn('no-cache', response.headers['Cache-Control'])
+        etag = response.headers['ETag']
+        self.assertEqual(client.get('/static/images/a.jpeg', headers={'If-None-Match': etag}).status_code, 304)
+
+        response = client.get('/static/images/a.jpeg', headers={'Range': 'bytes=3-5'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, self.files['images/a.jpeg'][3:6])
+        self.assertEqual(client.get('/static/images/c.avif').mimetype, 'image/avif')
+
+    def test_fallback(self):
+        """测试不在图片包中或构建后被修改过的文件由原来的静态文件视图返回"""
+        (self.static_dir / 'images/c.avif').write_bytes(b'modified')
+        client = self.make_app().test_client()
+        self.assertEqual(client.get('/static/style.css').data, b'body{}')
+        self.assertEqual(client.get('/static/images/c.avif').data, b'modified')
+        self.assertEqual(client.get('/static/images/missing.jpeg').status_code, 404)
+
+    def test_accel_redirect(self):
+        """测试 nginx 模式只返回头，由 nginx 按 X-Accel-Redirect 发送文件"""
+        client = self.make_app(IMAGE_ACCEL_REDIRECT='/_images/').test_client()
+        response = client.get('/static/images/a.jpeg')
+        self.assertEqual(response.headers['X-Accel-Redirect'], '/_images/images/a.jpeg')
+        self.assertEqual(response.mimetype, 'image/jpeg')
+        self.assertEqual(response.data, b'')
+        response = client.get('/static/images/a.jpeg', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('X-Accel-Redirect', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
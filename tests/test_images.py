@@ -0,0 +1,135 @@
+"""
+测试牌面图片版本
+"""
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from webapp import create_app, routes
+from webapp.atlas import CardAtlases
+from webapp.images import MANIFEST_NAME, VARIANT_DIR, ImageVariants, build_variants
+
+try:
+    from PIL import Image
+except ImportError:  # 可选依赖：未安装 Pillow 时跳过生成测试
+    Image = None
+
+
+@unittest.skipIf(Image is None, "需要 Pillow")
+class TestBuildVariants(unittest.TestCase):
+    """测试build_variants"""
+
+    def setUp(self):
+        self.static_dir = Path(tempfile.mkdtemp())
+        (self.static_dir / 'images').mkdir()
+        self.save('images/a.jpeg', (200, 376), 'red')
+        self.save('images/b.jpeg', (400, 752), 'blue')
+
+    def tearDown(self):
+        shutil.rmtree(self.static_dir)
+
+    def save(self, name, size, color):
+        Image.new('RGB', size, color).save(self.static_dir / name, 'JPEG')
+
+    def manifest(self):
+        with open(self.static_dir / VARIANT_DIR / MANIFEST_NAME, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_variants(self):
+        """测试生成各尺寸和格式，宽度不超过源图片"""
+        result = build_variants(self.static_dir, ['images/a.jpeg', 'images/b.jpeg'])
+        self.assertEqual((result['images'], result['rendered']), (2, 2))
+        manifest = self.manifest()
+        formats = manifest['settings']['formats']
+        self.assertEqual(formats[-1], 'jpeg')
+        self.assertIn('webp', formats)
+        widths = [v['width'] for v in manifest['images']['images/a.jpeg']['variants']]
+        self.assertEqual(widths, [150, 200])
+        variant = manifest['images']['images/b.jpeg']['variants'][1]
+        self.assertEqual((variant['width'], variant['height']), (300, 564))
+        for fmt, info in variant['files'].items():
+            with Image.open(self.static_dir / info['file']) as image:
+                self.assertEqual(image.size, (300, 564))
+                self.assertEqual(image.format, fmt.upper())
+
+    def test_incremental(self):
+        """测试增量：源图片不变时跳过；变化时重新生成并删除旧文件"""
+        build_variants(self.static_dir, ['images/a.jpeg', 'images/b.jpeg'])
+        result = build_variants(self.static_dir, ['images/a.jpeg', 'images/b.jpeg'])
+        self.assertEqual((result['rendered'], result['skipped'], result['removed']), (0, 2, 0))
+
+        variant_dir = self.static_dir / VARIANT_DIR
+        old_a = {p.name for p in variant_dir.iterdir() if p.name.startswith('a.')}
+        self.save('images/a.jpeg', (200, 376), 'green')
+        result = build_variants(self.static_dir, ['images/a.jpeg', 'images/b.jpeg'])
+        self.assertEqual((result['rendered'], result['removed']), (1, len(old_a)))
+        self.assertFalse(old_a & {p.name for p in variant_dir.iterdir()})
+
+    def test_missing_file_rebuilt(self):
+        """测试版本文件缺失时重新生成"""
+        build_variants(self.static_dir, ['images/a.jpeg'])
+        entry = self.manifest()['images']['images/a.jpeg']
+        (self.static_dir / entry['variants'][0]['files']['jpeg']['file']).unlink()
+        result = build_variants(self.static_dir, ['images/a.jpeg'])
+        self.assertEqual(result['rendered'], 1)
+
+    def test_parallel(self):
+        """测试多进程生成与单进程结果相同"""
+        build_variants(self.static_dir, ['images/a.jpeg', 'images/b.jpeg'], jobs=2)
+        images = self.manifest()['images']
+        result = build_variants(self.static_dir, ['images/a.jpeg', 'images/b.jpeg'], force=True)
+        self.assertEqual(result['rendered'], 2)
+        self.assertEqual(self.manifest()['images'], images)
+
+
+class TestImageVariants(unittest.TestCase):
+    """测试ImageVariants和模板输出"""
+
+    ENTRY = {'hash': 'x', 'width': 293, 'height': 551, 'variants': [
+        {'name': 'thumb', 'width': 150, 'height': 282, 'files': {
+            'webp': {'file': 'variants/00.x.150.webp', 'size': 1},
+            'jpeg': {'file': 'variants/00.x.150.jpeg', 'size': 1}}},
+        {'name': 'medium', 'width': 293, 'height': 551, 'files': {
+            'webp': {'file': 'variants/00.x.293.webp', 'size': 1},
+            'jpeg': {'file': 'variants/00.x.293.jpeg', 'size': 1}}},
+    ]}
+
+    def test_missing_manifest(self):
+        """测试没有清单时为空"""
+        variants = ImageVariants.load(tempfile.gettempdir() + '/no-such-static')
+        self.assertEqual(len(variants), 0)
+        self.assertIsNone(variants.picture('images/00.jpeg', str))
+
+    def test_picture(self):
+        """测试srcset：按优先顺序，后备格式单独给出"""
+        variants = ImageVariants({'images/00.jpeg': self.ENTRY}, ('webp', 'jpeg'))
+        picture = variants.picture('images/00.jpeg', lambda name: '/static/' + name)
+        self.assertEqual(picture['sources'], [
+            ('image/webp', '/static/variants/00.x.150.webp 150w, /static/variants/00.x.293.webp 293w')])
+        self.assertEqual(picture['srcset'],
+                         '/static/variants/00.x.150.jpeg 150w, /static/variants/00.x.293.jpeg 293w')
+        self.assertEqual(picture['src'], '/static/variants/00.x.293.jpeg')
+
+    def test_templates(self):
+        """测试有版本时牌库页输出 <picture>，没有时输出原图"""
+        app = create_app('testing')
+        client = app.test_client()
+        # 没有拼图时牌库页逐张输出图片
+        routes.card_atlases = CardAtlases(tempfile.gettempdir() + '/no-such-static', autobuild=False)
+        card = routes.deck_reloader.current.manager('en').get_all_cards()[0]
+        routes.image_variants = ImageVariants({card['image']: self.ENTRY}, ('webp', 'jpeg'))
+        html = client.get('/browse').get_data(as_text=True)
+        self.assertIn('<source type="image/webp" srcset="/static/variants/00.x.150.webp 150w', html)
+        self.assertIn('<img src="/static/variants/00.x.293.jpeg"', html)
+        self.assertIn('sizes="(min-width: 1400px) 180px', html)
+
+        routes.image_variants = ImageVariants()
+        routes.render_cache.clear()
+        html = client.get('/browse').get_data(as_text=True)
+        self.assertNotIn('<picture>', html)
+        self.assertIn(f'<img src="/static/{card["image"]}"', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@
 """
 import unittest
 from pathlib import Path
+import numpy as np
 from webapp.models import CardManager, ReadingEngine
 
 class TestCardManager(unittest.TestCase):
@@ -36,6 +37,72 @@ class TestCardManager(unittest.TestCase):
         major = self.manager.get_cards_by_type('major')
         self.assertEqual(len(major), 22)
 
+    def test_get_card_by_url(self):
+        """测试根据url获取卡牌"""
+        card = self.manager.get_card_by_url('the_magician')
+        self.assertEqual(card['name'], "The Magician")
+        self.assertIsNone(self.manager.get_card_by_url('no_such_card'))
+
+    def test_get_neighbors(self):
+        """测试前后牌导航表"""
+        cards = self.manager.get_all_cards()
+        self.assertEqual(self.manager.get_neighbors(cards[0]['url']), (None, cards[1]))
+        self.assertEqual(self.manager.get_neighbors(cards[5]['url']), (cards[4], cards[6]))
+        self.assertEqual(self.manager.get_neighbors(cards[-1]['url']), (cards[-2], None))
+
+    def test_name_aliases(self):
+        """测试其他语言牌名查询"""
+        zh_path = Path(__file__).parent.parent / 'data' / 'tarot_chinese.csv'
+        manager = CardManager(Path(__file__).parent.parent / 'data' / 'TarotCards_Full.csv')
+        manager.add_name_aliases(CardManager(zh_path))
+        card = manager.get_card_by_name('魔术师')
+        self.assertEqual(card['name'], "The Magician")
+        # 合并别名后名称索引仍为只读
+        with self.assertRaises(TypeError):
+            manager._by_name['x'] = card
+
+    def test_indexes_are_immutable(self):
+        """测试索引为只读结构"""
+        major = self.manager.get_major_arcana()
+        self.assertIsInstance(major, tuple)
+        self.assertIs(major, self.manager.get_major_arcana())
+
+
+class TestCard(unittest.TestCase):
+    """测试Card记录"""
+
+    @classmethod
+    def setUpClass(cls):
+        """类级别的设置"""
+        data_dir = Path(__file__).parent.parent / 'data'
+        cls.en = CardManager(data_dir / 'TarotCards_Full.csv')
+        cls.zh = CardManager(data_dir / 'tarot_chinese.csv')
+
+    def test_shared_base(self):
+        """测试语言无关字段在两种语言间共享"""
+        for en_card, zh_card in zip(self.en.get_all_cards(), self.zh.get_all_cards()):
+            self.assertIs(en_card.base, zh_card.base)
+            self.assertNotEqual(en_card['name'], zh_card['name'])
+
+    def test_mapping_access(self):
+        """测试下标访问与字典一致"""
+        card = self.en.get_card_by_url('the_magician')
+        self.assertEqual(card['url'], card.url)
+        self.assertEqual(card['sequence'], 1)
+        self.assertEqual(card['hebrew_letter'], 'א')
+        self.assertIn('meditation', card)
+        self.assertEqual(card.get('missing', ''), '')
+        with self.assertRaises(KeyError):
+            card['missing']
+
+    def test_immutable(self):
+        """测试Card不可修改"""
+        card = self.en.get_all_cards()[0]
+        with self.assertRaises(AttributeError):
+            card.name = 'changed'
+        with self.assertRaises(AttributeError):
+            card.base.url = 'changed'
+
 
 class TestReadingEngine(unittest.TestCase):
     """测试ReadingEngine类"""
@@ -58,5 +125,47 @@ class TestReadingEngine(unittest.TestCase):
         card_names = [c[0]['name'] for c in cards]
         self.assertEqual(len(card_names), len(set(card_names)))
 
+
+class TestBatchReadings(unittest.TestCase):
+    """测试批量占卜"""
+
+    @classmethod
+    def setUpClass(cls):
+        """类级别的设置"""
+        csv_path = Path(__file__).parent.parent / 'data' / 'TarotCards_Full.csv'
+        cls.engine = ReadingEngine(CardManager(csv_path))
+
+    def test_quotas(self):
+        """测试行内不重复且严格保持正逆位配额"""
+        for spread, size, reversed_count in (('three', 3, 1), ('six', 6, 2)):
+            batch = self.engine.batch_readings(spread, 20000)
+            self.assertEqual(batch.cards.shape, (20000, size))
+            ordered = np.sort(batch.cards, axis=1)
+            self.assertFalse((ordered[:, 1:] == ordered[:, :-1]).any())
+            self.assertTrue((batch.reversed.sum(axis=1) == reversed_count).all())
+            self.assertLess(batch.cards.max(), 78)
+
+    def test_seed(self):
+        """测试相同种子结果相同"""
+        a = self.engine.batch_readings('six', 100, seed=42)
+        b = self.engine.batch_readings('six', 100, seed=42)
+        self.assertTrue((a.records() == b.records()).all())
+
+    def test_materialize(self):
+        """测试按下标物化"""
+        batch = self.engine.batch_readings('three', 10, seed=1)
+        reading = batch[3]
+        cards = self.engine.card_manager.get_all_cards()
+        self.assertEqual(len(reading), 3)
+        self.assertIs(reading[0][0], cards[int(batch.cards[3, 0])])
+        self.assertEqual([r for _, r in reading], batch.reversed[3].tolist())
+        self.assertEqual(len(self.engine.batch_readings('one', 5)[0]), 1)
+
+    def test_unknown_spread(self):
+        """测试未知布局"""
+        with self.assertRaises(ValueError):
+            self.engine.batch_readings('unknown', 1)
+
+
 if __name__ == '__main__':
     unittest.main()
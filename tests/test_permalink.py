@@ -0,0 +1,107 @@
+"""
+测试占卜永久链接
+"""
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from webapp.models import CardManager, ReadingEngine
+from webapp.permalink import (DeckVersions, PinnedDeck, TOKEN_LENGTH, decode_token,
+                              deck_version, encode_token, seeded_rng)
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+class TestToken(unittest.TestCase):
+    """测试令牌编解码"""
+
+    def test_round_trip(self):
+        """测试编码后可解码"""
+        token = encode_token(0x30d4e7e6, 2, 2 ** 48 - 1)
+        self.assertEqual(len(token), TOKEN_LENGTH)
+        self.assertEqual(decode_token(token), (0x30d4e7e6, 2, 2 ** 48 - 1))
+
+    def test_invalid(self):
+        """测试无效令牌"""
+        for token in ('', 'short', '!' * TOKEN_LENGTH, encode_token(1, 0, 1)[:-1] + '?'):
+            with self.assertRaises(ValueError):
+                decode_token(token)
+
+
+class TestDeckVersions(unittest.TestCase):
+    """测试牌组版本登记与还原"""
+
+    @classmethod
+    def setUpClass(cls):
+        """类级别的设置"""
+        cls.manager = CardManager(DATA_DIR / 'TarotCards_Full.csv')
+        cls.urls = [card.url for card in cls.manager.get_all_cards()]
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_seeded_reading(self):
+        """测试同一种子得到相同的占卜"""
+        engine = ReadingEngine(self.manager)
+        a = engine.six_card_reading(seeded_rng(12345))
+        b = engine.six_card_reading(seeded_rng(12345))
+        self.assertEqual([(r['card'].url, r['reversed']) for r in a],
+                         [(r['card'].url, r['reversed']) for r in b])
+
+    def test_current_version(self):
+        """测试当前版本直接使用卡牌管理器"""
+        versions = DeckVersions()
+        version = versions.version_of(self.manager)
+        self.assertEqual(version, deck_version(self.urls))
+        self.assertIs(versions.resolve(version, self.manager), self.manager)
+
+    def test_pinned_version(self):
+        """测试数据更新后旧版本按旧的url顺序抽牌"""
+        path = self.tmp_dir / 'deck_versions.json'
+        old_urls = list(reversed(self.urls))
+        DeckVersions(path).register(old_urls)
+        old_version = deck_version(old_urls)
+
+        # 重新加载登记表，模拟重启后的worker
+        versions = DeckVersions(path)
+        self.assertIn(old_version, versions)
+        deck = versions.resolve(old_version, self.manager)
+        self.assertIsInstance(deck, PinnedDeck)
+        self.assertEqual([card.url for card in deck.get_all_cards()], old_urls)
+
+        old_reading = ReadingEngine(PinnedDeck(
+            self.manager.get_card_by_url(url) for url in old_urls)).three_card_reading(seeded_rng(7))
+        new_reading = ReadingEngine(deck).three_card_reading(seeded_rng(7))
+        self.assertEqual([r['card'] for r in old_reading], [r['card'] for r in new_reading])
+
+    def test_removed_card(self):
+        """测试旧版本中的牌已被删除时无法还原"""
+        versions = DeckVersions()
+        version = versions.register(self.urls + ['deleted_card'], persist=False)
+        self.assertIsNone(versions.resolve(version, self.manager))
+        self.assertIsNone(versions.resolve(0, self.manager))
+
+    def test_save(self):
+        """测试登记表文件格式"""
+        path = self.tmp_dir / 'deck_versions.json'
+        version = DeckVersions(path).register(self.urls)
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {f'{version:08x}': self.urls})
+
+    def test_save_merges(self):
+        """测试两个进程各自登记新版本时不会覆盖对方写入的版本"""
+        path = self.tmp_dir / 'deck_versions.json'
+        first, second = DeckVersions(path), DeckVersions(path)
+        old = first.register(self.urls)
+        new = second.register(self.urls[::-1])
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(set(json.load(f)), {f'{old:08x}', f'{new:08x}'})
+        self.assertIn(old, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
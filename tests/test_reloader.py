@@ -0,0 +1,119 @@
+"""
+测试卡牌数据热重载
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from webapp import create_app
+from webapp.reloader import DeckReloader
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+class TestDeckReloader(unittest.TestCase):
+    """测试DeckReloader"""
+
+    def setUp(self):
+        """复制CSV到临时目录，避免修改真实数据"""
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.en_csv = self.tmp_dir / 'TarotCards_Full.csv'
+        self.zh_csv = self.tmp_dir / 'tarot_chinese.csv'
+        shutil.copy(DATA_DIR / 'TarotCards_Full.csv', self.en_csv)
+        shutil.copy(DATA_DIR / 'tarot_chinese.csv', self.zh_csv)
+        self.reloader = DeckReloader({'en': self.en_csv, 'zh': self.zh_csv})
+
+    def tearDown(self):
+        self.reloader.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def _edit_zh(self, old, new):
+        text = self.zh_csv.read_text(encoding='utf-8').replace(old, new, 1)
+        self.zh_csv.write_text(text, encoding='utf-8')
+        # 确保mtime变化（部分文件系统精度较低）
+        stat = self.zh_csv.stat()
+        os.utime(self.zh_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_initial_generation(self):
+        """测试初始代数"""
+        self.assertEqual(self.reloader.generation, 1)
+        self.assertFalse(self.reloader.check())
+
+    def test_reload_on_change(self):
+        """测试数据变化后原子替换牌组"""
+        old = self.reloader.current
+        old_manager = old.manager('zh')
+        self._edit_zh('魔术师', '魔法师')
+        self.assertTrue(self.reloader.check())
+        self.assertEqual(self.reloader.generation, 2)
+        self.assertEqual(self.reloader.reload_count, 1)
+
+        new_card = self.reloader.current.manager('zh').get_card_by_url('the_magician')
+        self.assertEqual(new_card['name'], '魔法师')
+        # 已加载的语言在替换前就已重建
+        self.assertIn('zh', self.reloader.current.loaded_locales())
+        # 旧牌组保持不变，供进行中的请求继续使用
+        old_card = old_manager.get_card_by_url('the_magician')
+        self.assertEqual(old_card['name'], '魔术师')
+
+    def test_touch_without_change(self):
+        """测试只修改mtime不触发重建"""
+        stat = self.en_csv.stat()
+        os.utime(self.en_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertFalse(self.reloader.check())
+        self.assertEqual(self.reloader.generation, 1)
+
+    def test_listener(self):
+        """测试重载回调"""
+        seen = []
+        self.reloader.add_listener(lambda catalog: seen.append(catalog.generation))
+        self.reloader.reload(force=True)
+        self.assertEqual(seen, [2])
+
+    def test_trigger_file(self):
+        """测试一个进程改写触发文件后，另一个进程的监视检查随之重载"""
+        trigger = self.tmp_dir / 'reload.trigger'
+        first = DeckReloader({'en': self.en_csv}, trigger_file=trigger)
+        second = DeckReloader({'en': self.en_csv}, trigger_file=trigger)
+        self.assertTrue(first.request_reload(force=True))
+        self.assertFalse(first.check())
+        self.assertTrue(second.check())
+        self.assertEqual(second.generation, 2)
+
+        # 不强制时，数据未变化则不重建
+        first.request_reload()
+        stat = trigger.stat()
+        os.utime(trigger, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertFalse(second.check())
+        self.assertEqual(second.generation, 2)
+
+
+class TestAdminReload(unittest.TestCase):
+    """测试管理重载接口"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+    def test_disabled_without_token(self):
+        """测试未配置令牌时接口不可用"""
+        self.app.config['ADMIN_TOKEN'] = None
+        response = self.client.post('/admin/reload')
+        self.assertEqual(response.status_code, 404)
+
+    def test_reload_with_token(self):
+        """测试令牌校验与重载"""
+        self.app.config['ADMIN_TOKEN'] = 'secret'
+        response = self.client.post('/admin/reload', headers={'X-Admin-Token': 'wrong'})
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post('/admin/reload?force=1', headers={'X-Admin-Token': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertTrue(data['reloaded'])
+        self.assertEqual(data['generation'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
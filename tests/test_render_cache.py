@@ -0,0 +1,100 @@
+"""
+测试页面渲染缓存
+"""
+import unittest
+from webapp import create_app, routes
+from webapp.render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    """测试RenderCache"""
+
+    def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未用的页面"""
+        cache = RenderCache(max_entries=2)
+        cache.put('a', b'A')
+        cache.put('b', b'B')
+        cache.get('a')
+        cache.put('c', b'C')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a').body, b'A')
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_etag(self):
+        """测试相同内容ETag相同"""
+        cache = RenderCache()
+        self.assertEqual(cache.put('a', b'same').etag, cache.put('b', b'same').etag)
+        self.assertNotEqual(cache.put('c', b'other').etag, cache.get('a').etag)
+
+    def test_counters(self):
+        """测试计数"""
+        cache = RenderCache()
+        cache.get('a')
+        cache.put('a', b'A')
+        cache.get('a')
+        cache.clear()
+        self.assertEqual(cache.stats(), {
+            'entries': 0, 'max_entries': 512, 'hits': 1, 'misses': 1,
+            'evictions': 0, 'invalidations': 1, 'not_modified': 0,
+        })
+
+    def test_disabled(self):
+        """测试容量为0时不缓存"""
+        cache = RenderCache(max_entries=0)
+        self.assertIsNotNone(cache.put('a', b'A').etag)
+        self.assertEqual(len(cache), 0)
+
+
+class TestCachedRoutes(unittest.TestCase):
+    """测试页面缓存与条件请求"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        routes.render_cache.clear()
+
+    def test_not_modified(self):
+        """测试If-None-Match匹配时返回304"""
+        response = self.client.get('/card/the_magician')
+        etag = response.headers['ETag']
+        self.assertIn('max-age', response.headers['Cache-Control'])
+
+        cached = self.client.get('/card/the_magician', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+        stats = routes.render_cache.stats()
+        self.assertEqual((stats['hits'], stats['not_modified']), (1, 1))
+
+    def test_locale_keys(self):
+        """测试不同语言分别缓存"""
+        english = self.client.get('/browse')
+        self.client.get('/set-language/zh')
+        chinese = self.client.get('/browse')
+        self.assertNotEqual(english.headers['ETag'], chinese.headers['ETag'])
+        self.assertIn('魔术师'.encode('utf-8'), chinese.data)
+
+    def test_not_found_not_cached(self):
+        """测试404不缓存"""
+        self.assertEqual(self.client.get('/card/no_such_card').status_code, 404)
+        self.assertEqual(len(routes.render_cache), 0)
+
+    def test_invalidated_on_reload(self):
+        """测试牌组重载后缓存清空"""
+        self.client.get('/browse')
+        self.assertEqual(len(routes.render_cache), 1)
+        routes.deck_reloader.reload(force=True)
+        self.assertEqual(len(routes.render_cache), 0)
+
+    def test_admin_stats(self):
+        """测试管理接口"""
+        self.app.config['ADMIN_TOKEN'] = 'secret'
+        self.client.get('/browse')
+        response = self.client.get('/admin/cache', headers={'X-Admin-Token': 'secret'})
+        self.assertEqual(response.get_json()['entries'], 1)
+        response = self.client.post('/admin/cache', headers={'X-Admin-Token': 'secret'})
+        self.assertEqual(response.get_json()['entries'], 0)
+        self.assertEqual(self.client.get('/admin/cache').status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
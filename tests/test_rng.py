@@ -0,0 +1,54 @@
+"""
+测试抽牌随机数来源
+"""
+import random
+import threading
+import unittest
+from pathlib import Path
+from webapp import rng
+from webapp.models import CardManager, ReadingEngine
+
+
+class TestRandomSources(unittest.TestCase):
+    """测试随机数来源"""
+
+    def tearDown(self):
+        rng.configure('thread')
+
+    def test_thread_local(self):
+        """测试每个线程使用独立的生成器"""
+        generators = []
+        thread = threading.Thread(target=lambda: generators.append(rng.current_rng()))
+        thread.start()
+        thread.join()
+        self.assertIs(rng.current_rng(), rng.current_rng())
+        self.assertIsNot(generators[0], rng.current_rng())
+        self.assertIsInstance(generators[0], random.Random)
+
+    def test_secrets_mode(self):
+        """测试CSPRNG模式"""
+        rng.configure('secrets')
+        self.assertIsInstance(rng.current_rng(), random.SystemRandom)
+        csv_path = Path(__file__).parent.parent / 'data' / 'TarotCards_Full.csv'
+        readings = ReadingEngine(CardManager(csv_path)).six_card_reading()
+        self.assertEqual(sum(r['reversed'] for r in readings), 2)
+
+    def test_unknown_mode(self):
+        """测试未知模式"""
+        with self.assertRaises(ValueError):
+            rng.configure('global')
+
+    def test_orientation_bits(self):
+        """测试正逆位随机位"""
+        generator = random.Random(1)
+        bits = [rng.orientation_bits(generator, 10) for _ in range(2000)]
+        self.assertTrue(all(len(b) == 10 and all(isinstance(x, bool) for x in b) for b in bits))
+        # 每个位置大约一半逆位
+        for position in range(10):
+            share = sum(b[position] for b in bits) / len(bits)
+            self.assertAlmostEqual(share, 0.5, delta=0.06)
+        self.assertEqual(rng.orientation_bits(generator, 0), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
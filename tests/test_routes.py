@@ -1,6 +1,7 @@
 """
 测试Flask路由
 """
+import re
 import unittest
 from webapp import create_app
 
@@ -34,11 +35,72 @@ class TestRoutes(unittest.TestCase):
         response = self.client.get('/six-cards')
         self.assertEqual(response.status_code, 200)
 
+    def test_reading_permalink(self):
+        """测试永久链接还原同一次占卜"""
+        response = self.client.get('/three-cards')
+        match = re.search(rb'/reading/([A-Za-z0-9_-]+)', response.data)
+        self.assertIsNotNone(match)
+        permalink = match.group(0).decode()
+
+        first = self.client.get(permalink)
+        second = self.client.get(permalink)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first.data, response.data)
+        self.assertIn('public', first.headers['Cache-Control'])
+
+    def test_spread_page(self):
+        """测试通用布局路由"""
+        self.client.get('/set-language/zh')
+        response = self.client.get('/spread/celtic-cross')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('凯尔特十字'.encode('utf-8'), response.data)
+        self.assertIn('希望与恐惧'.encode('utf-8'), response.data)
+        self.assertEqual(self.client.get('/spread/no-such-spread').status_code, 404)
+
+    def test_reading_invalid_token(self):
+        """测试无效或未登记的令牌"""
+        self.assertEqual(self.client.get('/reading/not-a-token').status_code, 404)
+        self.assertEqual(self.client.get('/reading/AAAAAAEAAAAAAAE').status_code, 404)
+
+    def test_daily_card(self):
+        """测试每日一牌当天不变，并缓存到访客本地午夜"""
+        self.client.set_cookie('tz', 'Asia/Shanghai')
+        first = self.client.get('/daily-card')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('daily_id=', first.headers['Set-Cookie'])
+        self.assertIn('private', first.headers['Cache-Control'])
+        self.assertLessEqual(first.cache_control.max_age, 86400)
+        # 上海的午夜是UTC 16:00
+        self.assertEqual((first.expires.hour, first.expires.minute), (16, 0))
+
+        second = self.client.get('/daily-card')
+        self.assertNotIn('Set-Cookie', second.headers)
+        self.assertEqual(first.data, second.data)
+
     def test_browse_page(self):
         """测试浏览牌库页面"""
         response = self.client.get('/browse')
         self.assertEqual(response.status_code, 200)
 
+    def test_card_detail_page(self):
+        """测试牌详情页"""
+        response = self.client.get('/card/the_magician')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'/card/the_popess', response.data)
+
+    def test_card_detail_not_found(self):
+        """测试不存在的牌"""
+        response = self.client.get('/card/no_such_card')
+        self.assertEqual(response.status_code, 404)
+
+    def test_set_language(self):
+        """测试切换语言后使用对应语言的牌组"""
+        self.client.get('/set-language/zh')
+        response = self.client.get('/card/the_magician')
+        self.assertIn('魔术师'.encode('utf-8'), response.data)
+        self.assertIn('中文'.encode('utf-8'), response.data)
+
     def test_404_page(self):
         """测试404页面"""
         response = self.client.get('/nonexistent')
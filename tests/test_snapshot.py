@@ -0,0 +1,71 @@
+"""
+测试卡牌数据快照
+"""
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from webapp.models import CardManager
+from webapp.snapshot import compile_snapshot, load_snapshot, read_csv_records, snapshot_path_for
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / 'data'
+
+
+class TestSnapshot(unittest.TestCase):
+    """测试快照编译与加载"""
+
+    def setUp(self):
+        """复制CSV到临时目录，避免修改真实数据"""
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.csv_path = self.tmp_dir / 'TarotCards_Full.csv'
+        shutil.copy(DATA_DIR / 'TarotCards_Full.csv', self.csv_path)
+        self.snapshot_path = snapshot_path_for(self.csv_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_snapshot_matches_csv(self):
+        """测试快照内容与CSV一致"""
+        compile_snapshot(self.csv_path)
+        _, expected = read_csv_records(self.csv_path)
+        self.assertEqual(load_snapshot(self.csv_path), expected)
+
+    def test_missing_snapshot(self):
+        """测试快照缺失时返回None"""
+        self.assertIsNone(load_snapshot(self.csv_path))
+
+    def test_stale_snapshot(self):
+        """测试CSV修改后快照失效"""
+        compile_snapshot(self.csv_path)
+        with open(self.csv_path, 'a', encoding='utf-8') as f:
+            f.write('\n')
+        self.assertIsNone(load_snapshot(self.csv_path))
+
+    def test_manager_prefers_snapshot(self):
+        """测试CardManager优先读取快照且不导入pandas"""
+        compile_snapshot(self.csv_path)
+        manager = CardManager(self.csv_path, self.snapshot_path)
+        self.assertEqual(manager.source, 'snapshot')
+        self.assertEqual(len(manager.get_all_cards()), 78)
+
+        # 在独立进程中确认快照路径不会导入pandas
+        code = (
+            "import sys; from webapp.models import CardManager; "
+            f"CardManager({str(self.csv_path)!r}, {str(self.snapshot_path)!r}); "
+            "sys.exit('pandas' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT)
+        self.assertEqual(result.returncode, 0)
+
+    def test_manager_falls_back_to_csv(self):
+        """测试快照缺失时回退到CSV"""
+        manager = CardManager(self.csv_path, self.snapshot_path)
+        self.assertEqual(manager.source, 'csv')
+        self.assertEqual(len(manager.get_all_cards()), 78)
+
+
+if __name__ == '__main__':
+    unittest.main()
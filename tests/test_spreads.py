@@ -0,0 +1,107 @@
+"""
+测试占卜布局注册表
+"""
+import io
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from webapp.models import CardManager, Placement, ReadingEngine
+from webapp.spreads import SpreadRegistry, extract_spreads, load_spread_definitions
+
+BASE_DIR = Path(__file__).parent.parent
+SPREADS_FILE = BASE_DIR / 'data' / 'spreads.json'
+
+
+class TestSpreadRegistry(unittest.TestCase):
+    """测试布局编译"""
+
+    @classmethod
+    def setUpClass(cls):
+        """类级别的设置"""
+        cls.registry = SpreadRegistry.from_file(
+            SPREADS_FILE, ['en', 'zh', 'ja'], [BASE_DIR / 'translations'])
+        cls.engine = ReadingEngine(CardManager(BASE_DIR / 'data' / 'TarotCards_Full.csv'))
+
+    def test_translated_labels(self):
+        """测试各语言的位置说明已预先翻译"""
+        self.assertEqual(self.registry.get('three', 'en').positions,
+                         ('The Past', 'The Present', 'The Future'))
+        self.assertEqual(self.registry.get('three', 'zh').positions, ('过去', '现在', '未来'))
+        self.assertEqual(self.registry.get('celtic-cross', 'zh').title, '凯尔特十字')
+        # 没有翻译的语言使用英文
+        self.assertEqual(self.registry.get('celtic-cross', 'ja').title, 'Celtic Cross')
+
+    def test_lookup(self):
+        """测试查询与回退"""
+        self.assertIs(self.registry.get('six', 'xx'), self.registry.get('six', 'en'))
+        self.assertIsNone(self.registry.get('missing', 'en'))
+        self.assertEqual(self.registry.name_for_code(3), 'celtic-cross')
+        self.assertEqual(list(self.registry.for_locale('en'))[:3], ['one', 'three', 'six'])
+
+    def test_immutable(self):
+        """测试编译结果不可修改"""
+        spread = self.registry.get('six', 'en')
+        with self.assertRaises(AttributeError):
+            spread.title = 'changed'
+        with self.assertRaises(TypeError):
+            self.registry.for_locale('en')['six'] = spread
+
+    def test_spread_reading(self):
+        """测试按布局占卜保持逆位配额"""
+        for name in ('three', 'six', 'celtic-cross', 'relationship', 'decision', 'birthday'):
+            spread = self.registry.get(name, 'zh')
+            placements = self.engine.spread_reading(spread)
+            self.assertEqual(len(placements), spread.size)
+            self.assertEqual(len({p.card.url for p in placements}), spread.size)
+            self.assertEqual(sum(p.reversed for p in placements), spread.reversed_count)
+            self.assertEqual(tuple(p.position for p in placements), spread.positions)
+            self.assertIsInstance(placements[0], Placement)
+
+    def test_same_draw_as_legacy_methods(self):
+        """测试与 three_card_reading() 抽牌顺序一致（旧的永久链接仍可还原）"""
+        placements = self.engine.spread_reading(self.registry.get('three', 'en'), random.Random(99))
+        legacy = self.engine.three_card_reading(random.Random(99))
+        self.assertEqual([(p.card, p.reversed) for p in placements],
+                         [(r['card'], r['reversed']) for r in legacy])
+
+    def test_batch_readings(self):
+        """测试批量接口可使用注册表中的布局，布局名也按注册表查找"""
+        batch = self.engine.batch_readings(self.registry.get('celtic-cross', 'en'), 1000)
+        self.assertEqual(batch.cards.shape, (1000, 10))
+        self.assertTrue((batch.reversed.sum(axis=1) == 3).all())
+        batch = self.engine.batch_readings('celtic-cross', 10, registry=self.registry)
+        self.assertEqual((batch.spread, batch.cards.shape), ('celtic-cross', (10, 10)))
+        self.assertEqual(self.engine.batch_readings('celtic-cross', 10).cards.shape, (10, 10))
+
+
+class TestSpreadDefinitions(unittest.TestCase):
+    """测试布局定义校验与文本提取"""
+
+    def _write(self, definitions):
+        tmp = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8')
+        with tmp:
+            json.dump(definitions, tmp)
+        self.addCleanup(Path(tmp.name).unlink)
+        return tmp.name
+
+    def test_invalid_definitions(self):
+        """测试重复编号与无效逆位张数"""
+        spec = {'name': 'a', 'code': 1, 'title': 'A', 'heading': 'A', 'subtitle': '',
+                'reversed': 1, 'positions': ['x', 'y']}
+        with self.assertRaises(ValueError):
+            load_spread_definitions(self._write([spec, dict(spec, name='b')]))
+        with self.assertRaises(ValueError):
+            load_spread_definitions(self._write([dict(spec, reversed=3)]))
+
+    def test_extract(self):
+        """测试 pybabel 提取器"""
+        with open(SPREADS_FILE, 'rb') as f:
+            messages = [m[2] for m in extract_spreads(io.BytesIO(f.read()), None, None, None)]
+        self.assertIn('The Past', messages)
+        self.assertIn('Hopes and fears', messages)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,28 @@
 """
 Flask应用工厂
 """
-from flask import Flask, request, session
+from flask import Flask, current_app, request, session
 from flask_babel import Babel
+from babel import Locale, UnknownLocaleError
 from config import config
 
 def get_locale():
     """获取当前语言设置"""
+    locales = current_app.config['BABEL_SUPPORTED_LOCALES']
     # 优先从session获取
-    if 'language' in session:
+    if session.get('language') in locales:
         return session['language']
     # 从浏览器Accept-Language头获取
-    return request.accept_languages.best_match(['en', 'zh'])
+    return request.accept_languages.best_match(locales)
+
+
+def locale_display_name(code):
+    """语言的本地名称，用于语言切换菜单（如 zh -> 中文）"""
+    try:
+        name = Locale.parse(code).display_name
+    except (ValueError, UnknownLocaleError):
+        return code
+    return name[:1].upper() + name[1:]
 
 def create_app(config_name='default'):
     """创建Flask应用实例"""
@@ -21,8 +32,25 @@ def create_app(config_name='default'):
     # 初始化Babel
     babel = Babel(app, locale_selector=get_locale)
 
+    app.jinja_env.filters['locale_name'] = locale_display_name
+
+    # 静态文件使用带摘要的文件名
+    from webapp.assets import init_assets
+    init_assets(app)
+    # 牌面图片从图片包返回（sendfile / X-Accel-Redirect）
+    from webapp.imagepack import init_image_packs
+    init_image_packs(app)
+    # 响应压缩（按 Accept-Encoding 协商，缓存的页面和静态文件使用预压缩结果）
+    from webapp.compression import init_compression
+    init_compression(app)
+    # 自托管字体与 CSS，页面内联首屏 CSS
+    from webapp.frontend import init_frontend
+    init_frontend(app)
+
     # 注册蓝图
     from webapp.routes import main_bp
     app.register_blueprint(main_bp)
+    from webapp.api import api_bp
+    app.register_blueprint(api_bp)
 
     return app
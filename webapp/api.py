@@ -0,0 +1,281 @@
+"""
+JSON API（/api/v1）
+- GET /api/v1/cards：牌列表（默认只含摘要字段）
+- GET /api/v1/cards/<url>：单张牌（默认含全部字段）
+- GET /api/v1/readings/<spread>：按布局占卜，可用 seed 重现
+- GET /api/v1/readings/<spread>/bulk：批量占卜，以NDJSON流式返回
+
+?fields= 选择返回的牌字段，?locale= 选择语言（默认按 Accept-Language）。
+牌列表和单张牌的响应体按 (端点, 参数, 字段, 语言, 牌组代数) 编码一次后缓存，
+附带强ETag，支持条件请求
+"""
+import json
+from flask import Blueprint, current_app, request, abort, url_for, stream_with_context
+from werkzeug.exceptions import HTTPException
+from webapp import routes
+from webapp.models import CARD_FIELDS
+from webapp.permalink import SEED_BITS, encode_token, new_seed, seeded_rng
+from webapp.render_cache import RenderCache
+
+try:
+    import orjson
+except ImportError:  # 可选依赖：未安装时使用标准库 json
+    orjson = None
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# 牌字段：CSV中的字段，加上由 image 生成的图片URL
+API_CARD_FIELDS = CARD_FIELDS + ('image_url',)
+# 牌列表的默认字段（不含解读等长文本）
+LIST_FIELDS = ('url', 'name', 'sequence', 'cardtype', 'image_url')
+
+# 批量占卜每块输出的占卜数
+BULK_CHUNK_READINGS = 64
+
+# 牌资源的编码结果缓存（应用启动时初始化）
+api_cache = None
+
+
+@api_bp.record_once
+def on_load(state):
+    """创建编码结果缓存，牌组重载时清空"""
+    global api_cache
+    api_cache = RenderCache(state.app.config['RENDER_CACHE_SIZE'])
+    routes.deck_reloader.add_listener(api_cache.clear)
+
+
+def dumps(obj):
+    """
+    紧凑的JSON编码（UTF-8字节串）
+    安装了 orjson 时使用 orjson
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_response(data, status=200):
+    return current_app.response_class(dumps(data), status=status, mimetype='application/json')
+
+
+@api_bp.errorhandler(HTTPException)
+def api_error(error):
+    """API中的错误统一返回JSON"""
+    return _json_response({'status': 'error',
+                           'error': {'code': error.code, 'message': error.description}},
+                          error.code)
+
+
+def _get_locale():
+    """
+    请求的语言：?locale= 优先，其次 Accept-Language，最后为默认语言
+
+    Raises:
+        400: 不支持的语言
+    """
+    locales = current_app.config['BABEL_SUPPORTED_LOCALES']
+    locale = request.args.get('locale')
+    if locale is not None:
+        if locale not in locales:
+            abort(400, description=f"unsupported locale: {locale}")
+        return locale
+    return request.accept_languages.best_match(locales) or current_app.config['BABEL_DEFAULT_LOCALE']
+
+
+def _get_fields(default):
+    """
+    ?fields= 指定的牌字段（逗号分隔，按给出的顺序），未指定时返回 default
+
+    Raises:
+        400: 未知字段
+    """
+    value = request.args.get('fields')
+    if value is None:
+        return default
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in API_CARD_FIELDS]
+    if unknown:
+        abort(400, description=f"unknown fields: {', '.join(unknown)}")
+    if not fields:
+        abort(400, description="fields must not be empty")
+    return fields
+
+
+def _project(card, fields):
+    """牌 -> 只含指定字段的字典"""
+    return {name: url_for('static', filename=card['image']) if name == 'image_url' else card[name]
+            for name in fields}
+
+
+def _cached_json(build, *key):
+    """
+    缓存编码后的响应体并按条件请求返回
+
+    Args:
+        build (callable): 未命中时调用，返回待编码的对象
+        *key: 缓存键中除牌组代数之外的部分
+    """
+    key = (request.endpoint,) + key + (routes._get_catalog().generation,)
+    page = api_cache.get(key)
+    if page is None:
+        page = api_cache.put(key, dumps(build()))
+    return routes.send_cached(api_cache, page, 'application/json', ('Accept-Language',))
+
+
+@api_bp.route('/cards')
+def cards():
+    """牌列表"""
+    locale = _get_locale()
+    fields = _get_fields(LIST_FIELDS)
+
+    def build():
+        manager = routes._get_catalog().manager(locale)
+        data = [_project(card, fields) for card in manager.get_all_cards()]
+        return {'status': 'success', 'locale': locale, 'count': len(data), 'data': data}
+    return _cached_json(build, locale, fields)
+
+
+@api_bp.route('/cards/<card_url>')
+def card(card_url):
+    """单张牌"""
+    locale = _get_locale()
+    fields = _get_fields(API_CARD_FIELDS)
+    manager = routes._get_catalog().manager(locale)
+    found = manager.get_card_by_url(card_url)
+    if found is None:
+        abort(404, description=f"card not found: {card_url}")
+
+    def build():
+        return {'status': 'success', 'locale': locale, 'data': _project(found, fields)}
+    return _cached_json(build, card_url, locale, fields)
+
+
+def _get_seed():
+    """?seed= 指定的种子（0 ≤ seed < 2^48），未指定时生成新种子"""
+    value = request.args.get('seed')
+    if value is None:
+        return new_seed()
+    try:
+        seed = int(value)
+    except ValueError:
+        seed = -1
+    if not 0 <= seed < 1 << SEED_BITS:
+        abort(400, description=f"seed must be an integer in [0, 2^{SEED_BITS})")
+    return seed
+
+
+def _get_spread(name, locale):
+    """某语言的布局，不存在时返回404"""
+    spread = routes.spread_registry.get(name, locale)
+    if spread is None:
+        abort(404, description=f"unknown spread: {name}")
+    return spread
+
+
+def _reading_data(spread, placements, seed, token, permalink, project):
+    """
+    一次占卜 -> 可编码的字典
+
+    Args:
+        permalink (str): 永久链接
+        project (callable): project(card) -> 牌的字段字典
+    """
+    return {
+        'spread': spread.name,
+        'title': spread.title,
+        'seed': seed,
+        'token': token,
+        'permalink': permalink,
+        'cards': [{
+            'position': placement.position,
+            'reversed': placement.reversed,
+            'interpretation': placement.card['rdesc' if placement.reversed else 'desc'],
+            'card': project(placement.card),
+        } for placement in placements],
+    }
+
+
+@api_bp.route('/readings/<spread_name>')
+def reading(spread_name):
+    """
+    按布局占卜
+    结果由 (牌组版本, 布局, 种子) 决定：指定 seed 时可缓存，同时返回可还原该结果的永久链接
+    """
+    locale = _get_locale()
+    fields = _get_fields(LIST_FIELDS)
+    spread = _get_spread(spread_name, locale)
+    seeded = 'seed' in request.args
+    seed = _get_seed()
+
+    catalog = routes._get_catalog()
+    token = encode_token(routes.deck_versions.version_of(catalog.manager(locale)), spread.code, seed)
+    placements = catalog.engine(locale).spread_reading(spread, seeded_rng(seed))
+    data = _reading_data(spread, placements, seed, token, url_for('main.reading', token=token),
+                         lambda card: _project(card, fields))
+    response = _json_response({'status': 'success', 'locale': locale, 'data': data})
+    if seeded:
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['READING_CACHE_MAX_AGE']
+    else:
+        response.cache_control.no_store = True
+    response.vary.add('Accept-Language')
+    return response
+
+
+def _bulk_lines(engine, spread, count, seed, version, fields):
+    """
+    逐个生成占卜的NDJSON行，每 BULK_CHUNK_READINGS 个拼成一块输出
+
+    每次占卜的种子依次取自以 seed 播种的生成器，各行都带可还原该次结果的令牌；
+    同一 seed 总是得到同一串结果。内存占用与 count 无关
+    """
+    master = seeded_rng(seed)
+    spread_reading = engine.spread_reading
+    # 令牌只含URL安全字符，永久链接直接拼接，不必每行调用 url_for
+    permalink_prefix = url_for('main.reading', token='-')[:-1]
+    projections = {}
+
+    def project(card):
+        # 同一张牌的字段字典只生成一次
+        projected = projections.get(card['url'])
+        if projected is None:
+            projected = projections[card['url']] = _project(card, fields)
+        return projected
+
+    chunk = []
+    for _ in range(count):
+        reading_seed = master.getrandbits(SEED_BITS)
+        token = encode_token(version, spread.code, reading_seed)
+        placements = spread_reading(spread, seeded_rng(reading_seed))
+        chunk.append(dumps(_reading_data(spread, placements, reading_seed, token,
+                                         permalink_prefix + token, project)))
+        if len(chunk) == BULK_CHUNK_READINGS:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
+
+
+@api_bp.route('/readings/<spread_name>/bulk')
+def bulk_readings(spread_name):
+    """
+    批量占卜：以NDJSON（每行一次占卜）流式返回 count 次占卜
+    生成器只在服务器写出上一块之后才继续抽牌，客户端读得慢时不会在内存中堆积结果
+    """
+    locale = _get_locale()
+    fields = _get_fields(LIST_FIELDS)
+    spread = _get_spread(spread_name, locale)
+    limit = current_app.config['BULK_READINGS_MAX']
+    count = request.args.get('count', type=int)
+    if count is None or not 1 <= count <= limit:
+        abort(400, description=f"count must be an integer in [1, {limit}]")
+    seed = _get_seed()
+
+    # 在生成器开始前固定牌组，整个响应使用同一代牌组
+    catalog = routes._get_catalog()
+    version = routes.deck_versions.version_of(catalog.manager(locale))
+    lines = _bulk_lines(catalog.engine(locale), spread, count, seed, version, fields)
+    response = current_app.response_class(stream_with_context(lines), mimetype='application/x-ndjson')
+    response.headers['X-Reading-Seed'] = str(seed)
+    response.cache_control.no_store = True
+    return response
@@ -0,0 +1,207 @@
+"""
+ASGI 服务模式
+把 create_app() 创建的 Flask 应用（同一套 CardManager/ReadingEngine、模板和路由）包装成 ASGI 应用，
+由 uvicorn 等 ASGI 服务器运行。
+
+同步 gunicorn worker 在把响应写给客户端期间一直被占用，一个下载很慢的客户端
+（例如正在下载约 90 KB 的牌面图片）就会拖住整个 worker。这里的适配器只在线程池中
+执行 Flask 代码、逐块生成响应体，写给客户端则在事件循环中异步进行：
+慢客户端只占用一个协程，不占用线程
+"""
+import asyncio
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.wsgi import FileWrapper
+
+# 文件响应（静态图片等）每次从线程池读取的块大小
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+def _file_wrapper(filelike, block_size=8192):
+    """wsgi.file_wrapper：用更大的块读取文件，减少线程切换次数"""
+    return FileWrapper(filelike, max(block_size, FILE_CHUNK_SIZE))
+
+
+def build_environ(scope, body):
+    """
+    ASGI HTTP scope -> WSGI environ（PEP 3333）
+
+    Args:
+        scope (dict): ASGI scope
+        body (bytes): 请求体
+    """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    # WSGI 的 PATH_INFO 为已解码路径的 latin-1 字符串
+    path = scope['path'].encode('utf-8')
+    root_path = scope.get('root_path', '').encode('utf-8')
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.decode('latin-1'),
+        'PATH_INFO': path.decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'wsgi.file_wrapper': _file_wrapper,
+    }
+    for raw_name, raw_value in scope.get('headers', ()):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        # 同名请求头按逗号合并
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class AsgiApp:
+    """
+    运行 WSGI（Flask）应用的 ASGI 适配器
+
+    Attributes:
+        flask_app (Flask): 被包装的应用
+    """
+    def __init__(self, flask_app, threads=8):
+        """
+        Args:
+            flask_app (Flask): 应用
+            threads (int): 执行 Flask 代码的线程数
+        """
+        self.flask_app = flask_app
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+
+    async def _lifespan(self, receive, send):
+        """启动时无需额外工作（牌组在 create_app 时已加载）；关闭时停止重载线程和线程池"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                from webapp import routes
+                if routes.deck_reloader is not None:
+                    routes.deck_reloader.stop()
+                self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        loop = asyncio.get_running_loop()
+        # 同一请求的各步在同一个 contextvars 上下文中执行：stream_with_context 的生成器
+        # 在第一块时压入请求上下文，在最后一块之后弹出，中间可能换了线程
+        context = contextvars.copy_context()
+
+        def call(func, *args):
+            return loop.run_in_executor(self._executor, context.run, func, *args)
+
+        environ = build_environ(scope, b''.join(chunks))
+        status, headers, chunk, body = await call(self._start, environ)
+        try:
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            # 每块在线程池中生成，在事件循环中发送；发送完上一块才生成下一块
+            while body is not None and chunk is not None:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await call(body.next_chunk)
+            await send({'type': 'http.response.body', 'body': chunk or b''})
+        finally:
+            if body is not None and not body.closed:
+                await call(body.close)
+
+    def _start(self, environ):
+        """
+        在线程中调用 WSGI 应用，取得状态行、响应头和第一块响应体
+
+        Returns:
+            tuple: (状态码, 响应头列表, 第一块, 响应体)；响应已全部取出时响应体为None
+        """
+        started = []
+
+        def start_response(status, response_headers, exc_info=None):
+            started[:] = [status, response_headers]
+
+        body = _Body(self.flask_app(environ, start_response))
+        # 按 WSGI 规范，start_response 可以推迟到产生第一块响应体时才调用
+        first = body.next_chunk()
+        status, response_headers = started
+        headers = []
+        length = None
+        for name, value in response_headers:
+            headers.append((name.lower().encode('latin-1'), value.encode('latin-1')))
+            if name.lower() == 'content-length':
+                length = int(value)
+        # 普通页面和JSON只有一块：第一块已满足 Content-Length 时就地结束，省去后续的线程切换
+        if first is None or (length is not None and len(first) >= length):
+            body.close()
+            body = None
+        return int(status.split(' ', 1)[0]), headers, first, body
+
+
+class _Body:
+    """WSGI 响应体：逐块读取，读完或出错时关闭"""
+    __slots__ = ('result', 'iterator', 'closed')
+
+    def __init__(self, result):
+        self.result = result
+        self.iterator = iter(result)
+        self.closed = False
+
+    def next_chunk(self):
+        """下一块；已读完时关闭并返回None"""
+        chunk = next(self.iterator, None)
+        if chunk is None:
+            self.close()
+        return chunk
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        close = getattr(self.result, 'close', None)
+        if close is not None:
+            close()
+
+
+def create_asgi_app(config_name='default'):
+    """
+    创建 ASGI 应用
+
+    Args:
+        config_name (str): 配置名（同 create_app）
+
+    Returns:
+        AsgiApp: ASGI 应用
+    """
+    from webapp import create_app
+    app = create_app(config_name)
+    return AsgiApp(app, app.config['ASGI_THREADS'])
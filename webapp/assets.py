@@ -0,0 +1,186 @@
+"""
+静态资源指纹
+部署时（scripts/build_assets.py）为 webapp/static 下的每个文件生成带内容摘要的副本
+（如 css/style.css -> css/style.1a2b3c4d5e6f.css），并写入清单。
+应用加载清单后，url_for('static', filename=...) 输出带摘要的文件名；
+这些文件内容永不改变，以 Cache-Control: immutable 和一年的 max-age 返回
+
+副本尽量用硬链接，不额外占用磁盘；CSS 中 url() 引用的文件先替换为带摘要的文件名，
+再计算 CSS 自身的摘要，引用的图片变化时 CSS 的文件名也随之变化。
+文本文件（CSS、JS、SVG、JSON）的副本另有预压缩的 .br/.gz（见 webapp/compression.py），按 Accept-Encoding 返回
+"""
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+from pathlib import Path
+from flask import request
+from webapp.compression import PRECOMPRESS_LEVELS, compress, encodings, is_compressible
+from webapp.images import file_digest
+
+# 文件名中摘要的长度（十六进制）
+ASSET_HASH_LENGTH = 12
+# 带摘要的文件的HTTP缓存时间（一年）
+ASSET_MAX_AGE = 365 * 86400
+
+_HASHED_NAME = re.compile(r'^(.+)\.[0-9a-f]{%d}(\.[^./]+)$' % ASSET_HASH_LENGTH)
+_CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+
+
+def hashed_name(name, digest):
+    """css/style.css -> css/style.<摘要>.css"""
+    stem, ext = posixpath.splitext(name)
+    return f'{stem}.{digest[:ASSET_HASH_LENGTH]}{ext}'
+
+
+def _is_output(static_dir, name):
+    """是否为本模块生成的副本或其预压缩文件（去掉摘要后的原文件存在）"""
+    stem, ext = posixpath.splitext(name)
+    if ext in ('.gz', '.br'):
+        name = stem
+    match = _HASHED_NAME.match(name)
+    return match is not None and (static_dir / (match.group(1) + match.group(2))).is_file()
+
+
+def _rewrite_css(name, text, assets):
+    """把 CSS 中 url() 引用的本地文件替换为带摘要的文件名（保持相对路径）"""
+    base = posixpath.dirname(name)
+
+    def replace(match):
+        quote, ref = match.groups()
+        path, sep, suffix = ref.partition('?')
+        if path.startswith(('/', 'data:', 'http:', 'https:', '#')):
+            return match.group(0)
+        target = assets.get(posixpath.normpath(posixpath.join(base, path)))
+        if target is None:
+            return match.group(0)
+        return f'url({quote}{posixpath.relpath(target, base) if base else target}{sep}{suffix}{quote})'
+    return _CSS_URL.sub(replace, text)
+
+
+def build_asset_manifest(static_dir, manifest_path):
+    """
+    生成带摘要的副本和清单，删除清单中不再使用的旧副本
+
+    Args:
+        static_dir (str|Path): 静态文件目录
+        manifest_path (str|Path): 清单文件
+
+    Returns:
+        dict: 统计（assets/created/removed）
+    """
+    static_dir = Path(static_dir)
+    names = sorted(path.relative_to(static_dir).as_posix() for path in static_dir.rglob('*')
+                   if path.is_file() and not path.name.startswith('.'))
+    names = [name for name in names if not _is_output(static_dir, name)]
+
+    assets = {}
+    created = 0
+    # 先处理其他文件，CSS 需要用到它们带摘要的文件名
+    for name in sorted(names, key=lambda n: n.endswith('.css')):
+        source = static_dir / name
+        if name.endswith('.css'):
+            body = _rewrite_css(name, source.read_text(encoding='utf-8'), assets).encode('utf-8')
+            target = assets[name] = hashed_name(name, hashlib.sha256(body).hexdigest())
+            if not (static_dir / target).exists():
+                tmp = (static_dir / target).with_name(f'.{Path(target).name}.{os.getpid()}.tmp')
+                tmp.write_bytes(body)
+                os.replace(tmp, static_dir / target)
+                created += 1
+            continue
+        target = assets[name] = hashed_name(name, file_digest(source))
+        if not (static_dir / target).exists():
+            try:
+                os.link(source, static_dir / target)
+            except OSError:
+                shutil.copy2(source, static_dir / target)
+            created += 1
+
+    # 文本文件的预压缩版本（副本内容不变，已存在时跳过）
+    precompressed = sorted(target for target in assets.values() if is_compressible(target))
+    compressed = 0
+    for target in precompressed:
+        body = None
+        for encoding, suffix in encodings().items():
+            path = static_dir / (target + suffix)
+            if not path.exists():
+                if body is None:
+                    body = (static_dir / target).read_bytes()
+                tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+                tmp.write_bytes(compress(body, encoding, PRECOMPRESS_LEVELS[encoding]))
+                os.replace(tmp, path)
+                compressed += 1
+
+    # 删除上次生成、这次不再使用的副本
+    removed = 0
+    manifest_path = Path(manifest_path)
+    if manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as f:
+            previous = json.load(f)['assets']
+        current = set(assets.values())
+        for target in set(previous.values()) - current:
+            path = static_dir / target
+            if path.is_file():
+                path.unlink()
+                removed += 1
+            # 副本的预压缩文件
+            for suffix in ('.gz', '.br'):
+                path = static_dir / (target + suffix)
+                if path.is_file():
+                    path.unlink()
+
+    tmp = manifest_path.with_name(f'.{manifest_path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'assets': assets, 'precompressed': precompressed}, f, indent=1, sort_keys=True)
+    os.replace(tmp, manifest_path)
+    return {'assets': len(assets), 'created': created, 'compressed': compressed, 'removed': removed}
+
+
+class AssetManifest:
+    """
+    静态文件名 -> 带摘要的文件名（运行时只读）
+    清单不存在时为空，url_for 输出原文件名；precompressed 为有预压缩文件的带摘要文件名
+    """
+    def __init__(self, assets=None, precompressed=()):
+        self.assets = assets or {}
+        self.hashed = frozenset(self.assets.values())
+        self.precompressed = frozenset(precompressed)
+
+    @classmethod
+    def load(cls, path):
+        if not path or not Path(path).exists():
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['assets'], data.get('precompressed', ()))
+
+    def __len__(self):
+        return len(self.assets)
+
+
+def init_assets(app):
+    """
+    加载 app.config['ASSET_MANIFEST']，让 url_for('static') 输出带摘要的文件名，
+    并为带摘要的文件设置长期缓存
+    """
+    manifest = AssetManifest.load(app.config.get('ASSET_MANIFEST'))
+    app.extensions['asset_manifest'] = manifest
+    if not manifest:
+        return
+
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = manifest.assets.get(values['filename'], values['filename'])
+
+    @app.after_request
+    def immutable_static(response):
+        if (request.endpoint == 'static' and response.status_code in (200, 206, 304)
+                and request.view_args.get('filename') in manifest.hashed):
+            response.cache_control.public = True
+            response.cache_control.max_age = ASSET_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
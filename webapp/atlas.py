@@ -0,0 +1,284 @@
+"""
+牌库缩略图拼图（sprite atlas）
+把一个牌组的全部牌面缩略图按牌组顺序拼成一张大图（1x、2x 各一张，每种格式一份），
+并生成坐标表；牌库页用 CSS 背景定位显示各张牌，整页只下载一张图片。
+
+拼图以 (布局设置, 按牌组顺序的图片名及其内容摘要) 的摘要命名：
+牌面图片或牌组顺序改变时摘要随之改变，自动生成新的拼图
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from webapp.images import available_formats, file_digest
+
+logger = logging.getLogger(__name__)
+
+ATLAS_DIR = 'atlas'
+# 每行的牌数
+ATLAS_COLUMNS = 13
+# 1x 瓦片宽度（像素）；2x 为两倍，不超过源图片宽度
+ATLAS_TILE_WIDTH = 150
+ATLAS_SCALES = (1, 2)
+# 各格式的编码参数
+_SAVE_OPTIONS = {
+    'avif': {'quality': 50, 'speed': 8},
+    'webp': {'quality': 78, 'method': 4},
+    'jpeg': {'quality': 80, 'optimize': True, 'progressive': True},
+}
+
+
+def atlas_formats():
+    """
+    拼图的输出格式：AVIF（Pillow 支持时）和 WebP
+    支持 image-set() 的浏览器都支持 WebP，不再生成 JPEG（除非 Pillow 不支持 WebP）
+
+    Raises:
+        ImportError: 未安装 Pillow
+    """
+    return tuple(fmt for fmt in available_formats() if fmt != 'jpeg') or ('jpeg',)
+
+
+def atlas_key(digests):
+    """
+    拼图的摘要（输出格式取决于构建环境的 Pillow，记录在坐标表中，不计入摘要）
+
+    Args:
+        digests (list): 按牌组顺序的 (图片名, 内容摘要)
+    """
+    settings = [ATLAS_COLUMNS, ATLAS_TILE_WIDTH, list(ATLAS_SCALES), _SAVE_OPTIONS]
+    data = json.dumps([settings, digests], sort_keys=True).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class CardAtlas:
+    """
+    一张拼图的坐标表
+
+    Attributes:
+        columns/rows (int): 瓦片的列数和行数
+        tile_width/tile_height (int): 1x 瓦片尺寸
+        files (list): [(倍数, [(格式, 相对静态目录的文件)])]，格式按优先顺序
+    """
+    __slots__ = ('key', 'columns', 'rows', 'tile_width', 'tile_height', 'files', 'positions')
+
+    def __init__(self, key, columns, rows, tile_width, tile_height, files, images):
+        self.key = key
+        self.columns = columns
+        self.rows = rows
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.files = [(scale, [tuple(f) for f in formats]) for scale, formats in files]
+        self.positions = {name: index for index, name in enumerate(images)}
+
+    @property
+    def sources(self):
+        """image-set() 的各项：[(倍数, 格式, 文件)]"""
+        return [(scale, fmt, file) for scale, formats in self.files for fmt, file in formats]
+
+    @property
+    def fallback(self):
+        """不支持 image-set() 时使用的文件（1x 的最后一种格式）"""
+        return self.files[0][1][-1][1]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(**data)
+
+    def position(self, filename):
+        """
+        某张图片的 CSS background-position（百分比）
+
+        Returns:
+            str: 不在拼图中时返回None
+        """
+        index = self.positions.get(filename)
+        if index is None:
+            return None
+        row, column = divmod(index, self.columns)
+        x = column * 100 / (self.columns - 1) if self.columns > 1 else 0
+        y = row * 100 / (self.rows - 1) if self.rows > 1 else 0
+        return f'{x:g}% {y:g}%'
+
+
+def build_atlas(static_dir, filenames, key, formats):
+    """
+    生成拼图和坐标表 atlas/<key>.json
+
+    Args:
+        static_dir (str|Path): 静态文件目录
+        filenames (list): 按牌组顺序的图片（相对 static_dir）
+        key (str): atlas_key() 的结果
+        formats (tuple): 输出格式
+
+    Returns:
+        CardAtlas: 坐标表
+    """
+    from PIL import Image
+
+    static_dir = Path(static_dir)
+    out_dir = static_dir / ATLAS_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sources = []
+    for filename in filenames:
+        with Image.open(static_dir / filename) as image:
+            sources.append(image.convert('RGB'))
+    # 瓦片按第一张图片的宽高比，其他图片缩放到同一尺寸
+    ratio = sources[0].height / sources[0].width
+    max_width = min(image.width for image in sources)
+    columns = min(ATLAS_COLUMNS, len(sources))
+    rows = -(-len(sources) // columns)
+
+    files = []
+    for scale in ATLAS_SCALES:
+        width = min(ATLAS_TILE_WIDTH * scale, max_width)
+        height = round(width * ratio)
+        canvas = Image.new('RGB', (columns * width, rows * height))
+        for index, image in enumerate(sources):
+            row, column = divmod(index, columns)
+            canvas.paste(image.resize((width, height), Image.LANCZOS), (column * width, row * height))
+        scale_files = []
+        for fmt in formats:
+            target = f'{ATLAS_DIR}/{key}.{scale}x.{fmt}'
+            path = static_dir / target
+            tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+            canvas.save(tmp, format=fmt.upper(), **_SAVE_OPTIONS[fmt])
+            os.replace(tmp, path)
+            scale_files.append((fmt, target))
+        files.append((scale, scale_files))
+
+    tile_width = min(ATLAS_TILE_WIDTH, max_width)
+    data = {'key': key, 'columns': columns, 'rows': rows, 'tile_width': tile_width,
+            'tile_height': round(tile_width * ratio), 'files': files, 'images': list(filenames)}
+    # 坐标表最后写入：它存在即表示拼图已完整生成
+    path = out_dir / f'{key}.json'
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+    return CardAtlas(**data)
+
+
+class CardAtlases:
+    """
+    各牌组的拼图（线程安全）
+    按牌组当前的图片顺序和内容查找拼图。不存在且允许自动生成时在后台线程中生成
+    （约需十几秒），期间返回None；生成完成后调用已注册的回调
+    """
+    def __init__(self, static_dir, autobuild=True):
+        """
+        Args:
+            static_dir (str|Path): 静态文件目录
+            autobuild (bool): 拼图不存在时是否生成（需要 Pillow）
+        """
+        self.static_dir = Path(static_dir)
+        self.autobuild = autobuild
+        self.builds = 0
+        self._atlases = {}
+        self._digests = {}
+        self._building = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """注册回调，新拼图生成后调用 callback(atlas)"""
+        self._listeners.append(callback)
+
+    def _digest(self, filename):
+        """图片内容摘要，按 (修改时间, 大小) 缓存"""
+        stat = (self.static_dir / filename).stat()
+        cached = self._digests.get(filename)
+        if cached is None or cached[0] != (stat.st_mtime_ns, stat.st_size):
+            cached = self._digests[filename] = ((stat.st_mtime_ns, stat.st_size),
+                                                file_digest(self.static_dir / filename))
+        return cached[1]
+
+    def for_images(self, filenames):
+        """
+        按顺序包含这些图片的拼图
+
+        Args:
+            filenames (list): 按牌组顺序的图片（相对静态目录）
+
+        Returns:
+            CardAtlas: 没有拼图（或正在生成）时返回None
+        """
+        filenames = list(filenames)
+        if not filenames:
+            return None
+        with self._lock:
+            try:
+                key = atlas_key([(name, self._digest(name)) for name in filenames])
+            except Exception:
+                # 摘要失败时牌库页逐张输出图片，不影响页面
+                logger.exception("Card atlas digest failed")
+                return None
+            atlas = self._atlases.get(key)
+            if atlas is not None:
+                return atlas
+            path = self.static_dir / ATLAS_DIR / f'{key}.json'
+            if path.exists():
+                atlas = self._atlases[key] = CardAtlas.load(path)
+                return atlas
+            if self.autobuild and key not in self._building:
+                try:
+                    formats = atlas_formats()
+                except ImportError:  # 未安装 Pillow 时只能使用已生成的拼图
+                    return None
+                thread = threading.Thread(target=self._build, args=(filenames, key, formats),
+                                          name='atlas-builder', daemon=True)
+                self._building[key] = thread
+                thread.start()
+            return None
+
+    def _build(self, filenames, key, formats):
+        try:
+            atlas = build_atlas(self.static_dir, filenames, key, formats)
+        except Exception:
+            logger.exception("Card atlas build failed: %s", key)
+            with self._lock:
+                del self._building[key]
+            return
+        with self._lock:
+            self._atlases[key] = atlas
+            self.builds += 1
+            del self._building[key]
+        logger.info("Card atlas built: %s", key)
+        for callback in self._listeners:
+            callback(atlas)
+
+    def wait(self):
+        """等待正在进行的生成完成"""
+        with self._lock:
+            threads = list(self._building.values())
+        for thread in threads:
+            thread.join()
+
+    def for_deck(self, manager):
+        """某个牌组（CardManager）的拼图，见 for_images"""
+        return self.for_images(card['image'] for card in manager.get_all_cards())
+
+
+def remove_stale_atlases(static_dir, keep):
+    """
+    删除不再使用的拼图
+
+    Args:
+        static_dir (str|Path): 静态文件目录
+        keep (set): 保留的拼图摘要
+
+    Returns:
+        int: 删除的文件数
+    """
+    out_dir = Path(static_dir) / ATLAS_DIR
+    removed = 0
+    if out_dir.is_dir():
+        for path in out_dir.iterdir():
+            if path.name.split('.', 1)[0] not in keep:
+                path.unlink()
+                removed += 1
+    return removed
@@ -0,0 +1,192 @@
+"""
+批量占卜生成
+一次生成N次占卜：用NumPy矩阵完成抽牌（每行不重复）和正逆位分配，
+结果保存为紧凑的 (牌下标, 是否逆位) 数组，按需再物化为 Card
+供模拟、预生成等离线任务使用；NumPy 只在调用批量接口时才导入
+"""
+from itertools import combinations
+from math import comb
+import numpy as np
+from webapp.spreads import default_registry
+
+# 逆位组合数不超过该值时预先列出全部组合，按随机编号取行
+_MAX_PATTERNS = 4096
+
+
+def _index_dtype(deck_size):
+    """能容纳牌下标的最小整数类型"""
+    if deck_size <= 2 ** 8:
+        return np.uint8
+    if deck_size <= 2 ** 16:
+        return np.uint16
+    return np.uint32
+
+
+def _duplicate_rows(picks):
+    """每行是否含重复下标"""
+    width = picks.shape[1]
+    if width == 2:
+        return picks[:, 0] == picks[:, 1]
+    if width == 3:
+        a, b, c = picks.T
+        return (a == b) | (a == c) | (b == c)
+    ordered = np.sort(picks, axis=1)
+    return (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+
+
+def draw_indices(rng, count, size, deck_size):
+    """
+    生成 count 行、每行 size 个互不重复的牌下标（行内顺序即牌位顺序）
+
+    Args:
+        rng (np.random.Generator): 随机数生成器
+        count (int): 占卜次数
+        size (int): 每次的牌数
+        deck_size (int): 牌组大小
+
+    Returns:
+        np.ndarray: 形状为 (count, size) 的下标矩阵
+    """
+    dtype = _index_dtype(deck_size)
+    if size * size <= deck_size * 2:
+        # 牌数远小于牌组时行内很少重复（整行被接受的概率约 e^(-size²/2N) ≥ 1/e）：
+        # 整体有放回抽样，只重抽有重复的行。整行重抽，结果仍是不重复排列上的均匀分布
+        picks = rng.integers(0, deck_size, size=(count, size), dtype=dtype)
+        if size > 1:
+            bad = np.flatnonzero(_duplicate_rows(picks))
+            while len(bad):
+                redraw = rng.integers(0, deck_size, size=(len(bad), size), dtype=dtype)
+                picks[bad] = redraw
+                bad = bad[_duplicate_rows(redraw)]
+        return picks
+    # 否则对每行的随机键排序，取前 size 个（均匀随机排列的前缀）
+    keys = rng.random((count, deck_size))
+    return np.argsort(keys, axis=1)[:, :size].astype(dtype)
+
+
+def draw_orientations(rng, count, size, reversed_count=None):
+    """
+    生成正逆位矩阵
+
+    Args:
+        rng (np.random.Generator): 随机数生成器
+        count (int): 占卜次数
+        size (int): 每次的牌数
+        reversed_count (int): 每行恰好逆位的张数，None 表示独立随机
+
+    Returns:
+        np.ndarray: 形状为 (count, size) 的布尔矩阵，True 为逆位
+    """
+    if reversed_count is None:
+        return rng.integers(0, 2, size=(count, size), dtype=np.uint8).view(np.bool_)
+    patterns = _orientation_patterns(size, reversed_count)
+    if patterns is not None:
+        return patterns[rng.integers(0, len(patterns), size=count)]
+    # 组合太多时：随机键最小的 reversed_count 个位置为逆位
+    keys = rng.random((count, size))
+    ranks = np.argsort(np.argsort(keys, axis=1), axis=1)
+    return ranks < reversed_count
+
+
+_pattern_cache = {}
+
+
+def _orientation_patterns(size, reversed_count):
+    """列出 size 个位置中恰有 reversed_count 个逆位的全部组合（缓存，只读）"""
+    key = (size, reversed_count)
+    if key not in _pattern_cache:
+        patterns = None
+        if comb(size, reversed_count) <= _MAX_PATTERNS:
+            chosen = list(combinations(range(size), reversed_count))
+            patterns = np.zeros((len(chosen), size), dtype=np.bool_)
+            for row, positions in enumerate(chosen):
+                patterns[row, list(positions)] = True
+            patterns.flags.writeable = False
+        _pattern_cache[key] = patterns
+    return _pattern_cache[key]
+
+
+class ReadingBatch:
+    """
+    一批同一布局的占卜结果
+
+    Attributes:
+        spread (str): 布局名
+        cards (np.ndarray): (N, 牌数) 的牌下标矩阵，对应 card_manager.get_all_cards()
+        reversed (np.ndarray): (N, 牌数) 的布尔矩阵，True 为逆位
+        card_manager (CardManager): 物化时使用的卡牌管理器
+    """
+    __slots__ = ('spread', 'cards', 'reversed', 'card_manager')
+
+    def __init__(self, spread, cards, reversed, card_manager):
+        self.spread = spread
+        self.cards = cards
+        self.reversed = reversed
+        self.card_manager = card_manager
+
+    def __len__(self):
+        return len(self.cards)
+
+    @property
+    def nbytes(self):
+        """结果占用（字节）"""
+        return self.cards.nbytes + self.reversed.nbytes
+
+    def records(self):
+        """
+        紧凑的结构化数组视图
+
+        Returns:
+            np.ndarray: (N, 牌数) 的结构化数组，字段为 card 与 reversed
+        """
+        out = np.empty(self.cards.shape, dtype=[('card', self.cards.dtype), ('reversed', np.bool_)])
+        out['card'] = self.cards
+        out['reversed'] = self.reversed
+        return out
+
+    def __getitem__(self, i):
+        """
+        物化第i次占卜
+
+        Returns:
+            list: 每个元素为 (card, is_reversed)，与 ReadingEngine.draw_cards() 相同
+        """
+        cards = self.card_manager.get_all_cards()
+        return [(cards[index], is_reversed)
+                for index, is_reversed in zip(self.cards[i].tolist(), self.reversed[i].tolist())]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def generate_batch(card_manager, spread, count, seed=None, registry=None):
+    """
+    批量生成占卜
+
+    Args:
+        card_manager (CardManager): 卡牌管理器
+        spread (str|Spread): 布局名或布局注册表中的布局；牌数和逆位张数取自布局定义
+        count (int): 占卜次数
+        seed: 随机种子（传给 np.random.default_rng），相同种子结果相同
+        registry (SpreadRegistry): 按布局名查找时使用的注册表，默认为 data/spreads.json
+
+    Returns:
+        ReadingBatch: 批量结果
+    """
+    if isinstance(spread, str):
+        if registry is None:
+            registry = default_registry()
+        found = registry.get(spread, registry.default_locale)
+        if found is None:
+            raise ValueError(f"unknown spread: {spread!r}")
+        spread = found
+    size, reversed_count = spread.size, spread.reversed_count
+    spread = spread.name
+    deck_size = len(card_manager.get_all_cards())
+    if size > deck_size:
+        raise ValueError(f"spread {spread!r} needs {size} cards, deck has {deck_size}")
+    rng = np.random.default_rng(seed)
+    cards = draw_indices(rng, count, size, deck_size)
+    orientations = draw_orientations(rng, count, size, reversed_count)
+    return ReadingBatch(spread, cards, orientations, card_manager)
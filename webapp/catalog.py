@@ -0,0 +1,186 @@
+"""
+多语言卡牌目录
+按语言发现 data/ 下的卡牌CSV，首次请求某语言时才加载，
+超出内存预算时按LRU淘汰不常用的语言（默认语言常驻）
+"""
+import itertools
+import re
+import sys
+import threading
+from pathlib import Path
+from webapp.models import CARD_LOCALE_FIELDS, CardManager, ReadingEngine
+from webapp.snapshot import snapshot_path_for
+
+# 新语言的CSV命名约定：data/tarot_<语言代码>.csv，例如 tarot_ja.csv、tarot_pt_BR.csv
+LOCALE_FILE_PATTERN = re.compile(r'^tarot_([a-z]{2,3}(?:_[A-Za-z]{2,4})?)\.csv$')
+
+
+def discover_locale_sources(data_dir, configured=None):
+    """
+    发现各语言的卡牌CSV
+
+    Args:
+        data_dir (str|Path): 数据目录
+        configured (dict): 显式配置的 语言 -> CSV路径，优先于自动发现
+
+    Returns:
+        dict: 语言 -> CSV路径（显式配置的语言在前）
+    """
+    sources = {lang: Path(path) for lang, path in (configured or {}).items() if path}
+    for path in sorted(Path(data_dir).glob('tarot_*.csv')):
+        match = LOCALE_FILE_PATTERN.match(path.name)
+        if match:
+            sources.setdefault(match.group(1), path)
+    return sources
+
+
+def estimate_deck_size(manager):
+    """
+    估算一个语言牌组的内存占用（字节）
+    只计入该语言独有的部分：Card对象和翻译字段字符串
+    """
+    store = getattr(manager, 'store', None)
+    if store is not None:
+        # 列式存储直接按数组和缓冲区大小计算，避免物化所有牌
+        return store.nbytes
+    size = sys.getsizeof(manager.cards)
+    for card in manager.cards:
+        size += sys.getsizeof(card)
+        for field in CARD_LOCALE_FIELDS:
+            size += sys.getsizeof(getattr(card, field))
+    return size
+
+
+class LocaleDeck:
+    """
+    一个已加载语言的牌组
+
+    Attributes:
+        locale (str): 语言代码
+        manager (CardManager): 卡牌管理器
+        engine (ReadingEngine): 占卜引擎
+        size (int): 估算内存占用（字节）
+        last_used (int): 最近一次使用的逻辑时钟，用于LRU
+    """
+    __slots__ = ('locale', 'manager', 'engine', 'size', 'last_used')
+
+    def __init__(self, locale, manager, engine, size):
+        self.locale = locale
+        self.manager = manager
+        self.engine = engine
+        self.size = size
+        self.last_used = 0
+
+
+class CardCatalog:
+    """
+    某一代的多语言卡牌目录
+    """
+    def __init__(self, sources, default_locale=None, snapshot_dir=None,
+                 memory_budget=0, generation=1, checksum='', backend='objects'):
+        """
+        初始化目录（只加载默认语言）
+
+        Args:
+            sources (dict): 语言 -> CSV路径
+            default_locale (str): 默认语言，常驻内存；默认为 sources 的第一项
+            snapshot_dir (str|Path): 快照目录
+            memory_budget (int): 所有语言牌组的内存预算（字节），0表示不限制
+            generation (int): 代数（由热重载器递增）
+            checksum (str): 数据源校验和
+            backend (str): 卡牌存储后端，'objects'（Card元组）或 'columnar'（NumPy列式）
+        """
+        self.sources = dict(sources)
+        self.default_locale = default_locale or next(iter(self.sources))
+        self.snapshot_dir = snapshot_dir
+        self.memory_budget = memory_budget
+        self.generation = generation
+        self.checksum = checksum
+        self.backend = backend
+        self.evictions = 0
+        self._decks = {}
+        self._clock = itertools.count(1)
+        # 只在加载/淘汰时加锁，命中路径无锁
+        self._lock = threading.Lock()
+        self.get(self.default_locale)
+
+    @property
+    def locales(self):
+        """所有可用语言"""
+        return tuple(self.sources)
+
+    def loaded_locales(self):
+        """当前已加载的语言"""
+        return tuple(self._decks)
+
+    def memory_usage(self):
+        """已加载牌组的估算内存占用（字节）"""
+        return sum(deck.size for deck in list(self._decks.values()))
+
+    def get(self, locale):
+        """
+        获取语言牌组，未加载时加载；未知语言返回默认语言
+
+        Returns:
+            LocaleDeck: 语言牌组
+        """
+        if locale not in self.sources:
+            locale = self.default_locale
+        deck = self._decks.get(locale)
+        if deck is None:
+            deck = self._load(locale)
+        # next() 在GIL下是原子的，命中路径不需要锁
+        deck.last_used = next(self._clock)
+        return deck
+
+    def manager(self, locale):
+        """获取语言的 CardManager"""
+        return self.get(locale).manager
+
+    def engine(self, locale):
+        """获取语言的 ReadingEngine"""
+        return self.get(locale).engine
+
+    def preload(self, locales):
+        """预先加载若干语言（热重载时在后台恢复已加载的语言）"""
+        for locale in locales:
+            if locale in self.sources:
+                self.get(locale)
+
+    def _load(self, locale):
+        with self._lock:
+            deck = self._decks.get(locale)
+            if deck is not None:
+                return deck
+
+            csv_path = self.sources[locale]
+            manager_class = CardManager
+            if self.backend == 'columnar':
+                # 可选后端，按需导入numpy
+                from webapp.columnar import ColumnarCardManager
+                manager_class = ColumnarCardManager
+            manager = manager_class(csv_path, snapshot_path_for(csv_path, self.snapshot_dir))
+            # 与已加载的语言互相建立牌名索引
+            for other in self._decks.values():
+                manager.add_name_aliases(other.manager, other.locale)
+                other.manager.add_name_aliases(manager, locale)
+
+            deck = LocaleDeck(locale, manager, ReadingEngine(manager), estimate_deck_size(manager))
+            deck.last_used = next(self._clock)
+            self._decks[locale] = deck
+            self._evict(keep=locale)
+            return deck
+
+    def _evict(self, keep):
+        """超出预算时淘汰最久未使用的语言（默认语言与刚加载的语言除外）"""
+        if not self.memory_budget:
+            return
+        while self.memory_usage() > self.memory_budget:
+            candidates = [d for d in self._decks.values()
+                          if d.locale not in (self.default_locale, keep)]
+            if not candidates:
+                break
+            victim = min(candidates, key=lambda d: d.last_used)
+            # 正在使用旧对象的请求不受影响，引用释放后自动回收
+            del self._decks[victim.locale]
+            self.evictions += 1
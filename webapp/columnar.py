@@ -0,0 +1,234 @@
+"""
+列式牌组存储（可选后端）
+面向几十万张牌的用户上传/生成牌组：数值和分类字段存为NumPy数组，
+文本字段存入单个UTF-8缓冲区并以偏移量定位。抽牌和按类型筛选都在下标数组上完成，
+只有渲染某张牌时才把它物化为 Card 对象
+"""
+from array import array
+from collections.abc import Sequence
+import numpy as np
+from webapp.models import Card, CardBase, CardManager
+
+# 存入字符串缓冲区的字段，及其在每张牌偏移量中的位置
+TEXT_FIELDS = ('url', 'image', 'hebrew_letter', 'name', 'desc', 'message',
+               'rdesc', 'qabalah', 'meditation')
+_URL, _IMAGE, _HEBREW, _NAME = range(4)
+_LOCALE_TEXT = slice(3, len(TEXT_FIELDS))
+
+
+class ColumnarDeck:
+    """
+    列式牌组
+
+    Attributes:
+        sequence (np.ndarray): 序号
+        type_codes (np.ndarray): 牌类型编码（uint8），对应 cardtypes
+        cardtypes (tuple): 类型编码 -> 类型名
+        buffer (bytes): 所有文本字段的UTF-8拼接
+        offsets (np.ndarray): 第i张牌第f个文本字段位于
+            buffer[offsets[i*F+f]:offsets[i*F+f+1]]，F = len(TEXT_FIELDS)
+    """
+    def __init__(self, sequence, type_codes, cardtypes, buffer, offsets):
+        self.sequence = sequence
+        self.type_codes = type_codes
+        self.cardtypes = cardtypes
+        self.buffer = buffer
+        self.offsets = offsets
+        self._type_indices = {}
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        从字典记录构建（可传入生成器，逐条转换，不保留中间对象）
+        """
+        buffer = bytearray()
+        offsets = array('q', [0])
+        sequence = array('q')
+        type_codes = array('B')
+        cardtypes = {}
+        for record in records:
+            sequence.append(int(record['sequence']))
+            type_codes.append(cardtypes.setdefault(record['cardtype'], len(cardtypes)))
+            for field in TEXT_FIELDS:
+                buffer += str(record[field]).encode('utf-8')
+                offsets.append(len(buffer))
+
+        offset_dtype = np.uint32 if len(buffer) < 2 ** 32 else np.int64
+        return cls(
+            np.array(sequence, dtype=np.int32 if not sequence or max(sequence) < 2 ** 31 else np.int64),
+            np.array(type_codes, dtype=np.uint8),
+            tuple(cardtypes),
+            bytes(buffer),
+            np.array(offsets, dtype=offset_dtype),
+        )
+
+    def __len__(self):
+        return len(self.sequence)
+
+    @property
+    def nbytes(self):
+        """存储占用（字节）"""
+        return (len(self.buffer) + self.offsets.nbytes + self.sequence.nbytes
+                + self.type_codes.nbytes)
+
+    def text(self, index, field):
+        """读取第index张牌的文本字段（field为 TEXT_FIELDS 中的位置）"""
+        pos = index * len(TEXT_FIELDS) + field
+        start, end = self.offsets[pos:pos + 2]
+        return self.buffer[start:end].decode('utf-8')
+
+    def card(self, index):
+        """把第index张牌物化为 Card"""
+        width = len(TEXT_FIELDS)
+        pos = index * width
+        bounds = self.offsets[pos:pos + width + 1].tolist()
+        buffer = self.buffer
+        texts = [buffer[bounds[f]:bounds[f + 1]].decode('utf-8') for f in range(width)]
+        base = CardBase.intern(texts[_URL], texts[_IMAGE], int(self.sequence[index]),
+                               self.cardtypes[self.type_codes[index]], texts[_HEBREW])
+        return Card(base, *texts[_LOCALE_TEXT])
+
+    def type_indices(self, cardtype):
+        """某类型的牌的下标数组（缓存）"""
+        indices = self._type_indices.get(cardtype)
+        if indices is None:
+            if cardtype in self.cardtypes:
+                indices = np.flatnonzero(self.type_codes == self.cardtypes.index(cardtype))
+            else:
+                indices = np.empty(0, dtype=np.intp)
+            indices.flags.writeable = False
+            self._type_indices[cardtype] = indices
+        return indices
+
+
+class CardSequence(Sequence):
+    """
+    列式牌组上的只读序列视图，按下标访问时才物化 Card
+    可直接用于 random.sample / random.choices 和模板循环
+    """
+    __slots__ = ('store', 'indices')
+
+    def __init__(self, store, indices=None):
+        self.store = store
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.store) if self.indices is None else len(self.indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            indices = np.arange(len(self.store))[i] if self.indices is None else self.indices[i]
+            return CardSequence(self.store, indices)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('card index out of range')
+        return self.store.card(i if self.indices is None else int(self.indices[i]))
+
+
+class _HashIndex:
+    """
+    基于排序哈希数组的查找表：键 -> 候选下标
+    代替保存几十万个字符串键的字典
+    """
+    def __init__(self, keys, positions):
+        keys = np.asarray(keys, dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.positions = positions[order]
+
+    def candidates(self, key):
+        h = hash(key)
+        lo = np.searchsorted(self.keys, h, 'left')
+        hi = np.searchsorted(self.keys, h, 'right')
+        return self.positions[lo:hi].tolist()
+
+
+class ColumnarCardManager(CardManager):
+    """
+    使用列式存储的卡牌管理器
+    接口与 CardManager 相同；get_all_cards() 和按类型查询返回惰性的 CardSequence
+    """
+    def load_cards(self):
+        """加载塔罗牌数据为列式存储"""
+        self.store = ColumnarDeck.from_records(self._read_records())
+        self.cards = CardSequence(self.store)
+        self._build_indexes()
+
+    def _build_indexes(self):
+        store = self.store
+        count = len(store)
+        positions = np.arange(count)
+        self._url_index = _HashIndex(
+            [hash(store.text(i, _URL)) for i in range(count)], positions)
+        self._name_index = _HashIndex(
+            [hash(store.text(i, _NAME).casefold()) for i in range(count)], positions)
+        # (别名索引, 语言 -> 其他语言的卡牌管理器)，整体替换
+        self._aliases = (_HashIndex([], []), {})
+        major = store.type_indices('major')
+        self._minor = CardSequence(store, np.setdiff1d(positions, major))
+        self._by_type = {}
+
+    def _find_url(self, url):
+        for i in self._url_index.candidates(url):
+            if self.store.text(i, _URL) == url:
+                return i
+        return None
+
+    def add_name_aliases(self, other, locale=None):
+        """
+        把另一语言牌组的牌名加入名称索引（按url对应到本语言的牌）
+        同一语言重新加载后替换掉旧的牌组并重建别名索引，不再引用已淘汰的卡牌管理器
+
+        Args:
+            other (CardManager): 其他语言的卡牌管理器
+            locale (str): other 的语言，None 时按卡牌管理器对象区分
+        """
+        sources = dict(self._aliases[1])
+        sources[locale if locale is not None else id(other)] = other
+        keys, positions = [], []
+        for source in sources.values():
+            for card in source.cards:
+                own = self._find_url(card.url)
+                if own is not None:
+                    keys.append(hash(card.name.casefold()))
+                    positions.append(own)
+        self._aliases = (_HashIndex(keys, positions), sources)
+
+    def get_card_by_url(self, url):
+        """根据url获取卡牌"""
+        i = self._find_url(url)
+        return None if i is None else self.store.card(i)
+
+    def get_neighbors(self, url):
+        """获取前后牌 (prev_card, next_card)"""
+        i = self._find_url(url)
+        if i is None:
+            return (None, None)
+        prev_card = self.store.card(i - 1) if i > 0 else None
+        next_card = self.store.card(i + 1) if i < len(self.store) - 1 else None
+        return (prev_card, next_card)
+
+    def get_card_by_name(self, name):
+        """根据名称获取卡牌（大小写不敏感，支持其他语言的牌名）"""
+        key = name.casefold()
+        for i in self._name_index.candidates(key):
+            if self.store.text(i, _NAME).casefold() == key:
+                return self.store.card(i)
+        # 别名索引只保存哈希：到其他语言的牌组中取同一张牌的牌名比对，排除哈希冲突
+        alias_index, sources = self._aliases
+        for i in alias_index.candidates(key):
+            url = self.store.text(i, _URL)
+            for other in sources.values():
+                card = other.get_card_by_url(url)
+                if card is not None and card.name.casefold() == key:
+                    return self.store.card(i)
+        return None
+
+    def get_cards_by_type(self, cardtype):
+        """根据类型获取卡牌（惰性序列）"""
+        cards = self._by_type.get(cardtype)
+        if cards is None:
+            cards = self._by_type[cardtype] = CardSequence(self.store, self.store.type_indices(cardtype))
+        return cards
@@ -0,0 +1,160 @@
+"""
+响应压缩
+按请求的 Accept-Encoding 协商 br（需要 Brotli）或 gzip：
+- 渲染缓存和 API 缓存中的页面第一次以某种编码返回时按最高级别压缩一次，与页面一起缓存；
+  ETag 按编码区分，条件请求照常返回304
+- 带摘要的静态文件中的文本文件（CSS、JS、SVG 等）由 scripts/build_assets.py 预先生成 .br/.gz，直接返回
+- 其他响应（占卜页等每次请求都不同的页面）在 after_request 中按偏重延迟的级别压缩；
+  文件和流式响应（批量占卜）不压缩
+"""
+import gzip
+import mimetypes
+import posixpath
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # 可选依赖：未安装时只使用 gzip
+    brotli = None
+
+# 可压缩的内容类型
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript', 'application/javascript',
+    'application/json', 'application/x-ndjson', 'application/xml', 'image/svg+xml',
+})
+# 预压缩（构建时、填充缓存时）的级别：每份内容只压缩一次，取最小体积
+PRECOMPRESS_LEVELS = {'gzip': 9, 'br': 11}
+# 同样接受时优先使用的编码
+_PREFERENCE = ('br', 'gzip')
+
+
+def encodings():
+    """可用的压缩格式 -> 预压缩文件后缀"""
+    available = {'gzip': '.gz'}
+    if brotli is not None:
+        available['br'] = '.br'
+    return available
+
+
+def compress(data, encoding, level):
+    """
+    Args:
+        data (bytes): 原始内容
+        encoding (str): gzip 或 br
+        level (int): gzip 的 compresslevel（1-9）或 Brotli 的 quality（0-11）
+    """
+    if encoding == 'gzip':
+        # mtime=0：相同内容得到相同的压缩结果
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return brotli.compress(data, quality=level)
+
+
+def is_compressible(filename):
+    """按文件名判断内容是否值得压缩"""
+    return mimetypes.guess_type(filename)[0] in COMPRESSIBLE_MIMETYPES
+
+
+def best_encoding(accept_encodings):
+    """
+    选择编码
+
+    Args:
+        accept_encodings (Accept): request.accept_encodings
+
+    Returns:
+        str: 可用编码中质量值最高的一种（相同时优先 br）；都不接受时返回None
+    """
+    best, best_quality = None, 0
+    available = encodings()
+    for encoding in _PREFERENCE:
+        if encoding in available:
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+    return best
+
+
+def encoded_etag(etag, encoding):
+    """压缩后的响应的ETag（与原始内容的ETag不同）"""
+    return f'{etag}-{encoding}'
+
+
+class Compression:
+    """
+    响应压缩设置（app.extensions['compression']）
+    """
+    def __init__(self, levels, min_size):
+        """
+        Args:
+            levels (dict): 每次请求压缩时各编码的级别
+            min_size (int): 小于此字节数的响应体不压缩
+        """
+        self.levels = levels
+        self.min_size = min_size
+
+    def negotiate(self, size):
+        """
+        当前请求、size 字节的响应体使用的编码
+
+        Returns:
+            str: gzip 或 br；不压缩时返回None
+        """
+        if size < self.min_size:
+            return None
+        return best_encoding(request.accept_encodings)
+
+
+def init_compression(app):
+    """
+    按 app.config['COMPRESSION'] 启用响应压缩
+    （在 init_assets、init_image_packs 之后调用，静态文件视图先返回预压缩文件）
+    """
+    if not app.config.get('COMPRESSION'):
+        return
+    compression = Compression({'gzip': app.config['COMPRESSION_GZIP_LEVEL'],
+                               'br': app.config['COMPRESSION_BROTLI_QUALITY']},
+                              app.config['COMPRESSION_MIN_SIZE'])
+    app.extensions['compression'] = compression
+
+    manifest = app.extensions.get('asset_manifest')
+    if manifest is not None and manifest.precompressed:
+        static_view = app.view_functions['static']
+
+        def precompressed_static(filename):
+            if filename not in manifest.precompressed:
+                return static_view(filename=filename)
+            encoding = best_encoding(request.accept_encodings)
+            if encoding is None:
+                response = static_view(filename=filename)
+            else:
+                # 内容类型和 Content-Disposition 按原文件名
+                response = send_from_directory(app.static_folder, filename + encodings()[encoding],
+                                               download_name=posixpath.basename(filename),
+                                               max_age=app.get_send_file_max_age(filename))
+                response.content_encoding = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+
+        app.view_functions['static'] = precompressed_static
+
+    @app.after_request
+    def compress_response(response):
+        compression = app.extensions.get('compression')
+        if (compression is None or response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        body = response.get_data()
+        if len(body) < compression.min_size:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = compression.negotiate(len(body))
+        if encoding is None:
+            return response
+        response.set_data(compress(body, encoding, compression.levels[encoding]))
+        response.content_encoding = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak)
+        return response
@@ -0,0 +1,175 @@
+"""
+每日一牌
+每位访客（匿名标识）被分到固定数量的桶之一；每年为所有 (日期, 桶) 预先计算一张牌
+和正逆位，存为紧凑的查找表。同一天同一个桶看到的牌相同，页面因此可以按
+(日期, 桶, 语言) 缓存，并在访客本地时间的午夜过期
+"""
+import hashlib
+import secrets
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from webapp.rng import orientation_bits
+from webapp.permalink import seeded_rng
+
+DAILY_ID_BYTES = 12
+
+
+def new_daily_id():
+    """新的匿名访客标识"""
+    return secrets.token_urlsafe(DAILY_ID_BYTES)
+
+
+def bucket_for(identifier, buckets):
+    """访客标识 -> 桶编号"""
+    digest = hashlib.sha256(identifier.encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') % buckets
+
+
+def resolve_timezone(name, default='UTC'):
+    """
+    时区名 -> tzinfo，无效时使用默认时区
+
+    Args:
+        name (str): IANA时区名（如 Asia/Shanghai），通常来自浏览器
+        default (str): 默认时区名
+    """
+    for candidate in (name, default):
+        if not candidate:
+            continue
+        try:
+            return ZoneInfo(candidate)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    return timezone.utc
+
+
+def next_midnight(now):
+    """now 所在时区的下一个午夜（带时区的 datetime）"""
+    tomorrow = now.date() + timedelta(days=1)
+    return datetime.combine(tomorrow, time(0), tzinfo=now.tzinfo)
+
+
+class DailyCalendar:
+    """
+    一年的每日一牌分配表
+
+    Attributes:
+        year (int): 年份
+        version (int): 牌组版本号（表中的下标对应该版本的牌组顺序）
+        buckets (int): 桶数
+        table (array): 第 d 天（从0开始）第 b 个桶的分配为 table[d * buckets + b]，
+            取值为 牌下标 * 2 + 是否逆位
+    """
+    __slots__ = ('year', 'version', 'buckets', 'table')
+
+    def __init__(self, year, version, buckets, table):
+        self.year = year
+        self.version = version
+        self.buckets = buckets
+        self.table = table
+
+    @classmethod
+    def build(cls, year, version, deck_size, buckets, salt=''):
+        """
+        预先计算一年的分配
+
+        同一天里各桶的牌互不相同（桶数超过牌数时允许重复）；
+        相同的 (年份, 牌组版本, 盐) 在任何进程中都得到相同的表
+
+        Args:
+            year (int): 年份
+            version (int): 牌组版本号
+            deck_size (int): 牌数
+            buckets (int): 桶数
+            salt (str): 附加到种子中的字符串，部署方可自定义以免分配被预测
+        """
+        days = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+        seed = int.from_bytes(hashlib.sha256(f'{salt}:{year}:{version:08x}'.encode()).digest()[:8], 'big')
+        rng = seeded_rng(seed)
+        table = array('B' if deck_size * 2 <= 256 else 'I')
+        indices = range(deck_size)
+        for _day in range(days):
+            if buckets <= deck_size:
+                cards = rng.sample(indices, buckets)
+            else:
+                cards = rng.choices(indices, k=buckets)
+            table.extend(card * 2 + is_reversed
+                         for card, is_reversed in zip(cards, orientation_bits(rng, buckets)))
+        return cls(year, version, buckets, table)
+
+    def assignment(self, day, bucket):
+        """
+        某天某桶的分配
+
+        Args:
+            day (date): 日期（必须在本年内）
+            bucket (int): 桶编号
+
+        Returns:
+            tuple: (牌下标, 是否逆位)
+        """
+        value = self.table[(day.timetuple().tm_yday - 1) * self.buckets + bucket]
+        return value >> 1, bool(value & 1)
+
+
+class DailyCards:
+    """
+    每日一牌的分配表和渲染缓存
+    """
+    def __init__(self, buckets=64, salt='', max_calendars=4):
+        """
+        Args:
+            buckets (int): 桶数
+            salt (str): 分配表的种子盐
+            max_calendars (int): 最多保留的分配表数（年份 × 牌组版本）
+        """
+        self.buckets = buckets
+        self.salt = salt
+        self.max_calendars = max_calendars
+        self._calendars = OrderedDict()
+        self._pages = {}
+        self._latest_day = None
+        self._lock = threading.Lock()
+
+    def calendar(self, year, version, deck_size):
+        """获取（必要时构建）某年某牌组版本的分配表"""
+        key = (year, version)
+        calendar = self._calendars.get(key)
+        if calendar is None:
+            with self._lock:
+                calendar = self._calendars.get(key)
+                if calendar is None:
+                    calendar = DailyCalendar.build(year, version, deck_size, self.buckets, self.salt)
+                    self._calendars[key] = calendar
+                    while len(self._calendars) > self.max_calendars:
+                        self._calendars.popitem(last=False)
+        return calendar
+
+    def assignment(self, day, bucket, version, deck_size):
+        """某天某桶的 (牌下标, 是否逆位)"""
+        return self.calendar(day.year, version, deck_size).assignment(day, bucket)
+
+    def cached_page(self, key):
+        """
+        读取缓存的页面
+
+        Args:
+            key (tuple): (日期, 桶, 语言, 牌组代数)
+        """
+        return self._pages.get(key)
+
+    def cache_page(self, key, body):
+        """
+        缓存页面
+        各访客的时区不同，同一时刻最多涉及相邻的两三个日期；
+        出现新的最晚日期时清除比它早一天以上的页面
+        """
+        day = key[0]
+        with self._lock:
+            if self._latest_day is None or day > self._latest_day:
+                self._latest_day = day
+                self._pages = {k: v for k, v in self._pages.items() if (day - k[0]).days <= 1}
+            self._pages[key] = body
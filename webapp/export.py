@@ -0,0 +1,340 @@
+"""
+静态站点导出
+首页、牌库和牌详情页（用 cached_page 装饰的视图）的内容完全由语言和牌组决定。
+遍历 main 蓝图的URL规则，把这些页面按每种语言渲染为静态文件（附带 .gz / .br 预压缩版本），
+并生成清单和 nginx 配置片段；占卜页仍由应用动态处理。
+
+导出是增量的：每页记录其输入摘要（共享输入 + 该页依赖的牌组数据），
+与上次导出的清单相同且文件仍在时跳过，不再渲染
+"""
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from webapp.assets import ASSET_HASH_LENGTH, ASSET_MAX_AGE
+from webapp.compression import PRECOMPRESS_LEVELS, compress, encodings
+
+MANIFEST_NAME = 'manifest.json'
+NGINX_DIR = 'nginx'
+PAGE_FILE = 'index.html'
+# 影响所有页面的输入（相对项目根目录）：代码、模板、静态资源、翻译和布局定义
+SHARED_INPUTS = ('config.py', 'webapp', 'translations', 'data/spreads.json')
+# 不参与摘要的文件
+_IGNORED_SUFFIXES = ('.pyc', '.pyo', '.po', '.pot')
+
+
+def _digest(*parts):
+    """JSON可序列化对象的SHA-256摘要"""
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def fingerprint_files(root, paths=SHARED_INPUTS):
+    """
+    一组文件/目录内容的摘要
+
+    Args:
+        root (str|Path): 项目根目录
+        paths (iterable): 相对 root 的文件或目录，不存在的忽略
+
+    Returns:
+        str: 十六进制摘要
+    """
+    root = Path(root)
+    files = []
+    for name in paths:
+        path = root / name
+        if path.is_dir():
+            files.extend(p for p in path.rglob('*') if p.is_file())
+        elif path.is_file():
+            files.append(path)
+
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        if '__pycache__' in path.parts or path.suffix in _IGNORED_SUFFIXES:
+            continue
+        digest.update(path.relative_to(root).as_posix().encode('utf-8') + b'\0')
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def page_file(locale, path):
+    """
+    页面在输出目录中的文件（/ -> en/index.html，/browse -> en/browse/index.html）
+    """
+    return f"{locale}{path.rstrip('/')}/{PAGE_FILE}"
+
+
+class ExportPage:
+    """
+    待导出的页面
+
+    Attributes:
+        locale (str): 语言
+        path (str): URL路径
+        file (str): 输出文件（相对输出目录）
+        inputs (str): 输入摘要，与上次导出相同时无需重新渲染
+    """
+    __slots__ = ('locale', 'path', 'file', 'inputs')
+
+    def __init__(self, locale, path, inputs):
+        self.locale = locale
+        self.path = path
+        self.file = page_file(locale, path)
+        self.inputs = inputs
+
+    def __repr__(self):
+        return f"ExportPage({self.locale!r}, {self.path!r})"
+
+
+def plan_pages(app, shared_inputs=''):
+    """
+    列出所有可导出的页面
+
+    遍历 main 蓝图中支持GET、且视图带 static_export 标记（见 routes.cached_page）的URL规则；
+    有参数的规则由视图的 export_pages(manager) 列出全部参数
+
+    Args:
+        app (Flask): 应用
+        shared_inputs (str): 共享输入摘要（见 fingerprint_files）
+
+    Returns:
+        list: ExportPage（按URL、语言排序）
+    """
+    from webapp import routes
+
+    adapter = app.url_map.bind('localhost')
+    catalog = routes.deck_reloader.current
+    locales = app.config['BABEL_SUPPORTED_LOCALES']
+    suffixes = sorted(encodings())
+    deck_inputs = {}
+    pages = []
+    for rule in app.url_map.iter_rules():
+        if not rule.endpoint.startswith(routes.main_bp.name + '.') or 'GET' not in rule.methods:
+            continue
+        view = app.view_functions[rule.endpoint]
+        if not getattr(view, 'static_export', False):
+            continue
+        for locale in locales:
+            manager = catalog.manager(locale)
+            if view.export_pages is None:
+                if locale not in deck_inputs:
+                    deck_inputs[locale] = _digest([card.to_dict() for card in manager.get_all_cards()])
+                entries = [({}, deck_inputs[locale])]
+            else:
+                entries = view.export_pages(manager)
+            for kwargs, inputs in entries:
+                path = adapter.build(rule.endpoint, kwargs)
+                pages.append(ExportPage(locale, path,
+                                        _digest(shared_inputs, suffixes, locale, path, inputs)))
+    pages.sort(key=lambda page: (page.path, page.locale))
+    return pages
+
+
+def _write_atomic(path, data):
+    """写入临时文件后改名，读取方不会看到写了一半的文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def render_page(client, page, out_dir):
+    """
+    渲染一页并写入原文件和预压缩文件
+
+    Args:
+        client (FlaskClient): 不保存cookie的测试客户端
+        page (ExportPage): 页面
+        out_dir (Path): 输出目录
+
+    Returns:
+        dict: 清单条目
+
+    Raises:
+        RuntimeError: 页面没有返回200
+    """
+    response = client.get(page.path, headers={'Accept-Language': page.locale})
+    if response.status_code != 200:
+        raise RuntimeError(f"{page.path} [{page.locale}] returned {response.status_code}")
+    body = response.get_data()
+
+    target = out_dir / page.file
+    _write_atomic(target, body)
+    variants = {}
+    for encoding, suffix in encodings().items():
+        compressed = compress(body, encoding, PRECOMPRESS_LEVELS[encoding])
+        _write_atomic(target.with_name(target.name + suffix), compressed)
+        variants[encoding] = {'file': page.file + suffix, 'size': len(compressed)}
+
+    return {
+        'path': page.path,
+        'locale': page.locale,
+        'file': page.file,
+        'size': len(body),
+        # 与 RenderCache 相同的强ETag，静态文件和应用返回的验证器一致
+        'etag': hashlib.sha256(body).hexdigest()[:32],
+        'encodings': variants,
+        'inputs': page.inputs,
+    }
+
+
+_worker_app = None
+
+
+def _init_worker(config_name):
+    """子进程初始化：每个进程创建自己的应用"""
+    global _worker_app
+    from webapp import create_app
+    _worker_app = create_app(config_name)
+
+
+def _render_chunk(pages, out_dir):
+    client = _worker_app.test_client(use_cookies=False)
+    return [render_page(client, page, Path(out_dir)) for page in pages]
+
+
+def _load_manifest(out_dir):
+    """上次导出的清单条目：文件 -> 条目"""
+    try:
+        with open(out_dir / MANIFEST_NAME, encoding='utf-8') as f:
+            return {entry['file']: entry for entry in json.load(f)['pages']}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _up_to_date(entry, page, out_dir):
+    """上次导出的文件是否仍可用"""
+    if entry is None or entry['inputs'] != page.inputs:
+        return False
+    files = [entry['file']] + [variant['file'] for variant in entry['encodings'].values()]
+    return all((out_dir / name).is_file() for name in files)
+
+
+def nginx_config(app, out_dir, pages):
+    """
+    生成 nginx 配置片段
+
+    Returns:
+        tuple: (maps.conf, locations.conf) 的内容。
+            maps.conf 放在 http 块中：按 Accept-Language 选择语言；带会话cookie
+            （用户在站内切换过语言）的请求不使用静态文件。
+            locations.conf 放在 server 块中：每个导出的URL一个精确匹配的 location，
+            文件不存在时交给名为 @tarot_app 的 location（需自行定义，转发给应用）；
+            带摘要的静态文件（见 webapp/assets.py）直接由 nginx 以 immutable 长期缓存返回（文本文件使用预压缩文件）；
+            设置了 IMAGE_ACCEL_REDIRECT 时另有一个 internal location，
+            发送应用以 X-Accel-Redirect 交回的图片包中的图片（见 webapp/imagepack.py）
+    """
+    default_locale = app.config['BABEL_DEFAULT_LOCALE']
+    maps = ['# 由 scripts/export_static.py 生成，放在 http 块中',
+            'map $http_accept_language $tarot_static_lang {',
+            f'    default {default_locale};']
+    for locale in app.config['BABEL_SUPPORTED_LOCALES']:
+        if locale != default_locale:
+            maps.append(f"    ~*^{locale.replace('_', '-')} {locale};")
+    maps += ['}',
+             f"map $cookie_{app.config['SESSION_COOKIE_NAME']} $tarot_static_dir {{",
+             '    "" $tarot_static_lang;',
+             '    default _dynamic;',
+             '}', '']
+
+    static_options = ['gzip_static on;'] + (['brotli_static on;'] if 'br' in encodings() else [])
+    locations = ['# 由 scripts/export_static.py 生成，放在 server 块中', '',
+                 f'location ~ "^/static/(.+\\.[0-9a-f]{{{ASSET_HASH_LENGTH}}}\\.[^./]+)$" {{',
+                 f'    alias {Path(app.static_folder).resolve()}/$1;',
+                 *(f'    {option}' for option in static_options),
+                 f'    add_header Cache-Control "public, max-age={ASSET_MAX_AGE}, immutable";',
+                 '}', '']
+    accel_prefix = app.config.get('IMAGE_ACCEL_REDIRECT')
+    if accel_prefix:
+        locations += [f"location {accel_prefix.rstrip('/')}/ {{",
+                      '    internal;',
+                      f'    alias {Path(app.static_folder).resolve()}/;',
+                      '}', '']
+    for path in sorted({page.path for page in pages}):
+        locations += [
+            f'location = {path} {{',
+            f'    root {Path(out_dir).resolve()};',
+            '    default_type text/html;',
+            '    charset utf-8;',
+            *(f'    {option}' for option in static_options),
+            '    add_header Vary "Cookie, Accept-Language";',
+            f"    add_header Cache-Control \"public, max-age={app.config['RENDER_CACHE_MAX_AGE']}\";",
+            f"    try_files /$tarot_static_dir{path.rstrip('/')}/{PAGE_FILE} @tarot_app;",
+            '}', '']
+    return '\n'.join(maps), '\n'.join(locations)
+
+
+def export_site(app, out_dir, config_name='production', jobs=1, force=False, root=None):
+    """
+    导出静态站点
+
+    Args:
+        app (Flask): 应用（用于列出页面；jobs > 1 时子进程用 config_name 各自创建应用）
+        out_dir (str|Path): 输出目录
+        config_name (str): 子进程创建应用使用的配置名
+        jobs (int): 并行进程数，1表示在当前进程中渲染
+        force (bool): 忽略上次的清单，全部重新渲染
+        root (str|Path): 项目根目录（计算共享输入摘要），默认为 app.config['BASE_DIR']
+
+    Returns:
+        dict: 统计（pages/rendered/skipped/removed）
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    shared = fingerprint_files(root or app.config['BASE_DIR'])
+    pages = plan_pages(app, shared)
+    previous = {} if force else _load_manifest(out_dir)
+
+    entries = {}
+    stale = []
+    for page in pages:
+        entry = previous.get(page.file)
+        if _up_to_date(entry, page, out_dir):
+            entries[page.file] = entry
+        else:
+            stale.append(page)
+
+    if stale and jobs > 1:
+        size = math.ceil(len(stale) / (jobs * 4))
+        chunks = [stale[i:i + size] for i in range(0, len(stale), size)]
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(config_name,)) as pool:
+            for results in pool.map(_render_chunk, chunks, [str(out_dir)] * len(chunks)):
+                entries.update((entry['file'], entry) for entry in results)
+    elif stale:
+        client = app.test_client(use_cookies=False)
+        for page in stale:
+            entries[page.file] = render_page(client, page, out_dir)
+
+    # 删除已不再导出的页面
+    removed = 0
+    for name, entry in previous.items():
+        if name in entries:
+            continue
+        for variant in [entry['file']] + [v['file'] for v in entry.get('encodings', {}).values()]:
+            try:
+                (out_dir / variant).unlink()
+            except FileNotFoundError:
+                pass
+        removed += 1
+
+    manifest = {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'default_locale': app.config['BABEL_DEFAULT_LOCALE'],
+        'locales': list(app.config['BABEL_SUPPORTED_LOCALES']),
+        'session_cookie': app.config['SESSION_COOKIE_NAME'],
+        'cache_max_age': app.config['RENDER_CACHE_MAX_AGE'],
+        'shared_inputs': shared,
+        'pages': [entries[page.file] for page in pages],
+    }
+    _write_atomic(out_dir / MANIFEST_NAME,
+                  json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8'))
+    maps, locations = nginx_config(app, out_dir, pages)
+    _write_atomic(out_dir / NGINX_DIR / 'maps.conf', maps.encode('utf-8'))
+    _write_atomic(out_dir / NGINX_DIR / 'locations.conf', locations.encode('utf-8'))
+
+    return {'pages': len(pages), 'rendered': len(stale),
+            'skipped': len(pages) - len(stale), 'removed': removed}
@@ -0,0 +1,74 @@
+"""
+牌面板片段缓存
+占卜结果页中每张牌的面板（图片、名称、正逆位、解读）只取决于
+(片段模板, 语言, 牌组代数, 牌, 正逆位)，一共只有 78 × 2 × 语言数 种。
+片段首次用到时渲染一次并记住，之后的占卜页只把缓存的片段拼进很薄的外壳模板，
+每次请求的渲染开销不再随牌义文本长度增长
+"""
+import threading
+from markupsafe import Markup, escape
+
+# 片段中留给每次占卜的内容（如位置说明）的占位符，渲染后在此处切开
+SLOT = '\x00slot\x00'
+
+
+class FragmentCache:
+    """
+    已渲染的片段（线程安全）
+    """
+    def __init__(self, render):
+        """
+        Args:
+            render (callable): render(template, **context) -> str，通常为 flask.render_template
+        """
+        self._render = render
+        self._fragments = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def get(self, key, template, **context):
+        """
+        读取片段，未缓存时渲染
+
+        Args:
+            key (tuple): 缓存键，须包含决定片段内容的全部因素
+            template (str): 片段模板
+            **context: 模板变量；模板中输出 slot 的位置可在拼接时填入每次不同的内容
+
+        Returns:
+            tuple: 以占位符切开的各段HTML（没有占位符时只有一段）
+        """
+        parts = self._fragments.get(key)
+        if parts is None:
+            parts = tuple(self._render(template, slot=Markup(SLOT), **context).split(SLOT))
+            with self._lock:
+                self._fragments[key] = parts
+                self.renders += 1
+        return parts
+
+    def splice(self, key, template, fill='', **context):
+        """
+        读取片段并在占位符处填入内容
+
+        Args:
+            key (tuple): 缓存键
+            template (str): 片段模板
+            fill (str): 填入占位符的文本（会被转义）
+
+        Returns:
+            Markup: 可直接输出到模板的HTML
+        """
+        parts = self.get(key, template, **context)
+        if len(parts) == 1:
+            return Markup(parts[0])
+        return Markup(str(escape(fill)).join(parts))
+
+    def clear(self, *args):
+        """
+        清空片段（牌组重载时调用，可直接注册为 DeckReloader 的回调）
+        """
+        with self._lock:
+            self._fragments = {}
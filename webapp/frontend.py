@@ -0,0 +1,626 @@
+"""
+自托管、子集化的字体与 CSS，按页面模板内联 CSS
+部署时（scripts/build_frontend.py）：
+- 下载 base.html 原先从 CDN 引用的 Google Fonts（Cinzel、Crimson Text）和 Bootstrap 5 的 CSS/JS，
+  下载结果保存在缓存目录，重新构建时不再下载；
+- 字体只保留模板、翻译和牌组数据中出现的字符，输出 woff2（未安装 Brotli 时为 woff）；
+- Bootstrap CSS 只保留网站用到的类、id 和元素的规则；
+- 渲染每个页面模板的代表页面（各语言），把首屏（导航栏、<main> 中到第一个 .row 为止）用到的规则
+  （字体、Bootstrap、style.css）写成该模板的内联 CSS。
+结果写入 static/vendor/ 并生成清单。页面在 <head> 中内联所属模板的首屏 CSS、异步加载带摘要的完整样式表，
+首次渲染不再等待第三方域名的连接和样式表下载；清单不存在时仍使用 CDN
+"""
+import hashlib
+import io
+import json
+import os
+import posixpath
+import re
+import urllib.request
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urlsplit
+from flask import before_render_template, template_rendered, url_for
+from markupsafe import Markup
+
+VENDOR_DIR = 'vendor'
+MANIFEST_NAME = 'manifest.json'
+BOOTSTRAP_VERSION = '5.3.0'
+BOOTSTRAP_CSS_URL = f'https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist/css/bootstrap.min.css'
+BOOTSTRAP_JS_URL = f'https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist/js/bootstrap.bundle.min.js'
+GOOGLE_FONTS_URL = ('https://fonts.googleapis.com/css2?family=Cinzel:wght@400;700'
+                    '&family=Crimson+Text:ital,wght@0,400;0,600;1,400&display=swap')
+# 页面中没有、由 Bootstrap 的 JS 在运行时添加的类和属性（折叠菜单、下拉菜单、标签页）
+BOOTSTRAP_JS_CLASSES = frozenset({'show', 'showing', 'hiding', 'collapsing', 'collapsed', 'fade', 'active',
+                                  'disabled', 'dropdown-menu-start', 'dropdown-menu-end'})
+BOOTSTRAP_JS_ATTRIBUTES = frozenset({'data-bs-popper', 'aria-expanded', 'aria-selected', 'tabindex'})
+# 无论文本中是否出现都保留的字符：ASCII 可打印字符和常用标点
+BASE_TEXT = ''.join(map(chr, range(0x20, 0x7f))) + ' ©·–—‘’“”•…'
+# <main> 中没有 .row 时，首屏包括的顶层元素数
+FOLD_BLOCKS = 2
+# 内联 CSS 中静态文件的引用，运行时替换为 url_for('static') 的结果
+STATIC_REF = 'static:'
+
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_SPACE = re.compile(r'\s+')
+_NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+_FONT_FACE = re.compile(r'@font-face\s*\{([^}]*)\}')
+_DESCRIPTOR = re.compile(r'([\w-]+)\s*:\s*([^;]+)')
+_CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+_STATIC_URL = re.compile(r'url\(%s([^)]+)\)' % STATIC_REF)
+_CLASS_ATTR = re.compile(r'''\bclass\s*=\s*(["'])(.*?)\1''', re.S)
+_ID_ATTR = re.compile(r'''\bid\s*=\s*(["'])(.*?)\1''', re.S)
+_TAG = re.compile(r'<([a-zA-Z][\w-]*)')
+_ATTRIBUTE = re.compile(r'''\s([a-zA-Z][\w:-]*)(?=[\s=>/])''')
+_WORD = re.compile(r'[A-Za-z_][\w-]*')
+_SELECTOR_CLASS = re.compile(r'\.(-?[A-Za-z_][\w-]*)')
+_SELECTOR_ID = re.compile(r'#(-?[A-Za-z_][\w-]*)')
+_SELECTOR_TAG = re.compile(r'(?:^|[\s>+~])([A-Za-z][\w-]*)')
+_SELECTOR_ATTRIBUTE = re.compile(r'\[\s*([\w-]+)')
+_PSEUDO = re.compile(r'::?[\w-]+')
+_ANIMATION = re.compile(r'(animation(?:-name)?)\s*:\s*([^;}]+)')
+_KEYFRAMES = ('@keyframes', '@-webkit-keyframes')
+_VOID_ELEMENTS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                            'source', 'track', 'wbr'})
+
+
+def cache_path(cache_dir, url):
+    """下载缓存中某个URL的文件：<域名>/<路径>，有查询参数时文件名加上参数的摘要"""
+    parts = urlsplit(url)
+    name = parts.path.lstrip('/') or 'index'
+    if parts.query:
+        name += '@' + hashlib.sha256(parts.query.encode('utf-8')).hexdigest()[:12]
+    return Path(cache_dir) / parts.netloc / name
+
+
+def fetch(url, cache_dir):
+    """
+    下载（已在缓存中时直接读取）
+
+    Google Fonts 按 User-Agent 返回不同的字体格式：不带浏览器的 User-Agent 时，
+    每种字重返回一个完整的 TTF，适合自行子集化
+
+    Raises:
+        OSError: 下载失败
+    """
+    path = cache_path(cache_dir, url)
+    if not path.exists():
+        with urllib.request.urlopen(url, timeout=60) as response:
+            data = response.read()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return path.read_bytes()
+
+
+def font_flavor():
+    """子集字体的格式：woff2 需要 Brotli，否则为 woff"""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return 'woff'
+    return 'woff2'
+
+
+def subset_font(data, text, flavor):
+    """
+    只保留 text 中出现的字符（及其连字、字距等 OpenType 特性）
+
+    Args:
+        data (bytes): 字体文件（TTF/OTF/WOFF/WOFF2）
+        text (str): 需要的字符
+        flavor (str): 输出格式（woff2/woff）
+
+    Returns:
+        bytes: 子集字体
+
+    Raises:
+        ImportError: 未安装 fontTools
+    """
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(io.BytesIO(data))
+    options = subset.Options()
+    options.flavor = flavor
+    # FontForge 的时间戳表，fontTools 无法子集化
+    options.drop_tables.append('FFTM')
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    font.flavor = flavor
+    out = io.BytesIO()
+    font.save(out)
+    return out.getvalue()
+
+
+def site_text(app):
+    """
+    网站可能显示的全部字符：模板、各语言翻译、牌组数据和布局定义中出现的字符
+
+    Returns:
+        str: 去重排序后的字符
+    """
+    root = Path(app.root_path)
+    paths = list((root / app.template_folder).rglob('*.html'))
+    paths += Path(app.config['BABEL_TRANSLATION_DIRECTORIES'].split(';')[0]).rglob('*.po')
+    paths += Path(app.config['DATA_DIR']).glob('*.csv')
+    paths.append(Path(app.config['SPREADS_FILE']))
+    chars = set(BASE_TEXT)
+    for path in paths:
+        chars.update(path.read_text(encoding='utf-8'))
+    return ''.join(sorted(c for c in chars if c.isprintable()))
+
+
+def _slug(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def vendor_fonts(css, text, out_dir, cache_dir):
+    """
+    下载 Google Fonts 样式表中的字体，子集化后写入 out_dir/fonts/，返回改写后的样式表
+
+    Args:
+        css (str): Google Fonts 返回的样式表
+        text (str): 需要的字符
+        out_dir (Path): 输出目录（static/vendor）
+        cache_dir (str|Path): 下载缓存目录
+
+    Returns:
+        tuple: (样式表, [(文件, 原大小, 子集大小)])
+    """
+    flavor = font_flavor()
+    (out_dir / 'fonts').mkdir(parents=True, exist_ok=True)
+    rules = []
+    files = []
+    for block in _FONT_FACE.findall(css):
+        descriptors = {name.lower(): value.strip() for name, value in _DESCRIPTOR.findall(block)}
+        source = _CSS_URL.search(descriptors['src']).group(2)
+        family = descriptors['font-family'].strip('\'"')
+        style = descriptors.get('font-style', 'normal')
+        weight = descriptors.get('font-weight', '400')
+        name = f"fonts/{_slug(family)}-{weight}{'-italic' if style == 'italic' else ''}.{flavor}"
+        data = fetch(source, cache_dir)
+        subset = subset_font(data, text, flavor)
+        _write(out_dir / name, subset)
+        files.append((name, len(data), len(subset)))
+        rules.append(f"@font-face{{font-family:'{family}';font-style:{style};font-weight:{weight};"
+                     f"font-display:swap;src:url({name}) format('{flavor}')}}")
+    return '\n'.join(rules) + '\n', files
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(data if isinstance(data, bytes) else data.encode('utf-8'))
+    os.replace(tmp, path)
+
+
+def _block_end(css, start, stop_chars):
+    """从 start 起第一个不在字符串内、括号深度为0的 stop_chars 字符的位置（没有时为文本末尾）"""
+    depth = 0
+    quote = None
+    i = start
+    while i < len(css):
+        c = css[i]
+        if quote:
+            if c == '\\':
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in '"\'':
+            quote = c
+        elif c in '({':
+            if depth == 0 and c in stop_chars:
+                return i
+            depth += 1
+        elif c in ')}':
+            if depth == 0 and c in stop_chars:
+                return i
+            depth -= 1
+        elif depth == 0 and c in stop_chars:
+            return i
+        i += 1
+    return len(css)
+
+
+def parse_css(css):
+    """
+    拆分样式表的顶层
+
+    Returns:
+        list: [(前导, 块内容)]：普通规则为 (选择器, 声明)，@media 等为 (条件, 内部规则)，
+              @charset/@import 等语句为 (语句, None)
+    """
+    css = _COMMENT.sub('', css)
+    items = []
+    i = 0
+    while i < len(css):
+        end = _block_end(css, i, '{;}')
+        prelude = _SPACE.sub(' ', css[i:end]).strip()
+        if end < len(css) and css[end] == '{':
+            close = _block_end(css, end + 1, '}')
+            items.append((prelude, css[end + 1:close]))
+            i = close + 1
+        else:
+            if prelude:
+                items.append((prelude, None))
+            i = end + 1
+    return items
+
+
+def _strip_functional(selector, attributes=True):
+    """去掉 :not() 等伪类的参数（其中的类名不是元素必须有的）和属性选择器"""
+    out = []
+    i = 0
+    while i < len(selector):
+        c = selector[i]
+        if c == '[' and attributes:
+            i = selector.index(']', i) + 1 if ']' in selector[i:] else len(selector)
+            continue
+        if c == '(':
+            depth = 1
+            i += 1
+            while i < len(selector) and depth:
+                depth += {'(': 1, ')': -1}.get(selector[i], 0)
+                i += 1
+            continue
+        out.append(c)
+        i += 1
+    return ''.join(out)
+
+
+class SelectorUsage:
+    """
+    页面用到的类、id、元素和属性，用来判断 CSS 选择器是否可能匹配
+
+    只要选择器中的每个类、id、元素和属性都出现过就保留（不检查它们的结构关系和属性值），
+    宁可多保留也不误删
+    """
+    def __init__(self, classes=(), ids=(), tags=(), attributes=()):
+        self.classes = set(classes)
+        self.ids = set(ids)
+        self.tags = {'html', 'body'} | {tag.lower() for tag in tags}
+        self.attributes = {name.lower() for name in attributes}
+
+    def add_html(self, html):
+        """渲染后的页面：class/id 属性、元素名和属性名"""
+        for _, value in _CLASS_ATTR.findall(html):
+            self.classes.update(value.split())
+        for _, value in _ID_ATTR.findall(html):
+            self.ids.update(value.split())
+        self.tags.update(tag.lower() for tag in _TAG.findall(html))
+        self.attributes.update(name.lower() for name in _ATTRIBUTE.findall(html))
+
+    def add_source(self, text):
+        """模板源文件：其中的每个词都可能是运行时拼出的类名、id 或属性名"""
+        words = set(_WORD.findall(text))
+        self.classes.update(words)
+        self.ids.update(words)
+        self.attributes.update(word.lower() for word in words)
+        self.tags.update(tag.lower() for tag in _TAG.findall(text))
+
+    def matches(self, selector):
+        """选择器是否可能匹配页面中的元素"""
+        if not all(name.lower() in self.attributes
+                   for name in _SELECTOR_ATTRIBUTE.findall(_strip_functional(selector, attributes=False))):
+            return False
+        plain = _strip_functional(selector)
+        if not all(name in self.classes for name in _SELECTOR_CLASS.findall(plain)):
+            return False
+        if not all(name in self.ids for name in _SELECTOR_ID.findall(plain)):
+            return False
+        plain = _PSEUDO.sub('', _SELECTOR_ID.sub('', _SELECTOR_CLASS.sub('', plain)))
+        return all(tag.lower() in self.tags for tag in _SELECTOR_TAG.findall(plain))
+
+
+class _FoldParser(HTMLParser):
+    """记录 <main> 中第一个 .row、前 FOLD_BLOCKS 个顶层元素和 <main> 的结束位置（行号, 列号）"""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.main_depth = None
+        self.blocks = 0
+        self.row_end = self.blocks_end = self.main_end = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_ELEMENTS:
+            return
+        if tag == 'main' and self.main_depth is None:
+            self.main_depth = len(self.stack)
+        classes = (dict(attrs).get('class') or '').split()
+        self.stack.append((tag, 'row' in classes))
+
+    def handle_endtag(self, tag):
+        if not any(name == tag for name, _ in self.stack):
+            return
+        name, row = self.stack.pop()
+        while name != tag:
+            name, row = self.stack.pop()
+        if self.main_depth is None or self.main_end is not None:
+            return
+        depth = len(self.stack)
+        if depth == self.main_depth:
+            self.main_end = self.getpos()
+        elif depth > self.main_depth:
+            if row and self.row_end is None:
+                self.row_end = self.getpos()
+            if depth == self.main_depth + 1:
+                self.blocks += 1
+                if self.blocks == FOLD_BLOCKS:
+                    self.blocks_end = self.getpos()
+
+
+def above_the_fold(html):
+    """
+    渲染后页面的首屏部分：<body> 起，到 <main> 中第一个 .row 结束为止
+    （导航栏、标题区和第一行）；没有 .row 时到前 FOLD_BLOCKS 个顶层元素结束为止
+
+    Returns:
+        str: 页面HTML的一段
+    """
+    parser = _FoldParser()
+    parser.feed(html)
+    parser.close()
+    end = parser.row_end or parser.blocks_end or parser.main_end
+    if end is None:
+        return html
+    line, column = end
+    lines = html.splitlines(keepends=True)
+    offset = sum(len(text) for text in lines[:line - 1]) + column
+    offset = html.find('>', offset) + 1 or len(html)
+    start = html.find('<body')
+    return html[max(start, 0):offset]
+
+
+def purge_css(css, usage):
+    """
+    删除选择器都不可能匹配的规则，并压缩空白
+
+    @font-face、@keyframes 等原样保留；@media 等条件规则中的规则同样清理，清理后为空时删除
+
+    Args:
+        css (str): 样式表
+        usage (SelectorUsage): 页面用到的类、id 和元素
+
+    Returns:
+        str: 清理后的样式表
+    """
+    out = []
+    for prelude, body in parse_css(css):
+        if body is None:
+            out.append(prelude + ';')
+        elif prelude.startswith(_NESTED_AT_RULES):
+            inner = purge_css(body, usage)
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            out.append(f'{prelude}{{{_minify(body)}}}')
+        else:
+            selectors = [s.strip() for s in _split_selectors(prelude) if usage.matches(s.strip())]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{_minify(body)}}}")
+    return ''.join(out)
+
+
+def purge_keyframes(css):
+    """
+    删除样式表中没有被任何 animation/animation-name 引用的 @keyframes
+
+    Args:
+        css (str): purge_css 的结果
+
+    Returns:
+        str: 样式表
+    """
+    items = parse_css(css)
+    used = set()
+    for _, value in _ANIMATION.findall(css):
+        used.update(_WORD.findall(value))
+    out = []
+    for prelude, body in items:
+        if body is None:
+            out.append(prelude + ';')
+        elif not prelude.startswith(_KEYFRAMES) or prelude.split()[-1] in used:
+            out.append(f'{prelude}{{{body}}}')
+    return ''.join(out)
+
+
+def _split_selectors(prelude):
+    parts = []
+    start = 0
+    while start <= len(prelude):
+        end = _block_end(prelude, start, ',')
+        parts.append(prelude[start:end])
+        start = end + 1
+    return parts
+
+
+def _minify(body):
+    return _SPACE.sub(' ', body).strip().rstrip(';')
+
+
+def _static_refs(name, css):
+    """把样式表中相对 static/<name> 的 url() 改为 static:<路径>（内联后相对路径不再有效）"""
+    base = posixpath.dirname(name)
+
+    def replace(match):
+        ref = match.group(2)
+        if ref.startswith(('/', 'data:', 'http:', 'https:', '#')):
+            return match.group(0)
+        return f'url({STATIC_REF}{posixpath.normpath(posixpath.join(base, ref))})'
+    return _CSS_URL.sub(replace, css)
+
+
+def page_samples(app):
+    """
+    各页面模板的代表页面：首页、牌库、牌详情、各占卜页、每日一牌和404页
+
+    Returns:
+        list: 请求路径
+    """
+    from webapp import routes
+
+    manager = routes.deck_reloader.current.manager(app.config['BABEL_DEFAULT_LOCALE'])
+    with app.test_request_context():
+        paths = [url_for('main.index'), url_for('main.browse_cards'), url_for('main.daily_card'),
+                 url_for('main.card_detail', card_url=manager.get_all_cards()[0]['url'])]
+        paths += [url_for('main.spread', name=name)
+                  for name in routes.spread_registry.for_locale(app.config['BABEL_DEFAULT_LOCALE'])]
+        # 不存在的牌：404页
+        paths.append(url_for('main.card_detail', card_url='no-such-card'))
+    return paths
+
+
+def render_samples(app, paths):
+    """
+    用各语言请求代表页面
+
+    Returns:
+        dict: 页面模板名 -> [页面HTML]
+    """
+    pages = {}
+    rendered = []
+
+    def record(sender, template, context, **extra):
+        rendered.append(template.name)
+
+    template_rendered.connect(record, app)
+    try:
+        client = app.test_client()
+        for locale in app.config['BABEL_SUPPORTED_LOCALES']:
+            for path in paths:
+                rendered.clear()
+                response = client.get(path, headers={'Accept-Language': locale})
+                # 片段模板先于页面模板渲染完成，最后一个即页面模板
+                if rendered:
+                    pages.setdefault(rendered[-1], []).append(response.get_data(as_text=True))
+    finally:
+        template_rendered.disconnect(record, app)
+    return pages
+
+
+def build_frontend(app, cache_dir):
+    """
+    下载、子集化字体和 Bootstrap，生成各页面模板的内联 CSS 和清单 static/vendor/manifest.json
+
+    Args:
+        app (Flask): 应用（用于读取模板、数据和渲染代表页面）
+        cache_dir (str|Path): 下载缓存目录
+
+    Returns:
+        dict: 统计（fonts/bootstrap/critical，各为文件名 -> (原大小, 输出大小)）
+
+    Raises:
+        OSError: 下载或写入失败
+        ImportError: 未安装 fontTools
+    """
+    static_dir = Path(app.static_folder)
+    out_dir = static_dir / VENDOR_DIR
+    root = Path(app.root_path) / app.template_folder
+    templates = {path.relative_to(root).as_posix(): path.read_text(encoding='utf-8')
+                 for path in root.rglob('*.html')}
+    pages = render_samples(app, page_samples(app))
+
+    fonts_css, fonts = vendor_fonts(fetch(GOOGLE_FONTS_URL, cache_dir).decode('utf-8'),
+                                    site_text(app), out_dir, cache_dir)
+    _write(out_dir / 'fonts.css', fonts_css)
+
+    # 全站用到的 Bootstrap 规则：全部模板源文件和代表页面
+    site = SelectorUsage(BOOTSTRAP_JS_CLASSES, attributes=BOOTSTRAP_JS_ATTRIBUTES)
+    for text in templates.values():
+        site.add_source(text)
+    for html in sum(pages.values(), []):
+        site.add_html(html)
+    bootstrap_css = fetch(BOOTSTRAP_CSS_URL, cache_dir).decode('utf-8')
+    purged = purge_css(bootstrap_css, site)
+    _write(out_dir / 'bootstrap.min.css', purged)
+    bootstrap_js = fetch(BOOTSTRAP_JS_URL, cache_dir)
+    _write(out_dir / 'bootstrap.bundle.min.js', bootstrap_js)
+
+    # 各页面模板的内联 CSS：只保留代表页面首屏用到的规则，其余由异步加载的完整样式表提供
+    stylesheets = [f'{VENDOR_DIR}/fonts.css', f'{VENDOR_DIR}/bootstrap.min.css', 'css/style.css']
+    full_css = ''.join(_static_refs(name, (static_dir / name).read_text(encoding='utf-8'))
+                       for name in stylesheets)
+    critical = {}
+    sizes = {}
+    for template, htmls in sorted(pages.items()):
+        usage = SelectorUsage()
+        for html in htmls:
+            usage.add_html(above_the_fold(html))
+        name = critical[template] = f"{VENDOR_DIR}/critical/{template.replace('/', '-')[:-len('.html')]}.css"
+        css = purge_keyframes(purge_css(full_css, usage))
+        _write(static_dir / name, css)
+        sizes[name] = (len(full_css.encode('utf-8')), len(css.encode('utf-8')))
+
+    manifest = {'stylesheets': stylesheets, 'script': f'{VENDOR_DIR}/bootstrap.bundle.min.js',
+                'critical': critical}
+    _write(out_dir / MANIFEST_NAME, json.dumps(manifest, indent=1, sort_keys=True))
+    return {'fonts': {name: (size, subset) for name, size, subset in fonts},
+            'bootstrap': {f'{VENDOR_DIR}/bootstrap.min.css': (len(bootstrap_css.encode('utf-8')),
+                                                              len(purged.encode('utf-8')))},
+            'critical': sizes}
+
+
+class FrontendAssets:
+    """
+    自托管的样式表、脚本和各页面模板的内联 CSS（运行时只读）
+    清单不存在时为空，模板使用 CDN
+    """
+    def __init__(self, static_dir=None, manifest=None):
+        manifest = manifest or {}
+        self.static_dir = Path(static_dir) if static_dir else None
+        self.stylesheets = manifest.get('stylesheets', [])
+        self.script = manifest.get('script')
+        self.critical = manifest.get('critical', {})
+        self._inline = {}
+
+    @classmethod
+    def load(cls, path):
+        """读取 static/vendor/manifest.json（清单所在目录的上一级为静态目录）"""
+        if not path or not Path(path).exists():
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls(Path(path).parent.parent, json.load(f))
+
+    def __bool__(self):
+        return bool(self.stylesheets)
+
+    def critical_css(self, template):
+        """
+        某页面模板的内联 CSS，其中的静态文件引用替换为 url_for('static') 的结果（需要请求上下文）
+
+        Returns:
+            Markup: 没有为该模板生成时返回None
+        """
+        css = self._inline.get(template)
+        if css is None:
+            name = self.critical.get(template)
+            if name is None:
+                return None
+            text = (self.static_dir / name).read_text(encoding='utf-8')
+            css = self._inline[template] = Markup(_STATIC_URL.sub(
+                lambda m: f"url({url_for('static', filename=m.group(1))})", text))
+        return css
+
+
+def init_frontend(app):
+    """
+    加载 app.config['FRONTEND_MANIFEST']：模板改用自托管的字体和 Bootstrap，
+    并在 <head> 中内联所属页面模板的 CSS
+    """
+    frontend = FrontendAssets.load(app.config.get('FRONTEND_MANIFEST'))
+    app.extensions['frontend'] = frontend
+    if not frontend:
+        return
+
+    @app.context_processor
+    def inject_frontend():
+        return {'frontend': frontend}
+
+    def add_critical_css(sender, template, context, **extra):
+        if template.name in frontend.critical:
+            context['critical_css'] = frontend.critical_css(template.name)
+
+    before_render_template.connect(add_critical_css, app, weak=False)
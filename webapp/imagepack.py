@@ -0,0 +1,266 @@
+"""
+牌面图片包
+构建时（scripts/build_images.py）把一个牌组的全部牌面图片及其各尺寸、格式的版本首尾相接写入一个文件，
+文件头中是偏移索引（每张图片的位置、长度、内容摘要ETag、MIME类型和修改时间）。
+
+应用启动时每个进程把图片包映射（mmap）一次；静态文件视图先查索引，命中时不再逐个打开文件、
+计算ETag：用 wsgi.file_wrapper 返回图片包中的一段，gunicorn 同步 worker 据此以 os.sendfile 零拷贝发送，
+其他服务器从映射中逐块读取。部署在 nginx 之后时可改为返回 X-Accel-Redirect，由 nginx 发送文件
+
+文件格式：PACK_MAGIC、4 字节（大端）索引长度、JSON 索引，其后为各图片的内容
+"""
+import hashlib
+import json
+import mimetypes
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from flask import current_app, request
+from werkzeug.wsgi import wrap_file
+
+PACK_MAGIC = b'TAROTPK1'
+PACK_SUFFIX = '.pack'
+_HEADER = struct.Struct('>8sI')
+# mimetypes 不认识的图片格式
+_MIMETYPES = {'.avif': 'image/avif', '.webp': 'image/webp'}
+
+
+def pack_key(digests):
+    """
+    图片包的摘要（按图片名排序的 (图片名, 内容摘要)），图片或其内容改变时随之改变
+    """
+    data = json.dumps(sorted(digests)).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _mimetype(name):
+    suffix = os.path.splitext(name)[1].lower()
+    return _MIMETYPES.get(suffix) or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def build_pack(static_dir, filenames, out_dir):
+    """
+    生成图片包（已存在时跳过）
+
+    Args:
+        static_dir (str|Path): 静态文件目录
+        filenames (iterable): 相对 static_dir 的图片
+        out_dir (str|Path): 输出目录
+
+    Returns:
+        tuple: (图片包摘要, 是否新生成)
+    """
+    static_dir = Path(static_dir)
+    out_dir = Path(out_dir)
+    sources = {}
+    for name in sorted(set(filenames)):
+        data = (static_dir / name).read_bytes()
+        sources[name] = (data, hashlib.sha256(data).hexdigest())
+    key = pack_key([(name, digest) for name, (_, digest) in sources.items()])
+    path = out_dir / f'{key}{PACK_SUFFIX}'
+    if path.exists():
+        return key, False
+
+    index = {}
+    offset = 0
+    for name, (data, digest) in sources.items():
+        stat = (static_dir / name).stat()
+        # [偏移（相对内容起点）, 长度, ETag, MIME类型, 源文件修改时间（纳秒）]
+        index[name] = [offset, len(data), digest[:32], _mimetype(name), stat.st_mtime_ns]
+        offset += len(data)
+    header = json.dumps({'key': key, 'images': index}, separators=(',', ':')).encode('utf-8')
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(PACK_MAGIC, len(header)))
+        f.write(header)
+        for data, _ in sources.values():
+            f.write(data)
+    os.replace(tmp, path)
+    return key, True
+
+
+def remove_stale_packs(out_dir, keep):
+    """
+    删除不再使用的图片包
+
+    Args:
+        out_dir (str|Path): 图片包目录
+        keep (set): 保留的图片包摘要
+
+    Returns:
+        int: 删除的文件数
+    """
+    out_dir = Path(out_dir)
+    removed = 0
+    if out_dir.is_dir():
+        for path in out_dir.glob(f'*{PACK_SUFFIX}'):
+            if path.stem not in keep:
+                path.unlink()
+                removed += 1
+    return removed
+
+
+class ImagePack:
+    """
+    一个图片包（只读）
+    内容映射到内存，由同一进程的所有线程共享；sendfile 用的文件描述符每个线程（和 fork 后的每个进程）各开一个，
+    各自的读写位置互不干扰
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            magic, length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != PACK_MAGIC:
+                raise ValueError(f"不是图片包: {path}")
+            data = json.loads(f.read(length))
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.key = data['key']
+        start = _HEADER.size + length
+        self.images = {name: (start + offset, size, etag, mimetype, mtime_ns)
+                       for name, (offset, size, etag, mimetype, mtime_ns) in data['images'].items()}
+        self._local = threading.local()
+
+    def fileno(self):
+        """当前线程的文件描述符（fork 后重新打开）"""
+        opened = getattr(self._local, 'fd', None)
+        if opened is None or opened[0] != os.getpid():
+            opened = self._local.fd = (os.getpid(), os.open(self.path, os.O_RDONLY))
+        return opened[1]
+
+
+class PackSlice:
+    """
+    图片包中的一段，作为 wsgi.file_wrapper 的文件对象
+
+    gunicorn 对有 fileno() 的文件对象使用 sendfile：从文件描述符的当前位置起发送 Content-Length 字节，
+    因此 fileno() 先把当前线程的描述符定位到这一段的起点；
+    其他服务器调用 read() 从内存映射中逐块读取。close() 不关闭共享的描述符
+    """
+    __slots__ = ('pack', 'start', 'end', 'position')
+
+    def __init__(self, pack, offset, length):
+        self.pack = pack
+        self.start = offset
+        self.end = offset + length
+        self.position = offset
+
+    def fileno(self):
+        fd = self.pack.fileno()
+        os.lseek(fd, self.position, os.SEEK_SET)
+        return fd
+
+    def read(self, size=-1):
+        end = self.end if size is None or size < 0 else min(self.end, self.position + size)
+        data = self.pack.map[self.position:end]
+        self.position = end
+        return data
+
+    def close(self):
+        pass
+
+
+class ImagePacks:
+    """
+    已生成的图片包（运行时只读）：静态文件名（含带摘要的文件名）-> (图片包, 索引项)
+    源文件在构建后被修改过（修改时间或大小不同）的图片不从图片包返回
+    """
+    def __init__(self, packs=(), static_dir=None, hashed=None):
+        """
+        Args:
+            packs (iterable): ImagePack
+            static_dir (str|Path): 静态文件目录（检查源文件是否被修改过）
+            hashed (dict): 静态文件名 -> 带摘要的文件名（见 webapp.assets）
+        """
+        self.packs = list(packs)
+        self._images = {}
+        for pack in self.packs:
+            for name, entry in pack.images.items():
+                if static_dir is not None:
+                    try:
+                        stat = (Path(static_dir) / name).stat()
+                    except OSError:
+                        continue
+                    if (stat.st_mtime_ns, stat.st_size) != (entry[4], entry[1]):
+                        continue
+                self._images[name] = (pack, entry)
+                if hashed and name in hashed:
+                    self._images[hashed[name]] = (pack, entry)
+
+    @classmethod
+    def load(cls, directory, static_dir=None, hashed=None):
+        """读取目录中的全部图片包；目录不存在时为空"""
+        if not directory or not Path(directory).is_dir():
+            return cls()
+        return cls((ImagePack(path) for path in sorted(Path(directory).glob(f'*{PACK_SUFFIX}'))),
+                   static_dir, hashed)
+
+    def __len__(self):
+        return len(self._images)
+
+    def get(self, filename):
+        """
+        Returns:
+            tuple: (ImagePack, (偏移, 长度, ETag, MIME类型, 修改时间)）；不在图片包中时返回None
+        """
+        return self._images.get(filename)
+
+
+def send_packed(filename, pack, entry, accel_prefix=None):
+    """
+    返回图片包中的一张图片（缓存头、ETag、条件请求和 Range 与 Flask 的静态文件相同）
+
+    Args:
+        filename (str): 请求的静态文件名
+        pack (ImagePack): 图片包
+        entry (tuple): 索引项
+        accel_prefix (str): nginx 内部 location 前缀；设置时不返回内容，
+            由 nginx 按 X-Accel-Redirect 发送静态目录中的同名文件
+    """
+    offset, length, etag, mimetype, mtime_ns = entry
+    response = current_app.response_class(mimetype=mimetype, direct_passthrough=True)
+    response.set_etag(etag)
+    response.last_modified = mtime_ns // 1_000_000_000
+    response.cache_control.no_cache = True
+    max_age = current_app.get_send_file_max_age(filename)
+    if max_age is not None:
+        if max_age > 0:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+        response.cache_control.max_age = max_age
+
+    if accel_prefix:
+        response = response.make_conditional(request)
+        if response.status_code != 304:
+            response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + filename
+        return response
+
+    response.response = wrap_file(request.environ, PackSlice(pack, offset, length))
+    response.content_length = length
+    return response.make_conditional(request, accept_ranges=True, complete_length=length)
+
+
+def init_image_packs(app):
+    """
+    加载 app.config['IMAGE_PACK_DIR'] 中的图片包，静态文件视图先从图片包返回图片
+    （在 init_assets 之后调用，带摘要的文件名也指向图片包）
+    """
+    manifest = app.extensions.get('asset_manifest')
+    packs = ImagePacks.load(app.config.get('IMAGE_PACK_DIR'), app.static_folder,
+                            manifest.assets if manifest else None)
+    app.extensions['image_packs'] = packs
+    if not packs:
+        return
+    accel_prefix = app.config.get('IMAGE_ACCEL_REDIRECT')
+    static_view = app.view_functions['static']
+
+    def packed_static(filename):
+        found = packs.get(filename)
+        if found is None:
+            return static_view(filename=filename)
+        return send_packed(filename, *found, accel_prefix)
+
+    app.view_functions['static'] = packed_static
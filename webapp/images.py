@@ -0,0 +1,204 @@
+"""
+牌面图片的多尺寸、多格式版本
+构建时（scripts/build_images.py）为每张牌面图片生成缩略图和中等尺寸，各有 AVIF/WebP/JPEG 三种格式，
+写入 static/variants/ 并生成清单；模板按清单输出 <picture> 与 srcset/sizes，
+浏览器只下载适合显示尺寸和所支持格式的最小文件。
+
+文件名中带源图片的内容摘要：源图片不变时跳过，清单丢失或设置改变时重新生成
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# 版本名 -> 宽度（像素，不超过源图片宽度）
+VARIANT_WIDTHS = {'thumb': 150, 'medium': 300}
+# 输出格式（按浏览器优先选择的顺序），最后一种为不支持 <picture> 的浏览器使用的后备格式
+VARIANT_FORMATS = ('avif', 'webp', 'jpeg')
+# 各格式的编码参数
+_SAVE_OPTIONS = {
+    'avif': {'quality': 50},
+    'webp': {'quality': 78, 'method': 6},
+    'jpeg': {'quality': 80, 'optimize': True, 'progressive': True},
+}
+VARIANT_DIR = 'variants'
+MANIFEST_NAME = 'manifest.json'
+
+
+def available_formats():
+    """当前 Pillow 能编码的输出格式"""
+    from PIL import features
+    return tuple(fmt for fmt in VARIANT_FORMATS if fmt == 'jpeg' or features.check(fmt))
+
+
+def _settings(formats):
+    """影响输出的设置，改变时全部重新生成"""
+    return {'widths': VARIANT_WIDTHS, 'formats': list(formats), 'options': _SAVE_OPTIONS}
+
+
+def file_digest(path):
+    """文件内容的SHA-256（十六进制）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_variants(static_dir, filename, digest, formats):
+    """
+    生成一张图片的全部版本
+
+    Args:
+        static_dir (str): 静态文件目录
+        filename (str): 相对 static_dir 的源图片
+        digest (str): 源图片摘要
+        formats (tuple): 输出格式
+
+    Returns:
+        dict: 清单条目
+    """
+    from PIL import Image
+
+    static_dir = Path(static_dir)
+    stem = Path(filename).stem
+    with Image.open(static_dir / filename) as source:
+        source = source.convert('RGB')
+        entry = {'hash': digest, 'width': source.width, 'height': source.height, 'variants': []}
+        for name, width in VARIANT_WIDTHS.items():
+            width = min(width, source.width)
+            height = round(source.height * width / source.width)
+            image = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+            files = {}
+            for fmt in formats:
+                target = f'{VARIANT_DIR}/{stem}.{digest[:12]}.{width}.{fmt}'
+                path = static_dir / target
+                tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+                image.save(tmp, format=fmt.upper(), **_SAVE_OPTIONS[fmt])
+                os.replace(tmp, path)
+                files[fmt] = {'file': target, 'size': path.stat().st_size}
+            entry['variants'].append({'name': name, 'width': width, 'height': height, 'files': files})
+    return entry
+
+
+def _render_task(args):
+    return args[1], render_variants(*args)
+
+
+def _entry_files(entry):
+    return [f['file'] for variant in entry['variants'] for f in variant['files'].values()]
+
+
+def build_variants(static_dir, filenames, jobs=1, force=False):
+    """
+    生成图片版本和清单（增量）
+
+    Args:
+        static_dir (str|Path): 静态文件目录
+        filenames (iterable): 相对 static_dir 的源图片
+        jobs (int): 并行进程数
+        force (bool): 忽略上次的清单，全部重新生成
+
+    Returns:
+        dict: 统计（images/rendered/skipped/removed）
+    """
+    static_dir = Path(static_dir)
+    out_dir = static_dir / VARIANT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    formats = available_formats()
+    settings = _settings(formats)
+
+    previous = {}
+    if not force and manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('settings') == settings:
+            previous = data['images']
+
+    images = {}
+    tasks = []
+    for filename in sorted(set(filenames)):
+        digest = file_digest(static_dir / filename)
+        entry = previous.get(filename)
+        if (entry is not None and entry['hash'] == digest
+                and all((static_dir / name).is_file() for name in _entry_files(entry))):
+            images[filename] = entry
+        else:
+            tasks.append((str(static_dir), filename, digest, formats))
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            images.update(pool.map(_render_task, tasks, chunksize=4))
+    else:
+        images.update(map(_render_task, tasks))
+
+    # 删除不再被引用的版本文件
+    referenced = {name for entry in images.values() for name in _entry_files(entry)}
+    removed = 0
+    for path in out_dir.iterdir():
+        if path.name != MANIFEST_NAME and f'{VARIANT_DIR}/{path.name}' not in referenced:
+            path.unlink()
+            removed += 1
+
+    manifest = {'settings': settings, 'images': {name: images[name] for name in sorted(images)}}
+    tmp = manifest_path.with_name(f'.{MANIFEST_NAME}.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, manifest_path)
+    return {'images': len(images), 'rendered': len(tasks),
+            'skipped': len(images) - len(tasks), 'removed': removed}
+
+
+class ImageVariants:
+    """
+    已生成的图片版本（运行时只读）
+    清单不存在时为空，模板退回到原图
+    """
+    def __init__(self, images=None, formats=()):
+        self._images = images or {}
+        self.formats = tuple(formats)
+
+    @classmethod
+    def load(cls, static_dir):
+        """读取 static_dir/variants/manifest.json"""
+        path = Path(static_dir) / VARIANT_DIR / MANIFEST_NAME
+        if not path.exists():
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['images'], data['settings']['formats'])
+
+    def __len__(self):
+        return len(self._images)
+
+    def get(self, filename):
+        """
+        某张图片的版本
+
+        Returns:
+            dict: 清单条目；没有生成过时返回None
+        """
+        return self._images.get(filename)
+
+    def picture(self, filename, url_for):
+        """
+        输出 <picture> 所需的 srcset
+
+        Args:
+            filename (str): 相对静态目录的源图片
+            url_for (callable): url_for(filename) -> URL
+
+        Returns:
+            dict: sources 为 [(MIME类型, srcset)]（按优先顺序，不含后备格式），
+                  srcset/src 为后备格式的 srcset 和最大尺寸的URL；没有版本时返回None
+        """
+        entry = self._images.get(filename)
+        if entry is None:
+            return None
+        srcsets = [(f'image/{fmt}', ', '.join(f"{url_for(variant['files'][fmt]['file'])} {variant['width']}w"
+                                              for variant in entry['variants']))
+                   for fmt in self.formats]
+        largest = entry['variants'][-1]['files'][self.formats[-1]]['file']
+        return {'sources': srcsets[:-1], 'srcset': srcsets[-1][1], 'src': url_for(largest)}
@@ -2,50 +2,225 @@
 核心业务逻辑模型
 重构自原项目的 PandasToList 类
 """
-import pandas as pd
-import random
+import html
+import unicodedata
+import weakref
+from collections import namedtuple
+from operator import attrgetter
 from pathlib import Path
+from types import MappingProxyType
 from flask_babel import gettext as _
+from webapp.rng import current_rng, orientation_bits
+from webapp.snapshot import load_snapshot, read_csv_records
+
+# 语言无关字段（各语言共享）与需要翻译的字段
+CARD_SHARED_FIELDS = ('url', 'image', 'sequence', 'cardtype', 'hebrew_letter')
+CARD_LOCALE_FIELDS = ('name', 'desc', 'message', 'rdesc', 'qabalah', 'meditation')
+# CSV列顺序
+CARD_FIELDS = ('name', 'url', 'image', 'desc', 'message', 'rdesc', 'sequence',
+               'qabalah', 'hebrew_letter', 'meditation', 'cardtype')
+_CARD_FIELD_SET = frozenset(CARD_FIELDS)
+
+# 布局中的一张牌：位置说明、卡牌、是否逆位
+Placement = namedtuple('Placement', ('position', 'card', 'reversed'))
+
+
+class _Immutable:
+    """禁止创建后修改属性"""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    __delattr__ = __setattr__
+
+
+class CardBase(_Immutable):
+    """
+    卡牌的语言无关部分
+    通过 CardBase.intern() 创建，相同取值的实例在所有语言牌组间只保存一份
+    """
+    __slots__ = CARD_SHARED_FIELDS + ('__weakref__',)
+    _pool = weakref.WeakValueDictionary()
+
+    def __init__(self, url, image, sequence, cardtype, hebrew_letter):
+        for field, value in zip(CARD_SHARED_FIELDS, (url, image, sequence, cardtype, hebrew_letter)):
+            object.__setattr__(self, field, value)
+
+    @classmethod
+    def intern(cls, url, image, sequence, cardtype, hebrew_letter):
+        """获取共享实例，不存在时创建"""
+        raw_key = (url, image, sequence, cardtype, hebrew_letter)
+        base = cls._pool.get(raw_key)
+        if base is not None:
+            return base
+        # 希伯来字母在英文CSV中是HTML实体、中文CSV中是字符本身，统一为NFC字符
+        hebrew_letter = unicodedata.normalize('NFC', html.unescape(hebrew_letter))
+        key = (url, image, sequence, cardtype, hebrew_letter)
+        base = cls._pool.get(key)
+        if base is None:
+            base = cls._pool.setdefault(key, cls(*key))
+        if raw_key != key:
+            # 原始取值也登记一份，下次无需重新规范化
+            cls._pool[raw_key] = base
+        return base
+
+    def __reduce__(self):
+        return (self.intern, tuple(getattr(self, f) for f in CARD_SHARED_FIELDS))
+
+
+class Card(_Immutable):
+    """
+    紧凑、不可变的卡牌记录
+    只保存本语言的翻译字段，语言无关字段委托给共享的 CardBase。
+    支持 card.name 下标访问，模板无需改动
+    """
+    __slots__ = ('base',) + CARD_LOCALE_FIELDS
+
+    def __init__(self, base, name, desc, message, rdesc, qabalah, meditation):
+        object.__setattr__(self, 'base', base)
+        for field, value in zip(CARD_LOCALE_FIELDS, (name, desc, message, rdesc, qabalah, meditation)):
+            object.__setattr__(self, field, value)
+
+    url = property(attrgetter('base.url'))
+    image = property(attrgetter('base.image'))
+    sequence = property(attrgetter('base.sequence'))
+    cardtype = property(attrgetter('base.cardtype'))
+    hebrew_letter = property(attrgetter('base.hebrew_letter'))
+
+    @classmethod
+    def from_record(cls, record):
+        """从CSV/快照的字典记录创建"""
+        base = CardBase.intern(*(record[f] for f in CARD_SHARED_FIELDS))
+        return cls(base, *(record[f] for f in CARD_LOCALE_FIELDS))
+
+    def __getitem__(self, key):
+        if key in _CARD_FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in _CARD_FIELD_SET
+
+    def get(self, key, default=None):
+        """与 dict.get 相同"""
+        return getattr(self, key) if key in _CARD_FIELD_SET else default
+
+    def keys(self):
+        """字段名（CSV列顺序）"""
+        return CARD_FIELDS
+
+    def to_dict(self):
+        """转换为普通字典"""
+        return {f: getattr(self, f) for f in CARD_FIELDS}
+
+    def __reduce__(self):
+        return (self.__class__, (self.base,) + tuple(getattr(self, f) for f in CARD_LOCALE_FIELDS))
+
+    def __repr__(self):
+        return f"Card({self.url!r}, {self.name!r})"
+
 
 class CardManager:
     """
     卡牌数据管理器
     重构自 PandasToList 类，负责加载和管理塔罗牌数据
     """
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, snapshot_path=None):
         """
         初始化卡牌管理器
 
         Args:
             csv_path (str): CSV文件路径
+            snapshot_path (str): 预编译快照路径，默认为CSV同级的 compiled/ 目录
         """
         self.csv_path = Path(csv_path)
-        self.df = None
-        self.cards = []
+        self.snapshot_path = snapshot_path
+        self.cards = ()
+        self.source = None
         self.load_cards()
 
     def load_cards(self):
         """加载塔罗牌数据"""
-        self.df = pd.read_csv(self.csv_path)
-        # 将NaN替换为空字符串
-        self.df = self.df.fillna('')
-        # 转换为字典列表
-        self.cards = self.df.to_dict('records')
+        self.cards = tuple(Card.from_record(record) for record in self._read_records())
+        self._build_indexes()
+
+    def _read_records(self):
+        """
+        读取字典记录
+        优先读取预编译快照（不导入pandas），快照缺失或过期时回退到CSV
+        """
+        records = load_snapshot(self.csv_path, self.snapshot_path)
+        if records is not None:
+            self.source = 'snapshot'
+        else:
+            _, records = read_csv_records(self.csv_path)
+            self.source = 'csv'
+        return records
+
+    def _build_indexes(self):
+        """
+        加载时一次性构建只读索引，查询开销不随牌数增长
+        """
+        cards = self.cards
+        by_url = {}
+        by_name = {}
+        by_type = {}
+        for card in cards:
+            by_url.setdefault(card.url, card)
+            by_name.setdefault(card.name.casefold(), card)
+            by_type.setdefault(card.cardtype, []).append(card)
+
+        # 前后牌导航表：url -> (上一张, 下一张)
+        neighbors = {}
+        last = len(cards) - 1
+        for i, card in enumerate(cards):
+            prev_card = cards[i - 1] if i > 0 else None
+            next_card = cards[i + 1] if i < last else None
+            neighbors.setdefault(card.url, (prev_card, next_card))
+
+        self._by_url = MappingProxyType(by_url)
+        self._by_name = MappingProxyType(by_name)
+        self._by_type = MappingProxyType({t: tuple(c) for t, c in by_type.items()})
+        self._minor = tuple(c for c in cards if c.cardtype != 'major')
+        self._neighbors = MappingProxyType(neighbors)
+
+    def add_name_aliases(self, other, locale=None):
+        """
+        把另一语言牌组的牌名加入名称索引（按url对应到本语言的牌）
+        只保存本语言的牌，不引用 other
+
+        Args:
+            other (CardManager): 其他语言的卡牌管理器
+            locale (str): other 的语言（与列式后端的接口一致）
+        """
+        # 在副本上合并后整体替换：请求线程读取的索引始终只读、完整
+        by_name = dict(self._by_name)
+        for card in other.cards:
+            own = self._by_url.get(card.url)
+            if own is not None:
+                by_name.setdefault(card.name.casefold(), own)
+        self._by_name = MappingProxyType(by_name)
 
     def get_all_cards(self):
         """获取所有卡牌"""
         return self.cards
 
+    def get_card_by_url(self, url):
+        """根据url获取卡牌"""
+        return self._by_url.get(url)
+
+    def get_neighbors(self, url):
+        """获取前后牌 (prev_card, next_card)，用于详情页导航"""
+        return self._neighbors.get(url, (None, None))
+
     def get_card_by_name(self, name):
-        """根据名称获取卡牌"""
-        for card in self.cards:
-            if card['name'].lower() == name.lower():
-                return card
-        return None
+        """根据名称获取卡牌（大小写不敏感，支持其他语言的牌名）"""
+        return self._by_name.get(name.casefold())
 
     def get_cards_by_type(self, cardtype):
         """根据类型获取卡牌（major/minor/court）"""
-        return [c for c in self.cards if c['cardtype'] == cardtype]
+        return self._by_type.get(cardtype, ())
 
     def get_major_arcana(self):
         """获取22张大牌"""
@@ -53,7 +228,7 @@ class CardManager:
 
     def get_minor_arcana(self):
         """获取56张小牌"""
-        return [c for c in self.cards if c['cardtype'] != 'major']
+        return self._minor
 
 
 class ReadingEngine:
@@ -70,49 +245,91 @@ class ReadingEngine:
         """
         self.card_manager = card_manager
 
-    def draw_cards(self, count=1, allow_duplicates=False):
+    def draw_cards(self, count=1, allow_duplicates=False, rng=None):
         """
         随机抽牌
 
         Args:
             count (int): 抽牌数量
             allow_duplicates (bool): 是否允许重复
+            rng (random.Random): 随机数生成器，传入带种子的实例可重现结果
 
         Returns:
             list: 抽取的卡牌列表，每个元素为 (card, is_reversed)
         """
+        rng = rng or current_rng()
         cards = self.card_manager.get_all_cards()
 
         if allow_duplicates:
-            selected = random.choices(cards, k=count)
+            selected = rng.choices(cards, k=count)
         else:
-            selected = random.sample(cards, min(count, len(cards)))
+            selected = rng.sample(cards, min(count, len(cards)))
 
-        # 随机决定正逆位
-        result = []
-        for card in selected:
-            is_reversed = random.choice([True, False])
-            result.append((card, is_reversed))
+        # 随机决定正逆位（一次取齐所需的随机位，不再逐张 choice）
+        return list(zip(selected, orientation_bits(rng, len(selected))))
 
-        return result
+    def spread_reading(self, spread, rng=None):
+        """
+        按布局占卜
 
-    def one_card_reading(self):
+        Args:
+            spread (Spread): 已编译的布局（见 webapp.spreads），位置说明已翻译
+            rng (random.Random): 随机数生成器，传入带种子的实例可重现结果
+
+        Returns:
+            tuple: Placement 元组，顺序与布局位置一致
+        """
+        rng = rng or current_rng()
+        cards = self.card_manager.get_all_cards()
+        selected = rng.sample(cards, spread.size)
+
+        if spread.reversed_count is None:
+            orientations = orientation_bits(rng, spread.size)
+        else:
+            # 固定张数的逆位，随机分配到各位置
+            orientations = [False] * (spread.size - spread.reversed_count) + [True] * spread.reversed_count
+            rng.shuffle(orientations)
+
+        return tuple(map(Placement, spread.positions, selected, orientations))
+
+    def batch_readings(self, spread, count, seed=None, registry=None):
+        """
+        批量生成占卜（向量化，适合模拟和预生成任务）
+
+        Args:
+            spread (str|Spread): 布局名（在 registry 中查找）或已编译的布局
+            count (int): 占卜次数
+            seed: 随机种子，相同种子和牌组得到相同结果
+            registry (SpreadRegistry): 布局注册表，默认为 data/spreads.json
+
+        Returns:
+            ReadingBatch: 紧凑的 (牌下标, 是否逆位) 矩阵，按下标访问时才物化为卡牌
+        """
+        # 按需导入，单次占卜的请求路径不加载NumPy
+        from webapp.batch import generate_batch
+        return generate_batch(self.card_manager, spread, count, seed, registry)
+
+    def one_card_reading(self, rng=None):
         """单卡占卜"""
-        return self.draw_cards(1)[0]
+        return self.draw_cards(1, rng=rng)[0]
 
-    def three_card_reading(self):
+    def three_card_reading(self, rng=None):
         """
         三卡占卜（过去-现在-未来）
         保持原逻辑：2张正位 + 1张逆位
+
+        Args:
+            rng (random.Random): 随机数生成器，传入带种子的实例可重现结果
         """
+        rng = rng or current_rng()
         cards = self.card_manager.get_all_cards()
 
         # 随机选择3张牌
-        selected = random.sample(cards, 3)
+        selected = rng.sample(cards, 3)
 
         # 2张正位，1张逆位
         orientations = [False, False, True]  # False=正位, True=逆位
-        random.shuffle(orientations)
+        rng.shuffle(orientations)
 
         result = [
             {'position': _('The Past'), 'card': selected[0], 'reversed': orientations[0]},
@@ -122,19 +339,23 @@ class ReadingEngine:
 
         return result
 
-    def six_card_reading(self):
+    def six_card_reading(self, rng=None):
         """
         六卡通用占卜
         保持原逻辑：4张正位 + 2张逆位
+
+        Args:
+            rng (random.Random): 随机数生成器，传入带种子的实例可重现结果
         """
+        rng = rng or current_rng()
         cards = self.card_manager.get_all_cards()
 
         # 随机选择6张牌
-        selected = random.sample(cards, 6)
+        selected = rng.sample(cards, 6)
 
         # 4张正位，2张逆位
         orientations = [False, False, False, False, True, True]
-        random.shuffle(orientations)
+        rng.shuffle(orientations)
 
         positions = [
             _('How you feel about yourself'),
@@ -0,0 +1,228 @@
+"""
+占卜永久链接
+每次占卜由 (牌组版本, 布局编号, 随机种子) 唯一确定，编码为一个短令牌：
+/reading/<token> 用同一种子重新抽牌即可还原，无需在服务器上保存任何结果。
+
+牌组版本是牌组url顺序的哈希；历史版本的url顺序记录在
+data/deck_versions.json 中，数据更新（增删牌、调整顺序）后旧链接仍按旧顺序抽牌，
+再按url取当前数据渲染
+"""
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import threading
+import weakref
+from pathlib import Path
+from webapp.rng import current_rng
+
+try:
+    import fcntl
+except ImportError:  # 可选：非 POSIX 平台上不加文件锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 令牌结构：版本(4字节) + 布局编号(1字节) + 种子(6字节)，base64url编码后15个字符
+_HEADER = struct.Struct('>IB')
+SEED_BITS = 48
+_SEED_BYTES = SEED_BITS // 8
+TOKEN_LENGTH = 15
+
+
+def deck_version(urls):
+    """
+    计算牌组版本号
+
+    Args:
+        urls (iterable): 按牌组顺序排列的url
+
+    Returns:
+        int: 32位版本号
+    """
+    digest = hashlib.sha256('\n'.join(urls).encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big')
+
+
+def new_seed():
+    """生成一个新的随机种子（取自当前的随机数来源，secrets 模式下为密码学安全随机数）"""
+    return current_rng().getrandbits(SEED_BITS)
+
+
+def encode_token(version, spread_code, seed):
+    """
+    编码永久链接令牌
+
+    Args:
+        version (int): 牌组版本号
+        spread_code (int): 布局编号（见 data/spreads.json）
+        seed (int): 随机种子（48位）
+
+    Returns:
+        str: 令牌
+    """
+    raw = _HEADER.pack(version, spread_code) + seed.to_bytes(_SEED_BYTES, 'big')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_token(token):
+    """
+    解码永久链接令牌
+
+    Returns:
+        tuple: (version, spread_code, seed)
+
+    Raises:
+        ValueError: 令牌格式无效
+    """
+    if len(token) != TOKEN_LENGTH:
+        raise ValueError('invalid reading token')
+    try:
+        raw = base64.b64decode(token + '=', altchars=b'-_', validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError('invalid reading token')
+    if len(raw) != _HEADER.size + _SEED_BYTES:
+        raise ValueError('invalid reading token')
+    version, spread_code = _HEADER.unpack_from(raw)
+    seed = int.from_bytes(raw[_HEADER.size:], 'big')
+    return version, spread_code, seed
+
+
+def seeded_rng(seed):
+    """种子对应的随机数生成器（同一种子得到相同的抽牌结果）"""
+    return random.Random(seed)
+
+
+class PinnedDeck:
+    """
+    按历史版本url顺序排列的牌组
+    提供 ReadingEngine 所需的 get_all_cards()
+    """
+    __slots__ = ('cards',)
+
+    def __init__(self, cards):
+        self.cards = tuple(cards)
+
+    def get_all_cards(self):
+        return self.cards
+
+
+class DeckVersions:
+    """
+    牌组版本登记表：版本号 -> url顺序
+    """
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str|Path): 登记表JSON文件，None表示只保存在内存中
+        """
+        self.path = Path(path) if path else None
+        self._versions = {}
+        # 卡牌管理器 -> 其url顺序对应的版本号（随目录一起释放）
+        self._manager_versions = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        if self.path:
+            self._versions = self._read()
+
+    def _read(self):
+        """读取登记表文件；文件不存在时为空"""
+        if not self.path.exists():
+            return {}
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        return {int(version, 16): tuple(urls) for version, urls in data.items()}
+
+    def __contains__(self, version):
+        return version in self._versions
+
+    def urls(self, version):
+        """某版本的url顺序，未登记时返回None"""
+        return self._versions.get(version)
+
+    def register(self, urls, persist=True):
+        """
+        登记当前牌组的url顺序
+
+        Args:
+            urls (iterable): 按牌组顺序排列的url
+            persist (bool): 新版本是否写回登记表文件（写入失败时只记录日志）
+
+        Returns:
+            int: 版本号
+        """
+        urls = tuple(urls)
+        version = deck_version(urls)
+        if version in self._versions:
+            return version
+        with self._lock:
+            self._versions[version] = urls
+            if persist and self.path:
+                try:
+                    self.save()
+                except OSError:
+                    logger.warning("无法写入牌组版本登记表 %s，新版本只在本进程有效", self.path)
+        return version
+
+    def save(self):
+        """
+        原子写入登记表文件
+        多个 worker 进程共用一个文件：在文件锁内重新读取，合并其他进程登记的版本后再写入，
+        不会互相覆盖
+        """
+        with open(self.path.with_name(f'{self.path.name}.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                stored = self._read()
+            except ValueError:
+                logger.warning("牌组版本登记表 %s 格式错误，将被覆盖", self.path)
+                stored = {}
+            for version, urls in stored.items():
+                self._versions.setdefault(version, urls)
+            data = {f'{version:08x}': list(urls) for version, urls in self._versions.items()}
+            tmp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def version_of(self, manager):
+        """
+        卡牌管理器当前牌组的版本号（首次调用时登记，之后缓存）
+
+        Args:
+            manager (CardManager): 卡牌管理器
+
+        Returns:
+            int: 版本号
+        """
+        version = self._manager_versions.get(manager)
+        if version is None:
+            version = self.register(card.url for card in manager.get_all_cards())
+            self._manager_versions[manager] = version
+        return version
+
+    def resolve(self, version, manager):
+        """
+        取某版本的牌组用于重新抽牌
+
+        Args:
+            version (int): 牌组版本号
+            manager (CardManager): 当前语言的卡牌管理器
+
+        Returns:
+            版本与当前牌组相同时返回 manager 本身；否则按历史url顺序从当前牌组取牌，
+            返回 PinnedDeck；版本未登记或其中有牌已被删除时返回None
+        """
+        if self.version_of(manager) == version:
+            return manager
+        urls = self._versions.get(version)
+        if urls is None:
+            return None
+        cards = [manager.get_card_by_url(url) for url in urls]
+        if None in cards:
+            return None
+        return PinnedDeck(cards)
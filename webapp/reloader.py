@@ -0,0 +1,211 @@
+"""
+卡牌数据热重载
+监视CSV和预编译快照（mtime + 校验和），数据变化时在后台构建新一代的
+CardCatalog（含 CardManager/ReadingEngine），再以一次引用赋值原子替换。
+请求路径只读取 current，无需加锁；进行中的请求继续使用旧牌组。
+每个 worker 进程各自监视；管理接口通过改写触发文件（同样被监视）让所有 worker 重载
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from webapp.catalog import CardCatalog
+from webapp.snapshot import snapshot_path_for, source_checksum
+
+logger = logging.getLogger(__name__)
+
+
+def _watched_files(sources, snapshot_dir):
+    """需要监视的文件：每个语言的CSV及其快照"""
+    files = []
+    for csv_path in sources.values():
+        files.append(Path(csv_path))
+        files.append(snapshot_path_for(csv_path, snapshot_dir))
+    return files
+
+
+def _read_trigger(path):
+    """触发文件要求的重载方式：'force' 表示强制重建"""
+    try:
+        return path.read_text(encoding='utf-8').split()[-1]
+    except (OSError, IndexError):
+        return ''
+
+
+def _stat_fingerprint(files):
+    """文件 (mtime, size) 指纹，用于低成本地发现变化"""
+    fingerprint = []
+    for path in files:
+        try:
+            stat = path.stat()
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+def _content_checksum(sources, snapshot_dir):
+    """
+    牌组内容校验和
+    以CSV内容为准（快照由CSV生成）；只发布快照时使用快照文件本身
+    """
+    digest = hashlib.sha256()
+    for lang, csv_path in sources.items():
+        path = Path(csv_path)
+        if not path.exists():
+            path = snapshot_path_for(csv_path, snapshot_dir)
+        try:
+            checksum = source_checksum(path)
+        except OSError:
+            checksum = ''
+        digest.update(f'{lang}:{checksum};'.encode())
+    return digest.hexdigest()
+
+
+class DeckReloader:
+    """
+    牌组热重载器
+    """
+    def __init__(self, sources, snapshot_dir=None, default_locale=None, memory_budget=0,
+                 backend='objects', trigger_file=None):
+        """
+        初始化并加载第一代目录
+
+        Args:
+            sources (dict): 语言 -> CSV路径
+            snapshot_dir (str|Path): 快照目录
+            default_locale (str): 默认语言，默认为 sources 的第一项
+            memory_budget (int): 语言牌组内存预算（字节），0表示不限制
+            backend (str): 卡牌存储后端，见 CardCatalog
+            trigger_file (str|Path): 重载触发文件，None表示只能在本进程内触发
+        """
+        self.sources = dict(sources)
+        self.snapshot_dir = snapshot_dir
+        self.default_locale = default_locale
+        self.memory_budget = memory_budget
+        self.backend = backend
+        self.reload_count = 0
+        self.trigger_file = Path(trigger_file) if trigger_file else None
+        self._files = _watched_files(self.sources, snapshot_dir)
+        if self.trigger_file is not None:
+            # 放在最后，check() 据此判断触发文件是否被改写
+            self._files.append(self.trigger_file)
+        self._fingerprint = _stat_fingerprint(self._files)
+        # 只有重载方之间互斥，请求路径不加锁
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+        self.current = self._build(1)
+
+    def _build(self, generation, preload=()):
+        """构建新一代目录"""
+        # 先计算校验和：加载期间文件再被修改时，下一次检查仍会发现变化
+        checksum = _content_checksum(self.sources, self.snapshot_dir)
+        catalog = CardCatalog(self.sources, self.default_locale, self.snapshot_dir,
+                              self.memory_budget, generation, checksum, self.backend)
+        catalog.preload(preload)
+        return catalog
+
+    @property
+    def generation(self):
+        """当前牌组代数"""
+        return self.current.generation
+
+    def add_listener(self, callback):
+        """
+        注册重载回调，新目录生效后调用 callback(catalog)
+        """
+        self._listeners.append(callback)
+
+    def check(self):
+        """
+        检查数据文件是否变化，变化则重载
+
+        Returns:
+            bool: 是否进行了重载
+        """
+        fingerprint = _stat_fingerprint(self._files)
+        if fingerprint == self._fingerprint:
+            return False
+        force = (self.trigger_file is not None and fingerprint[-1] != self._fingerprint[-1]
+                 and _read_trigger(self.trigger_file) == 'force')
+        return self.reload(force)
+
+    def request_reload(self, force=False):
+        """
+        在本进程内重载，并改写触发文件，让其他进程的监视线程在下一次轮询时重载
+
+        Args:
+            force (bool): 忽略校验和强制重建
+
+        Returns:
+            bool: 本进程是否替换了牌组
+        """
+        if self.trigger_file is not None:
+            self.trigger_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.trigger_file.with_name(f'.{self.trigger_file.name}.{os.getpid()}.tmp')
+            tmp.write_text(f"{time.time_ns()} {'force' if force else 'check'}\n", encoding='utf-8')
+            os.replace(tmp, self.trigger_file)
+        return self.reload(force)
+
+    def reload(self, force=False):
+        """
+        重新加载牌组；内容校验和未变化时只更新指纹
+
+        Args:
+            force (bool): 忽略校验和强制重建
+
+        Returns:
+            bool: 是否替换了牌组
+        """
+        with self._lock:
+            self._fingerprint = _stat_fingerprint(self._files)
+            old = self.current
+            if not force and _content_checksum(self.sources, self.snapshot_dir) == old.checksum:
+                return False
+            try:
+                # 在替换前加载旧目录中已加载的语言，避免切换后首个请求现场加载
+                new = self._build(old.generation + 1, old.loaded_locales())
+            except Exception:
+                # 数据文件写到一半或格式错误时保留旧牌组
+                logger.exception("Deck reload failed, keeping generation %d", old.generation)
+                return False
+            # 单次引用赋值即原子替换
+            self.current = new
+            self.reload_count += 1
+
+        logger.info("Deck reloaded: generation %d", new.generation)
+        for callback in self._listeners:
+            callback(new)
+        return True
+
+    def start(self, interval):
+        """
+        启动后台监视线程
+
+        Args:
+            interval (float): 轮询间隔（秒）
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, args=(interval,),
+                                        name='deck-reloader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台监视线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Deck watcher check failed")
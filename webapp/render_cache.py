@@ -0,0 +1,119 @@
+"""
+渲染结果缓存
+首页、牌库和牌详情页对同一语言、同一代牌组总是渲染出相同的HTML。
+缓存渲染结果及其强ETag，命中时不再经过Jinja；If-None-Match 匹配时直接返回304。
+压缩后的响应体（见 webapp/compression.py）也随页面缓存，每种编码只压缩一次
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from webapp.compression import PRECOMPRESS_LEVELS, compress
+
+
+class CachedPage:
+    """缓存的页面：响应体、强ETag和各编码的压缩结果"""
+    __slots__ = ('body', 'etag', 'encoded')
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self.encoded = {}
+
+    def encode(self, encoding):
+        """
+        按 encoding 压缩的响应体（第一次请求该编码时按最高级别压缩并保存；
+        并发时可能重复压缩，结果相同）
+        """
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = self.encoded[encoding] = compress(self.body, encoding, PRECOMPRESS_LEVELS[encoding])
+        return body
+
+
+class RenderCache:
+    """
+    有容量上限的LRU页面缓存（线程安全）
+    """
+    def __init__(self, max_entries=512):
+        """
+        Args:
+            max_entries (int): 最多缓存的页面数，0表示不缓存
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.not_modified = 0
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pages)
+
+    def get(self, key):
+        """
+        读取页面
+
+        Args:
+            key (tuple): (端点, 参数, 语言, 牌组代数)
+
+        Returns:
+            CachedPage: 未命中时返回None
+        """
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, key, body):
+        """
+        写入页面，超出容量时淘汰最久未用的页面
+
+        Args:
+            key (tuple): 缓存键
+            body (bytes): 响应体
+
+        Returns:
+            CachedPage: 缓存的页面（容量为0时不保存，但仍返回带ETag的页面）
+        """
+        page = CachedPage(body, hashlib.sha256(body).hexdigest()[:32])
+        if self.max_entries <= 0:
+            return page
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+                self.evictions += 1
+        return page
+
+    def mark_not_modified(self):
+        """记录一次304响应"""
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self, *args):
+        """
+        清空缓存（牌组重载时调用，可直接注册为 DeckReloader 的回调）
+        """
+        with self._lock:
+            self._pages.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """命中/未命中/淘汰等计数"""
+        with self._lock:
+            return {
+                'entries': len(self._pages),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'not_modified': self.not_modified,
+            }
@@ -0,0 +1,88 @@
+"""
+抽牌随机数来源
+- thread（默认）：每个线程一个独立的 random.Random，gthread worker 的各线程之间
+  不再争用全局 random 模块的同一个生成器状态；fork 后在子进程中重新播种
+- secrets：使用操作系统的密码学安全随机数（secrets.SystemRandom），无共享状态，
+  适合要求“真随机”的部署，速度较慢
+
+所有来源都返回 random.Random 接口的对象，ReadingEngine 只调用 sample/shuffle/getrandbits
+"""
+import os
+import random
+import secrets
+import threading
+
+RNG_MODES = ('thread', 'secrets')
+
+
+class ThreadLocalRandom:
+    """每个线程一个独立播种的生成器"""
+
+    def __init__(self):
+        self._local = threading.local()
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        """丢弃所有线程的生成器（fork 后调用，子进程各自重新播种）"""
+        self._local = threading.local()
+
+    def generator(self):
+        """当前线程的生成器，首次使用时从操作系统取种子"""
+        try:
+            return self._local.generator
+        except AttributeError:
+            generator = self._local.generator = random.Random(secrets.randbits(128))
+            return generator
+
+
+class SystemRandomSource:
+    """操作系统密码学安全随机数（线程安全，无需每线程实例）"""
+
+    def __init__(self):
+        self._generator = secrets.SystemRandom()
+
+    def generator(self):
+        return self._generator
+
+
+_sources = {
+    'thread': ThreadLocalRandom(),
+    'secrets': SystemRandomSource(),
+}
+_current = _sources['thread']
+
+
+def configure(mode):
+    """
+    设置进程使用的随机数来源
+
+    Args:
+        mode (str): RNG_MODES 中的一项
+
+    Raises:
+        ValueError: 未知模式
+    """
+    global _current
+    if mode not in _sources:
+        raise ValueError(f"unknown RNG mode: {mode!r} (expected one of {', '.join(RNG_MODES)})")
+    _current = _sources[mode]
+
+
+def current_rng():
+    """当前线程应使用的生成器"""
+    return _current.generator()
+
+
+def orientation_bits(rng, count):
+    """
+    一次取 count 个随机位作为正逆位，代替逐张 choice([True, False])
+
+    Args:
+        rng (random.Random): 生成器
+        count (int): 牌数
+
+    Returns:
+        list: 每张牌是否逆位
+    """
+    bits = rng.getrandbits(count)
+    return [bool(bits >> i & 1) for i in range(count)]
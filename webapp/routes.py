@@ -1,125 +1,348 @@
 """
 Flask路由定义
 """
-from flask import Blueprint, render_template, current_app, session, redirect, request
-from webapp.models import CardManager, ReadingEngine
+import hmac
+from datetime import datetime
+from functools import wraps
+from flask import (Blueprint, render_template, current_app, session, redirect, request, g,
+                   jsonify, abort, make_response, url_for)
+from webapp.atlas import CardAtlases
+from webapp.catalog import discover_locale_sources
+from webapp.compression import encoded_etag
+from webapp.daily import DailyCards, bucket_for, new_daily_id, next_midnight, resolve_timezone
+from webapp.fragments import FragmentCache
+from webapp.images import ImageVariants
+from webapp.models import ReadingEngine
+from webapp.permalink import DeckVersions, decode_token, encode_token, new_seed, seeded_rng
+from webapp.rng import configure as configure_rng
+from webapp.reloader import DeckReloader
+from webapp.render_cache import RenderCache
+from webapp.spreads import SpreadRegistry
 
 main_bp = Blueprint('main', __name__)
 
 # 全局变量（应用启动时初始化）
-card_manager_en = None
-card_manager_zh = None
-reading_engine_en = None
-reading_engine_zh = None
-card_manager = None
-reading_engine = None
+deck_reloader = None
+deck_versions = None
+spread_registry = None
+daily_cards = None
+render_cache = None
+card_fragments = None
+image_variants = None
+card_atlases = None
+
+# 每日一牌的匿名访客标识与浏览器时区（由 base.html 中的脚本写入）的cookie名
+DAILY_ID_COOKIE = 'daily_id'
+TIMEZONE_COOKIE = 'tz'
 
 @main_bp.record_once
 def on_load(state):
-    """蓝图加载时初始化卡牌管理器"""
-    global card_manager_en, card_manager_zh, reading_engine_en, reading_engine_zh, card_manager, reading_engine
+    """蓝图加载时初始化多语言卡牌目录"""
+    global deck_reloader, deck_versions, spread_registry, daily_cards, render_cache, card_fragments
+    global image_variants, card_atlases
     app = state.app
-    card_manager_en = CardManager(app.config['CARDS_CSV'])
-    reading_engine_en = ReadingEngine(card_manager_en)
-    zh_csv = app.config.get('CARDS_CSV_ZH')
-    if zh_csv:
-        card_manager_zh = CardManager(zh_csv)
-        reading_engine_zh = ReadingEngine(card_manager_zh)
-    else:
-        card_manager_zh = None
-        reading_engine_zh = None
-    card_manager = card_manager_en
-    reading_engine = reading_engine_en
+    configure_rng(app.config.get('RNG_MODE') or 'thread')
+    configured = {'en': app.config['CARDS_CSV'], 'zh': app.config.get('CARDS_CSV_ZH')}
+    configured.update(app.config.get('CARDS_CSV_LOCALES') or {})
+    sources = discover_locale_sources(app.config['DATA_DIR'], configured)
+    deck_reloader = DeckReloader(sources, app.config.get('SNAPSHOT_DIR'),
+                                 app.config['BABEL_DEFAULT_LOCALE'],
+                                 app.config.get('CARD_CATALOG_MEMORY_BUDGET') or 0,
+                                 app.config.get('CARD_STORE_BACKEND') or 'objects',
+                                 app.config.get('DECK_RELOAD_TRIGGER'))
+    deck_versions = DeckVersions(app.config.get('DECK_VERSIONS_FILE'))
+    # 牌组重载后页面内容可能变化，清空渲染缓存
+    render_cache = RenderCache(app.config['RENDER_CACHE_SIZE'])
+    deck_reloader.add_listener(render_cache.clear)
+    card_fragments = FragmentCache(render_template)
+    deck_reloader.add_listener(card_fragments.clear)
+    # 构建时生成的图片版本（没有时模板使用原图）
+    image_variants = ImageVariants.load(app.static_folder)
+    # 牌库页的缩略图拼图；新拼图生成后牌库页改用拼图
+    card_atlases = CardAtlases(app.static_folder, app.config['CARD_ATLAS_AUTOBUILD'])
+    card_atlases.add_listener(render_cache.clear)
+    # 界面语言列表与牌组语言保持一致
+    app.config['BABEL_SUPPORTED_LOCALES'] = list(sources)
+    # 各语言的布局表（位置说明在此一次性翻译）
+    spread_registry = SpreadRegistry.from_file(
+        app.config['SPREADS_FILE'], sources,
+        app.config['BABEL_TRANSLATION_DIRECTORIES'].split(';'),
+        app.config['BABEL_DEFAULT_LOCALE'])
+    daily_cards = DailyCards(app.config['DAILY_CARD_BUCKETS'], app.config.get('DAILY_CARD_SALT') or '')
+    # 预先计算今年的每日一牌分配表（预加载模式下由所有worker共享）
+    manager = deck_reloader.current.manager(app.config['BABEL_DEFAULT_LOCALE'])
+    daily_cards.calendar(datetime.now().year, deck_versions.version_of(manager),
+                         len(manager.get_all_cards()))
+    interval = app.config.get('DECK_RELOAD_INTERVAL')
+    if interval:
+        deck_reloader.start(interval)
 
 
 def _get_current_language():
+    locales = current_app.config['BABEL_SUPPORTED_LOCALES']
     lang = session.get('language')
-    if lang in ['en', 'zh']:
+    if lang in locales:
         return lang
-    best_lang = request.accept_languages.best_match(['en', 'zh'])
-    if best_lang in ['en', 'zh']:
+    best_lang = request.accept_languages.best_match(locales)
+    if best_lang in locales:
         return best_lang
-    return 'en'
+    return current_app.config['BABEL_DEFAULT_LOCALE']
+
+
+def _get_catalog():
+    """
+    当前请求使用的卡牌目录
+    首次访问时固定到 g 上，请求处理期间发生重载也不会切换
+    """
+    if 'catalog' not in g:
+        g.catalog = deck_reloader.current
+    return g.catalog
 
 
 def _get_card_manager():
-    lang = _get_current_language()
-    if lang == 'zh' and card_manager_zh is not None:
-        return card_manager_zh
-    return card_manager_en
+    return _get_catalog().manager(_get_current_language())
 
 
 def _get_reading_engine():
-    lang = _get_current_language()
-    if lang == 'zh' and reading_engine_zh is not None:
-        return reading_engine_zh
-    return reading_engine_en
+    return _get_catalog().engine(_get_current_language())
+
+
+def send_cached(cache, page, mimetype, vary):
+    """
+    用缓存的响应体构造响应：强ETag、公共缓存；请求的 If-None-Match 与ETag相同时返回304。
+    启用了响应压缩时按 Accept-Encoding 返回缓存的压缩结果，ETag 按编码区分
+
+    Args:
+        cache (RenderCache): page 所在的缓存（记录304次数）
+        page (CachedPage): 缓存的响应体
+        mimetype (str): 内容类型
+        vary (tuple): 决定响应内容的请求头
+    """
+    compression = current_app.extensions.get('compression')
+    encoding = compression.negotiate(len(page.body)) if compression is not None else None
+    if encoding is None:
+        response = current_app.response_class(page.body, mimetype=mimetype)
+        response.set_etag(page.etag)
+    else:
+        response = current_app.response_class(page.encode(encoding), mimetype=mimetype)
+        response.content_encoding = encoding
+        response.set_etag(encoded_etag(page.etag, encoding))
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['RENDER_CACHE_MAX_AGE']
+    response.vary.update(vary)
+    if compression is not None:
+        response.vary.add('Accept-Encoding')
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        cache.mark_not_modified()
+    return response
+
+
+def cached_page(view):
+    """
+    缓存视图的渲染结果
+    键为 (端点, 参数, 语言, 牌组代数)；只缓存200响应。
+    命中时不渲染模板；请求的 If-None-Match 与ETag相同时返回304。
+    这些页面的内容完全由语言和牌组决定，也会被 scripts/export_static.py 导出为静态文件
+    """
+    @wraps(view)
+    def wrapper(**kwargs):
+        key = (request.endpoint, tuple(sorted(kwargs.items())),
+               _get_current_language(), _get_catalog().generation)
+        page = render_cache.get(key)
+        if page is None:
+            response = make_response(view(**kwargs))
+            if response.status_code != 200:
+                return response
+            page = render_cache.put(key, response.get_data())
+
+        # 页面语言取决于会话和浏览器语言
+        return send_cached(render_cache, page, 'text/html', ('Cookie', 'Accept-Language'))
+
+    # 静态导出：export_pages(manager) 列出该端点的全部 (参数, 页面输入)，
+    # None 表示只有一页，且页面输入为整个牌组
+    wrapper.static_export = True
+    wrapper.export_pages = None
+    return wrapper
+
+
+def card_fragment(template, card, reversed, fill='', **variant):
+    """
+    模板函数：输出缓存的牌面板片段
+
+    Args:
+        template (str): 片段模板
+        card (Card): 牌
+        reversed (bool): 是否逆位
+        fill (str): 填入片段 slot 处的文本（如位置说明）
+        **variant: 其他影响片段内容的模板变量（如 compact），同时作为缓存键的一部分
+    """
+    key = (template, _get_current_language(), _get_catalog().generation,
+           card['url'], bool(reversed), tuple(sorted(variant.items())))
+    return card_fragments.splice(key, template, fill, card=card, reversed=reversed, **variant)
+
+
+def image_picture(filename):
+    """模板函数：某张图片的 <picture> 数据（见 ImageVariants.picture）"""
+    return image_variants.picture(filename, lambda name: url_for('static', filename=name))
 
 
 @main_bp.context_processor
 def inject_current_lang():
-    return {'current_lang': _get_current_language()}
+    return {
+        'current_lang': _get_current_language(),
+        'supported_langs': current_app.config['BABEL_SUPPORTED_LOCALES'],
+        'card_fragment': card_fragment,
+        'image_picture': image_picture,
+    }
 
 
 @main_bp.route('/')
+@cached_page
 def index():
     """首页"""
-    return render_template('index.html')
+    spreads = spread_registry.for_locale(_get_current_language())
+    return render_template('index.html', spreads=spreads)
+
+
+def _get_spread(name):
+    """当前语言的布局，不存在时返回404"""
+    spread = spread_registry.get(name, _get_current_language())
+    if spread is None:
+        abort(404)
+    return spread
+
+
+def _render_reading(spread, placements, token):
+    """渲染占卜结果页"""
+    permalink = url_for('main.reading', token=token)
+    if spread.template == 'one_card.html':
+        position, card, reversed = placements[0]
+        return render_template('one_card.html', card=card, reversed=reversed, permalink=permalink)
+    return render_template(spread.template, spread=spread, readings=placements, permalink=permalink)
+
+
+def _new_reading(name):
+    """用新种子占卜，结果页附带可重现该结果的永久链接"""
+    spread = _get_spread(name)
+    seed = new_seed()
+    token = encode_token(deck_versions.version_of(_get_card_manager()), spread.code, seed)
+    placements = _get_reading_engine().spread_reading(spread, seeded_rng(seed))
+    return _render_reading(spread, placements, token)
+
+
+@main_bp.route('/spread/<name>')
+def spread(name):
+    """按布局注册表中的任意布局占卜"""
+    return _new_reading(name)
 
 
 @main_bp.route('/one-card')
 def one_card():
     """单卡占卜"""
-    engine = _get_reading_engine()
-    card, reversed = engine.one_card_reading()
-    return render_template('one_card.html', card=card, reversed=reversed)
+    return _new_reading('one')
 
 
 @main_bp.route('/three-cards')
 def three_cards():
     """三卡占卜（过去-现在-未来）"""
-    engine = _get_reading_engine()
-    readings = engine.three_card_reading()
-    return render_template('three_cards.html', readings=readings)
+    return _new_reading('three')
 
 
 @main_bp.route('/six-cards')
 def six_cards():
     """六卡通用占卜"""
-    engine = _get_reading_engine()
-    readings = engine.six_card_reading()
-    return render_template('six_cards.html', readings=readings)
+    return _new_reading('six')
+
+
+@main_bp.route('/reading/<token>')
+def reading(token):
+    """
+    永久链接：按令牌中的牌组版本和种子重新抽牌，还原同一次占卜
+    结果完全由令牌决定，可按URL缓存
+    """
+    try:
+        version, spread_code, seed = decode_token(token)
+    except ValueError:
+        abort(404)
+    name = spread_registry.name_for_code(spread_code)
+    if name is None:
+        abort(404)
+    spread = _get_spread(name)
+    manager = _get_card_manager()
+    deck = deck_versions.resolve(version, manager)
+    if deck is None:
+        abort(404)
+    engine = _get_reading_engine() if deck is manager else ReadingEngine(deck)
+    placements = engine.spread_reading(spread, seeded_rng(seed))
+
+    response = make_response(_render_reading(spread, placements, token))
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['READING_CACHE_MAX_AGE']
+    # 页面语言取决于会话和浏览器语言
+    response.vary.update(('Cookie', 'Accept-Language'))
+    return response
+
+
+@main_bp.route('/daily-card')
+def daily_card():
+    """
+    每日一牌：由访客标识和访客本地日期确定，当天刷新结果不变
+    页面按 (日期, 桶, 语言, 牌组代数) 缓存，浏览器缓存到本地午夜
+    """
+    daily_id = request.cookies.get(DAILY_ID_COOKIE)
+    is_new_visitor = not daily_id
+    if is_new_visitor:
+        daily_id = new_daily_id()
+    bucket = bucket_for(daily_id, daily_cards.buckets)
+    tz = resolve_timezone(request.cookies.get(TIMEZONE_COOKIE),
+                          current_app.config['DAILY_CARD_TIMEZONE'])
+    now = datetime.now(tz)
+    today = now.date()
+    key = (today, bucket, _get_current_language(), _get_catalog().generation)
+
+    body = daily_cards.cached_page(key)
+    if body is None:
+        manager = _get_card_manager()
+        cards = manager.get_all_cards()
+        index, reversed = daily_cards.assignment(today, bucket, deck_versions.version_of(manager), len(cards))
+        body = render_template('one_card.html', card=cards[index], reversed=reversed, daily_date=today)
+        daily_cards.cache_page(key, body)
+
+    response = make_response(body)
+    midnight = next_midnight(now)
+    response.cache_control.private = True
+    response.cache_control.max_age = max(int((midnight - now).total_seconds()), 1)
+    response.expires = midnight
+    response.vary.update(('Cookie', 'Accept-Language'))
+    if is_new_visitor:
+        response.set_cookie(DAILY_ID_COOKIE, daily_id, max_age=2 * 365 * 86400,
+                            httponly=True, samesite='Lax')
+    return response
 
 
 @main_bp.route('/browse')
+@cached_page
 def browse_cards():
     """浏览所有牌"""
     manager = _get_card_manager()
     cards = manager.get_all_cards()
-    return render_template('browse_cards.html', cards=cards)
+    return render_template('browse_cards.html', cards=cards, atlas=card_atlases.for_deck(manager))
 
 
 @main_bp.route('/card/<card_url>')
+@cached_page
 def card_detail(card_url):
     """单张牌详情页"""
     # 查找当前牌
     manager = _get_card_manager()
-    all_cards = manager.get_all_cards()
-    card = None
-    current_index = -1
-
-    for i, c in enumerate(all_cards):
-        if c['url'] == card_url:
-            card = c
-            current_index = i
-            break
+    card = manager.get_card_by_url(card_url)
 
     if not card:
         return "Card not found", 404
 
     # 获取前后牌（用于导航）
-    prev_card = all_cards[current_index - 1] if current_index > 0 else None
-    next_card = all_cards[current_index + 1] if current_index < len(all_cards) - 1 else None
+    prev_card, next_card = manager.get_neighbors(card_url)
 
     return render_template('card_detail.html',
                          card=card,
@@ -127,6 +350,17 @@ def card_detail(card_url):
                          next_card=next_card)
 
 
+def _card_detail_pages(manager):
+    """静态导出：每张牌一页，页面内容只取决于该牌和前后牌"""
+    for card in manager.get_all_cards():
+        neighbors = manager.get_neighbors(card['url'])
+        inputs = [card.to_dict()] + [c['url'] if c else None for c in neighbors]
+        yield {'card_url': card['url']}, inputs
+
+
+card_detail.export_pages = _card_detail_pages
+
+
 @main_bp.errorhandler(404)
 def not_found(error):
     """404错误处理"""
@@ -142,7 +376,46 @@ def internal_error(error):
 @main_bp.route('/set-language/<lang>')
 def set_language(lang):
     """设置语言"""
-    if lang in ['en', 'zh']:
+    if lang in current_app.config['BABEL_SUPPORTED_LOCALES']:
         session['language'] = lang
     # 重定向回来源页面，如果没有来源则回到首页
     return redirect(request.referrer or '/')
+
+
+def _check_admin_token():
+    """校验管理令牌；未配置 ADMIN_TOKEN 时管理接口不可用"""
+    token = current_app.config.get('ADMIN_TOKEN')
+    if not token:
+        abort(404)
+    supplied = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        abort(403)
+
+
+@main_bp.route('/admin/reload', methods=['GET', 'POST'])
+def admin_reload():
+    """
+    管理接口：查看（GET）或触发（POST）牌组重载
+    处理该请求的worker立即重载；其他worker由监视线程在下一次轮询时发现触发文件的变化后重载
+    """
+    _check_admin_token()
+    reloaded = False
+    if request.method == 'POST':
+        reloaded = deck_reloader.request_reload(force=request.args.get('force') == '1')
+    return jsonify({
+        'reloaded': reloaded,
+        'generation': deck_reloader.generation,
+        'reload_count': deck_reloader.reload_count,
+    })
+
+
+@main_bp.route('/admin/cache', methods=['GET', 'POST'])
+def admin_cache():
+    """
+    管理接口：查看（GET）或清空（POST）页面渲染缓存
+    注意：只作用于处理该请求的worker进程
+    """
+    _check_admin_token()
+    if request.method == 'POST':
+        render_cache.clear()
+    return jsonify(render_cache.stats())
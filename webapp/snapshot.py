@@ -0,0 +1,126 @@
+"""
+卡牌数据快照
+构建阶段把每个语言的CSV预编译为紧凑的二进制快照，
+worker启动时直接读取快照，无需导入pandas/numpy
+"""
+import hashlib
+import os
+import pickle
+import struct
+from pathlib import Path
+
+# 文件头：魔数 + 格式版本号（格式变化时递增，旧快照自动失效）
+SNAPSHOT_MAGIC = b'TAROTSNP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = '.snapshot'
+_HEADER = struct.Struct('>8sH')
+
+
+def source_checksum(csv_path):
+    """计算源CSV文件的SHA-256校验和"""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_path_for(csv_path, snapshot_dir=None):
+    """
+    获取CSV对应的快照路径
+
+    Args:
+        csv_path (str|Path): CSV文件路径
+        snapshot_dir (str|Path): 快照目录，默认为CSV同级的 compiled/ 目录
+    """
+    csv_path = Path(csv_path)
+    if snapshot_dir is None:
+        snapshot_dir = csv_path.parent / 'compiled'
+    return Path(snapshot_dir) / (csv_path.stem + SNAPSHOT_SUFFIX)
+
+
+def read_csv_records(csv_path):
+    """
+    用pandas读取CSV（仅构建阶段和快照缺失时使用）
+
+    Returns:
+        tuple: (列名元组, 字典列表)
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    # 将NaN替换为空字符串
+    df = df.fillna('')
+    return tuple(df.columns), df.to_dict('records')
+
+
+def compile_snapshot(csv_path, snapshot_path=None):
+    """
+    将CSV编译为快照文件
+
+    Args:
+        csv_path (str|Path): 源CSV文件路径
+        snapshot_path (str|Path): 输出路径，默认见 snapshot_path_for()
+
+    Returns:
+        Path: 写入的快照路径
+    """
+    csv_path = Path(csv_path)
+    snapshot_path = Path(snapshot_path or snapshot_path_for(csv_path))
+    columns, records = read_csv_records(csv_path)
+
+    payload = {
+        'source': csv_path.name,
+        'checksum': source_checksum(csv_path),
+        'columns': columns,
+        # 按列顺序存为元组，比逐条字典更紧凑
+        'rows': [tuple(record[c] for c in columns) for record in records],
+    }
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # 原子替换，避免正在启动的worker读到半个文件
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+def read_snapshot(snapshot_path):
+    """
+    读取快照文件
+
+    Returns:
+        dict|None: 快照内容；文件缺失、损坏或版本不符时返回None
+    """
+    try:
+        with open(snapshot_path, 'rb') as f:
+            magic, version = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                return None
+            return pickle.load(f)
+    except (OSError, struct.error, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def load_snapshot(csv_path, snapshot_path=None):
+    """
+    读取CSV对应的快照，并校验是否过期
+
+    Args:
+        csv_path (str|Path): 源CSV文件路径（用于校验）
+        snapshot_path (str|Path): 快照路径，默认见 snapshot_path_for()
+
+    Returns:
+        list|None: 卡牌字典列表；快照缺失或与CSV不一致时返回None
+    """
+    csv_path = Path(csv_path)
+    payload = read_snapshot(snapshot_path or snapshot_path_for(csv_path))
+    if payload is None:
+        return None
+    # 源CSV存在时必须校验和一致；只发布快照时直接使用
+    if csv_path.exists() and source_checksum(csv_path) != payload['checksum']:
+        return None
+    columns = payload['columns']
+    return [dict(zip(columns, row)) for row in payload['rows']]
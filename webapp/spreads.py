@@ -0,0 +1,178 @@
+"""
+占卜布局注册表
+布局定义在 data/spreads.json 中（位置说明等文本为英文 msgid）。
+启动时为每种语言编译一份不可变的布局表，翻译在此时一次性完成，
+请求路径只按 (语言, 布局名) 查表，不再调用 gettext
+"""
+import json
+from types import MappingProxyType
+from babel.support import Translations
+from webapp.models import _Immutable
+
+# 需要翻译的文本字段
+SPREAD_TEXT_FIELDS = ('title', 'heading', 'subtitle')
+DEFAULT_TEMPLATE = 'spread.html'
+
+
+class Spread(_Immutable):
+    """
+    某种语言的占卜布局
+
+    Attributes:
+        name (str): 布局名（URL中使用）
+        code (int): 布局编号（写入永久链接令牌，不可更改）
+        locale (str): 语言
+        title/heading/subtitle (str): 已翻译的页面标题、大标题和副标题
+        positions (tuple): 已翻译的各位置说明，长度即牌数
+        reversed_count (int): 固定逆位张数，None 表示每张牌独立随机
+        columns (int): 页面每行显示的牌数
+        template (str): 渲染模板
+    """
+    __slots__ = ('name', 'code', 'locale', 'title', 'heading', 'subtitle', 'positions',
+                 'reversed_count', 'columns', 'template')
+
+    def __init__(self, **fields):
+        for field in self.__slots__:
+            object.__setattr__(self, field, fields[field])
+
+    @property
+    def size(self):
+        """牌数"""
+        return len(self.positions)
+
+    def __repr__(self):
+        return f"Spread({self.name!r}, {self.locale!r})"
+
+
+def load_spread_definitions(path):
+    """
+    读取并校验布局定义
+
+    Args:
+        path (str|Path): JSON文件路径
+
+    Returns:
+        list: 布局定义字典（按文件顺序）
+
+    Raises:
+        ValueError: 定义无效（名称/编号重复、逆位张数超出牌数等）
+    """
+    with open(path, encoding='utf-8') as f:
+        definitions = json.load(f)
+
+    names, codes = set(), set()
+    for spec in definitions:
+        name, code = spec['name'], spec['code']
+        if name in names or code in codes:
+            raise ValueError(f"duplicate spread name or code: {name!r} ({code})")
+        if not 0 <= code < 256:
+            raise ValueError(f"spread code out of range: {name!r} ({code})")
+        if not spec['positions']:
+            raise ValueError(f"spread has no positions: {name!r}")
+        reversed_count = spec.get('reversed')
+        if reversed_count is not None and not 0 <= reversed_count <= len(spec['positions']):
+            raise ValueError(f"invalid reversed count for spread {name!r}")
+        names.add(name)
+        codes.add(code)
+    return definitions
+
+
+def _compile(spec, locale, translations):
+    """用某语言的翻译编译一个布局"""
+    gettext = translations.gettext
+    fields = {field: gettext(spec[field]) for field in SPREAD_TEXT_FIELDS}
+    return Spread(
+        name=spec['name'],
+        code=spec['code'],
+        locale=locale,
+        positions=tuple(gettext(position) for position in spec['positions']),
+        reversed_count=spec.get('reversed'),
+        columns=spec.get('columns', len(spec['positions'])),
+        template=spec.get('template', DEFAULT_TEMPLATE),
+        **fields,
+    )
+
+
+class SpreadRegistry:
+    """
+    各语言的布局表
+    """
+    def __init__(self, definitions, locales, translation_dirs=(), default_locale=None):
+        """
+        编译所有语言的布局
+
+        Args:
+            definitions (list): 布局定义（见 load_spread_definitions）
+            locales (iterable): 语言列表
+            translation_dirs (iterable): gettext 翻译目录
+            default_locale (str): 默认语言（未知语言时使用），默认为 locales 的第一项
+        """
+        locales = list(locales)
+        self.default_locale = default_locale or locales[0]
+        if self.default_locale not in locales:
+            locales.insert(0, self.default_locale)
+
+        compiled = {}
+        for locale in locales:
+            translations = Translations()
+            for dirname in translation_dirs:
+                translations.merge(Translations.load(dirname, [locale]))
+            compiled[locale] = MappingProxyType(
+                {spec['name']: _compile(spec, locale, translations) for spec in definitions})
+        self._spreads = MappingProxyType(compiled)
+        self._names_by_code = MappingProxyType({spec['code']: spec['name'] for spec in definitions})
+
+    @classmethod
+    def from_file(cls, path, locales, translation_dirs=(), default_locale=None):
+        """从JSON文件创建"""
+        return cls(load_spread_definitions(path), locales, translation_dirs, default_locale)
+
+    def for_locale(self, locale):
+        """
+        某语言的全部布局
+
+        Returns:
+            Mapping: 布局名 -> Spread（只读，按定义顺序）
+        """
+        spreads = self._spreads.get(locale)
+        return spreads if spreads is not None else self._spreads[self.default_locale]
+
+    def get(self, name, locale):
+        """
+        获取布局
+
+        Returns:
+            Spread: 布局；不存在时返回None
+        """
+        return self.for_locale(locale).get(name)
+
+    def name_for_code(self, code):
+        """布局编号 -> 布局名，未知编号返回None"""
+        return self._names_by_code.get(code)
+
+
+_default_registry = None
+
+
+def default_registry():
+    """
+    data/spreads.json 的布局表（只编译默认语言，首次调用时读取）
+    供不经过 Flask 应用的离线任务（批量占卜等）按布局名取布局
+    """
+    global _default_registry
+    if _default_registry is None:
+        from config import Config
+        _default_registry = SpreadRegistry.from_file(Config.SPREADS_FILE, [Config.BABEL_DEFAULT_LOCALE])
+    return _default_registry
+
+
+def extract_spreads(fileobj, keywords, comment_tags, options):
+    """
+    pybabel 提取器：从布局定义中提取待翻译文本
+    用法见 babel.cfg
+    """
+    for spec in json.load(fileobj):
+        for field in SPREAD_TEXT_FIELDS:
+            yield 0, None, spec[field], [f"spread {spec['name']}: {field}"]
+        for position in spec['positions']:
+            yield 0, None, position, [f"spread {spec['name']}: position"]